@@ -0,0 +1,141 @@
+"""
+Backoffice Tarih Ayrıştırıcı
+BetConstruct API'nin ISO tarih metinleri ('2025-01-01T12:00:00',
+'2025-01-01T12:00:00.1234567+04:00', '1990-05-01') tek bir düzenli ifadeyle
+doğrulanıp istisna fırlatıp yakalamadan C ayrıştırıcısına (fromisoformat)
+verilir. Kesir hanesi sayısı değişkendir (mikrosaniyeye kısaltılır); saat
+dilimi eki (Z, +03:00, -0500) tanınır ve varsayılan olarak atılır, yani API'nin
+verdiği yerel saat korunur. Aynı metin tekrar tekrar geldiği için (aynı
+müşterinin tarihleri, Excel satırları) sonuçlar LRU önbellekte tutulur. pandas
+sütunları için vektörel sürüm ve bench_datetime.py ile hız ölçümü vardır.
+
+Gereksinimler: Python 3.11+ (fromisoformat 7 haneli kesir ve 'Z' ekini bu
+sürümden itibaren kabul eder), pandas 2.0+ (to_datetime(format='ISO8601')).
+"""
+
+import calendar
+import math
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Sayısal (epoch) zaman damgalarının başlangıcı; saat dilimsiz yerel saat
+EPOCH = datetime(1970, 1, 1)
+
+# Biçim burada, alan aralıkları metin karşılaştırmasıyla doğrulanır; geçen metin
+# datetime.fromisoformat'a (C) istisnasız verilebilir. Ay sonu (30 Şubat vb.) ayrıca kontrol edilir.
+_ISO_RE = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)'
+    r'(?:[T ](\d\d):(\d\d)(?::(\d\d)(?:\.\d{1,9})?)?'
+    r'(Z|[+-](\d\d)(?::?(\d\d))?)?)?',
+    re.ASCII  # '٢٠٢٥' gibi ASCII olmayan rakamlar fromisoformat'ta ValueError verir
+)
+# Vektörel sürümde karışık saat dilimli metinlerden ekin atılması (tarih-only '1990-05-15' korunur)
+_TZ_SUFFIX_RE = r'(?<=[T ]\d{2}:\d{2})((?::\d{2})?(?:\.\d+)?)\s*(?:Z|[+-]\d{2}(?::?\d{2})?)\s*$'
+
+
+def _parse_text(text: str, aware: bool) -> Optional[datetime]:
+    match = _ISO_RE.fullmatch(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, suffix, tz_hour, tz_minute = match.groups()
+    if not ('01' <= month <= '12' and '01' <= day <= '31') or year == '0000':
+        return None
+    if hour is not None and (hour > '23' or minute > '59' or (second or '00') > '59'):
+        return None
+    if day > '28' and int(day) > calendar.monthrange(int(year), int(month))[1]:
+        return None
+    if suffix is None:
+        return datetime.fromisoformat(text)
+    if not aware:
+        # Saat dilimi nesnesi oluşturmadan yerel saat
+        return datetime.fromisoformat(text[:match.start(7)])
+    if (tz_hour or '00') > '23' or (tz_minute or '00') > '59':
+        return None
+    return datetime.fromisoformat(text)
+
+
+_parse = lru_cache(maxsize=65536)(_parse_text)
+
+
+def parse_api_datetime(value: Any, aware: bool = False) -> Optional[datetime]:
+    """API tarih metni -> datetime (ayrıştırılamazsa None, istisna fırlatmaz)
+
+    aware=False: saat dilimi eki atılır, metindeki yerel saat döner.
+    aware=True: ek varsa saat dilimli datetime döner.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return _parse(str(value).strip(), aware)
+
+
+@lru_cache(maxsize=65536)
+def _epoch(text: str) -> float:
+    parsed = _parse_text(text, False)
+    if parsed is None:
+        return math.nan
+    return (parsed - EPOCH).total_seconds()
+
+
+def parse_api_epoch(value: Any) -> float:
+    """API tarih metni -> EPOCH'tan bu yana saniye, yerel saat (ayrıştırılamazsa nan)"""
+    if not value:
+        return math.nan
+    return _epoch(str(value).strip())
+
+
+@lru_cache(maxsize=65536)
+def _format(text: str, fmt: str) -> Optional[str]:
+    parsed = _parse_text(text, False)
+    return None if parsed is None else parsed.strftime(fmt)
+
+
+def format_api_datetime(value: Any, fmt: str = '%d.%m.%Y %H:%M', default: Optional[str] = None) -> str:
+    """API tarih metnini göstermek için biçimlendir (ayrıştırılamazsa default veya metnin kendisi)"""
+    formatted = _format(str(value).strip(), fmt) if value else None
+    if formatted is None:
+        return str(value) if default is None else default
+    return formatted
+
+
+def parse_api_datetime_array(values: Iterable[Any]) -> np.ndarray:
+    """Tarih metni dizisi/sütunu -> datetime64[us] (ayrıştırılamayanlar NaT), vektörel
+
+    Metinler pandas'ın C ISO ayrıştırıcısıyla tek seferde çevrilir (satır başına
+    Python çağrısı yok); tek saat dilimli sonuçta ek atılır. Farklı saat
+    dilimleri karışıksa (pandas 3'te ValueError, 2.x'te object sütun) ekler
+    vektörel regex ile atılıp yeniden denenir. Anlam
+    olarak parse_api_datetime(aware=False) ile aynıdır.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    try:
+        parsed = pd.to_datetime(series, format='ISO8601', errors='coerce')
+    except ValueError:
+        parsed = None  # pandas 3: farklı saat dilimleri hata verir
+    if parsed is None or parsed.dtype == object:
+        # pandas 2.x farklı saat dilimlerinde hata yerine object sütun döndürür
+        text = series.astype('string').str.replace(_TZ_SUFFIX_RE, r'\1', regex=True)
+        parsed = pd.to_datetime(text, format='ISO8601', errors='coerce')
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.to_numpy(dtype='datetime64[us]')
+
+
+def parse_api_datetime_series(series: pd.Series) -> pd.Series:
+    """pandas sütunu için parse_api_datetime_array (indeks korunur)"""
+    return pd.Series(parse_api_datetime_array(series), index=series.index, name=series.name)
+
+
+def cache_info():
+    """Skaler ayrıştırıcı önbellek istatistikleri"""
+    return {
+        'datetime': _parse.cache_info()._asdict(),
+        'epoch': _epoch.cache_info()._asdict(),
+        'format': _format.cache_info()._asdict(),
+    }
@@ -1,5 +1,4 @@
 import streamlit as st
-import json
 import os
 import time
 import zipfile
@@ -8,9 +7,10 @@ from datetime import datetime, timedelta
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from bot import start_bot_thread, stop_bot, get_bot_status, update_api_key, start_withdrawal_listener, stop_withdrawal_listener, get_withdrawal_listener_status, get_withdrawal_notifications, update_telegram_chat_ids
-import requests
-import base64
+from query_log import get_query_log_store
+from log_sync import get_github_log_sync
+from log_control import get_log_control, LEVEL_NAMES
+from bot import start_bot_thread, stop_bot, get_bot_status, update_api_key, start_withdrawal_listener, stop_withdrawal_listener, get_withdrawal_listener_status, get_withdrawal_notifications, update_telegram_chat_ids, get_client_cache_stats, clear_client_cache, get_notifier_stats, get_fraud_precompute_stats
 from dotenv import load_dotenv, set_key
 # Token watcher ve auto updater import'ları - eğer modüller yoksa hata vermeden devam et
 try:
@@ -192,134 +192,48 @@ st.markdown("""
 
 class StreamlitControlPanel:
     def __init__(self):
-        self.logs_file = "logs.json"
+        self.log_store = get_query_log_store()
+        self.log_sync = get_github_log_sync()
         self.github_token = os.getenv('GITHUB_TOKEN')
         self.github_repo = os.getenv('GITHUB_REPO', 'https://github.com/Saxblue/telebot')
         
-    def load_logs(self):
-        """Logları yükle"""
+    def load_logs(self, limit=20):
+        """Son sorgu loglarını yükle (yalnızca gereken segmentler okunur)"""
         try:
-            if os.path.exists(self.logs_file):
-                with open(self.logs_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {"queries": []}
+            return {"queries": self.log_store.recent(limit)}
         except Exception as e:
             st.error(f"Log yükleme hatası: {e}")
             return {"queries": []}
     
-    def save_logs(self, logs):
-        """Logları kaydet"""
-        try:
-            with open(self.logs_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            st.error(f"Log kaydetme hatası: {e}")
-    
     def push_logs_to_github(self):
-        """Logları GitHub'a push et"""
+        """Bekleyen ve bugünkü log segmentlerini GitHub'a hemen push et"""
         try:
             if not self.github_token:
                 return False, "GitHub token bulunamadı"
-                
-            # logs.json dosyasını oku
-            with open(self.logs_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # GitHub API kullanarak dosyayı güncelle
-            repo_parts = self.github_repo.replace('https://github.com/', '').split('/')
-            owner, repo = repo_parts[0], repo_parts[1]
-            
-            url = f"https://api.github.com/repos/{owner}/{repo}/contents/logs.json"
-            headers = {
-                "Authorization": f"token {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            # Mevcut dosyayı al (SHA için)
-            response = requests.get(url, headers=headers)
-            sha = None
-            if response.status_code == 200:
-                sha = response.json().get('sha')
-            
-            # Dosyayı güncelle
-            encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
             
-            data = {
-                "message": f"Log güncelleme - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                "content": encoded_content
-            }
-            
-            if sha:
-                data["sha"] = sha
-            
-            response = requests.put(url, headers=headers, json=data)
-            
-            if response.status_code in [200, 201]:
-                return True, "Başarıyla GitHub'a yüklendi"
-            else:
-                return False, f"GitHub API hatası: {response.status_code}"
+            segment_path = self.log_store.segment_path(datetime.now().date())
+            return self.log_sync.push_now(segment_path)
                 
         except Exception as e:
             return False, f"GitHub push hatası: {e}"
     
-    def get_daily_statistics(self, logs):
-        """Günlük istatistikleri hesapla"""
-        queries = logs.get("queries", [])
-        
-        if not queries:
+    def get_daily_statistics(self):
+        """Günlük istatistikleri döndür (ön-toplanmış sayaçlardan, log boyutundan bağımsız)"""
+        try:
+            return self.log_store.get_statistics(datetime.now().date())
+        except Exception as e:
+            st.error(f"İstatistik hesaplama hatası: {e}")
             return {
                 "total_queries": 0,
                 "unique_users": 0,
                 "total_ids_queried": 0,
                 "avg_response_time": 0,
+                "p50_response_time": 0,
+                "p95_response_time": 0,
                 "queries_today": 0,
                 "top_users": [],
                 "hourly_distribution": {}
             }
-        
-        # Bugünün tarihi
-        today = datetime.now().date()
-        
-        # Bugünkü sorgular
-        today_queries = [
-            q for q in queries 
-            if datetime.fromisoformat(q["timestamp"]).date() == today
-        ]
-        
-        # İstatistikler
-        total_queries = len(queries)
-        unique_users = len(set(q["user_id"] for q in queries))
-        total_ids_queried = sum(q["query_count"] for q in queries)
-        avg_response_time = sum(q["response_time"] for q in queries) / len(queries) if queries else 0
-        queries_today = len(today_queries)
-        
-        # En aktif kullanıcılar
-        user_counts = {}
-        for q in queries:
-            user_id = q["user_id"]
-            username = q.get("username", f"User_{user_id}")
-            if user_id not in user_counts:
-                user_counts[user_id] = {"username": username, "count": 0, "total_ids": 0}
-            user_counts[user_id]["count"] += 1
-            user_counts[user_id]["total_ids"] += q["query_count"]
-        
-        top_users = sorted(user_counts.values(), key=lambda x: x["count"], reverse=True)[:5]
-        
-        # Saatlik dağılım
-        hourly_distribution = {}
-        for q in today_queries:
-            hour = datetime.fromisoformat(q["timestamp"]).hour
-            hourly_distribution[hour] = hourly_distribution.get(hour, 0) + 1
-        
-        return {
-            "total_queries": total_queries,
-            "unique_users": unique_users,
-            "total_ids_queried": total_ids_queried,
-            "avg_response_time": avg_response_time,
-            "queries_today": queries_today,
-            "top_users": top_users,
-            "hourly_distribution": hourly_distribution
-        }
     
     def create_project_zip(self):
         """Proje ZIP dosyası oluştur"""
@@ -331,10 +245,30 @@ class StreamlitControlPanel:
                 files_to_include = [
                     'bot.py',
                     'app.py',
-                    'requirements.txt',
-                    'logs.json'
+                    'backoffice_client.py',
+                    'client_cache.py',
+                    'query_log.py',
+                    'excel_export.py',
+                    'event_pipeline.py',
+                    'notification_dispatcher.py',
+                    'notification_store.py',
+                    'dedup_store.py',
+                    'log_control.py',
+                    'frame_recorder.py',
+                    'bench_listener.py',
+                    'turnover.py',
+                    'fraud_precompute.py',
+                    'login_history.py',
+                    'api_datetime.py',
+                    'bench_datetime.py',
+                    'log_sync.py',
+                    'requirements.txt'
                 ]
                 
+                # Günlük sorgu log segmentleri
+                for day in self.log_store.list_days():
+                    files_to_include.append(self.log_store.segment_path(day))
+                
                 for file_name in files_to_include:
                     if os.path.exists(file_name):
                         zip_file.write(file_name, file_name)
@@ -463,6 +397,61 @@ def main():
         with col3:
             st.info(f"📊 {notifications_count} Bildirim")
         
+        # İşlem hattı kuyruk derinliği ve aşama süreleri
+        pipeline_stats = withdrawal_status.get('pipeline')
+        if pipeline_stats:
+            latency = pipeline_stats.get('latency', {})
+            st.caption(
+                f"📥 Kuyruk: {pipeline_stats.get('frame_queue_depth', 0)}/{pipeline_stats.get('frame_queue_capacity', 0)} • "
+                f"Teslim: {sum(pipeline_stats.get('event_queue_depths', []))} • "
+                f"Düşürülen: {pipeline_stats.get('frames_dropped', 0)} • "
+                f"Bekleme p95: {latency.get('queue_wait', {}).get('p95', 0) * 1000:.0f}ms • "
+                f"Teslim p95: {latency.get('delivery', {}).get('p95', 0) * 1000:.0f}ms"
+            )
+        
+        frame_stats = withdrawal_status.get('frames')
+        if frame_stats:
+            fast_dropped = frame_stats.get('heartbeat', 0) + frame_stats.get('control', 0) + \
+                frame_stats.get('other_method', 0) + frame_stats.get('ignored', 0)
+            st.caption(
+                f"⚡ Hızlı yol: {frame_stats.get('total', 0)} çerçeve • {fast_dropped} elendi "
+                f"(heartbeat {frame_stats.get('heartbeat', 0)}, kontrol {frame_stats.get('control', 0)}, "
+                f"diğer {frame_stats.get('other_method', 0) + frame_stats.get('ignored', 0)}) • "
+                f"çözülen {frame_stats.get('decoded', 0)} • "
+                f"çekim {frame_stats.get('withdrawal', 0)} • yatırım {frame_stats.get('deposit', 0)}"
+            )
+        
+        dedup_stats = withdrawal_status.get('dedup')
+        if dedup_stats:
+            st.caption(
+                f"🧹 Tekrar önleme: çekim {dedup_stats['withdrawal'].get('size', 0)} ID "
+                f"({dedup_stats['withdrawal'].get('hits', 0)} tekrar engellendi) • "
+                f"yatırım {dedup_stats['deposit'].get('size', 0)} ID "
+                f"({dedup_stats['deposit'].get('hits', 0)} tekrar engellendi)"
+            )
+        
+        notifier_stats = get_notifier_stats()
+        if notifier_stats:
+            st.caption(
+                f"📤 Telegram: {notifier_stats.get('sent', 0)} gönderildi • "
+                f"{notifier_stats.get('outstanding', 0)} bekliyor • "
+                f"{notifier_stats.get('failed', 0)} hatalı • "
+                f"Flood bekleme: {notifier_stats.get('retry_after', 0)} • "
+                f"Özet: {notifier_stats.get('digests', 0)} ({notifier_stats.get('coalesced', 0)} uyarı) • "
+                f"Teslim p95: {notifier_stats.get('latency', {}).get('p95', 0) * 1000:.0f}ms"
+            )
+        
+        precompute_stats = get_fraud_precompute_stats()
+        if precompute_stats.get('enabled'):
+            st.caption(
+                f"🚨 Fraud ön hesaplama: {precompute_stats.get('completed', 0)} hazır • "
+                f"{precompute_stats.get('pending', 0)} bekliyor • "
+                f"{precompute_stats.get('failed', 0)} hatalı • "
+                f"{precompute_stats.get('dropped', 0)} düşürüldü • "
+                f"Önbellek: {precompute_stats.get('cache_size', 0)} rapor ({precompute_stats.get('cache_hits', 0)} isabet) • "
+                f"p95: {precompute_stats.get('p95', 0):.1f}s"
+            )
+        
         # Withdrawal listener kontrol butonları
         col1, col2 = st.columns(2)
         
@@ -582,6 +571,8 @@ def main():
         if notifications_count > 0:
             st.markdown("### 📋 Son Çekim Bildirimleri")
             notifications = get_withdrawal_notifications(5)
+            last_hour = get_withdrawal_notifications(None, since=datetime.now() - timedelta(hours=1))
+            st.caption(f"⏱️ Son 1 saatte {len(last_hour)} çekim talebi")
             
             for i, notification in enumerate(reversed(notifications)):
                 with st.expander(f"🔔 {notification.get('client_name', 'N/A')} - {notification.get('amount', 0)} {notification.get('currency', 'TRY')}"):
@@ -894,7 +885,7 @@ auto_token_updater.py
     # Ana içerik
     # Logları yükle
     logs = control_panel.load_logs()
-    stats = control_panel.get_daily_statistics(logs)
+    stats = control_panel.get_daily_statistics()
     
     # Genel istatistikler
     st.markdown("## 📊 Genel İstatistikler")
@@ -923,7 +914,9 @@ auto_token_updater.py
     with col4:
         st.metric(
             label="⏱️ Ortalama Yanıt Süresi",
-            value=f"{stats['avg_response_time']:.2f}s"
+            value=f"{stats['avg_response_time']:.2f}s",
+            delta=f"p95 ≤ {stats['p95_response_time']:.0f}s",
+            delta_color="off"
         )
     
     # Grafikler
@@ -971,6 +964,61 @@ auto_token_updater.py
         else:
             st.info("Henüz kullanıcı verisi yok")
     
+    # Müşteri önbelleği istatistikleri
+    st.markdown("## ⚡ Müşteri Önbelleği")
+    
+    cache_stats = get_client_cache_stats()
+    if cache_stats:
+        col1, col2, col3, col4 = st.columns(4)
+        for col, key, label in ((col1, 'profile', "👤 Profil"), (col2, 'kpi', "💰 KPI"), (col3, 'login', "🔎 Kullanıcı Adı")):
+            cs = cache_stats.get(key, {})
+            with col:
+                st.metric(
+                    label=f"{label} Hit Oranı",
+                    value=f"{cs.get('hit_ratio', 0) * 100:.1f}%",
+                    delta=f"{cs.get('hits', 0)} hit / {cs.get('misses', 0)} miss",
+                    delta_color="off"
+                )
+                st.caption(f"Kayıt: {cs.get('size', 0)}/{cs.get('max_size', 0)} • TTL: {cs.get('ttl', 0):.0f}s • Çıkarılan: {cs.get('evictions', 0)}")
+        with col4:
+            if st.button("🗑️ Önbelleği Temizle"):
+                clear_client_cache()
+                st.success("✅ Önbellek temizlendi!")
+                st.rerun()
+        
+        history_stats = cache_stats.get('login_history', {})
+        if history_stats:
+            st.caption(
+                f"🕑 Giriş geçmişi: {history_stats.get('clients', 0)} müşteri • "
+                f"{history_stats.get('sessions', 0)} oturum • "
+                f"{history_stats.get('full_fetches', 0)} tam / {history_stats.get('delta_fetches', 0)} delta sorgu • "
+                f"{history_stats.get('rows_received', 0)} satır alındı ({history_stats.get('rows_added', 0)} yeni)"
+            )
+    else:
+        st.info("Bot çalışmıyor - önbellek istatistiği yok")
+    
+    # Bileşen log seviyeleri (çalışma anında değiştirilebilir)
+    st.markdown("## 📝 Log Seviyeleri")
+    
+    log_control = get_log_control()
+    levels = log_control.get_levels()
+    log_stats = log_control.get_stats()
+    level_cols = st.columns(len(levels))
+    for col, (component, level) in zip(level_cols, levels.items()):
+        with col:
+            selected = st.selectbox(
+                component,
+                LEVEL_NAMES,
+                index=LEVEL_NAMES.index(level) if level in LEVEL_NAMES else 1,
+                key=f"log_level_{component}"
+            )
+            if selected != level:
+                log_control.set_level(component, selected)
+            cs = log_stats.get(component)
+            if cs:
+                st.caption(f"Yazılan: {cs['emitted']} • Atlanan: {cs['suppressed']}")
+    st.caption(f"🔇 Toplam atlanan log mesajı: {log_control.total_suppressed()}")
+    
     # Son sorgular tablosu
     st.markdown("## 📋 Son Sorgular")
     
@@ -1019,7 +1067,7 @@ auto_token_updater.py
         st.markdown("### Dosya Durumu")
         files_status = {
             "bot.py": "✅ Mevcut" if os.path.exists("bot.py") else "❌ Eksik",
-            "logs.json": "✅ Mevcut" if os.path.exists("logs.json") else "❌ Eksik",
+            "logs/": "✅ Mevcut" if control_panel.log_store.list_days() else "❌ Eksik",
             "requirements.txt": "✅ Mevcut" if os.path.exists("requirements.txt") else "❌ Eksik"
         }
         
@@ -0,0 +1,392 @@
+"""
+BetConstruct Backoffice HTTP İstemcisi
+Bot handler'larının event loop'u bloklamadan backoffice API'sine erişmesi için
+paylaşımlı bağlantı havuzlu asenkron istemci ve thread'lerden yapılan çağrılar
+için keep-alive destekli senkron oturum.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+BASE_API_URL = "https://backofficewebadmin.betconstruct.com/api/tr/Client"
+
+# Endpoint bazlı zaman aşımı (saniye) - ağır sorgular daha uzun süre alır
+DEFAULT_TIMEOUTS = {
+    'GetClientById': 15,
+    'GetClientKpi': 15,
+    'GetClients': 30,
+    'GetClientLogins': 30,
+    'GetClientBonuses': 20,
+    'GetClientTransactionsByAccount': 60,
+    'ResetPassword': 30,
+}
+
+
+def build_headers(api_key: str) -> Dict[str, str]:
+    """Backoffice API için standart header'ları üret"""
+    return {
+        "Authentication": api_key,
+        "Accept": "application/json, text/plain, */*",
+        "Content-Type": "application/json;charset=UTF-8",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+        "Referer": "https://backoffice.betconstruct.com/",
+        "Origin": "https://backoffice.betconstruct.com",
+    }
+
+
+def timeout_for(endpoint: str, timeouts: Dict[str, float], default: float) -> float:
+    """Endpoint adı veya tam URL için zaman aşımını döndür"""
+    name = endpoint.split('?')[0].rstrip('/').split('/')[-1]
+    return timeouts.get(name, default)
+
+
+def build_client_search_payload(login: str) -> Dict[str, Any]:
+    """GetClients için yalnızca Login alanı dolu arama gövdesi"""
+    return {
+        "Id": "",
+        "FirstName": "",
+        "LastName": "",
+        "PersonalId": "",
+        "Email": "",
+        "Phone": "",
+        "ZipCode": None,
+        "AMLRisk": "",
+        "AffilateId": None,
+        "AffiliatePlayerType": None,
+        "BTag": None,
+        "BetShopGroupId": "",
+        "BirthDate": None,
+        "CashDeskId": None,
+        "CasinoProfileId": None,
+        "CasinoProfitnessFrom": None,
+        "CasinoProfitnessTo": None,
+        "City": "",
+        "ClientCategory": None,
+        "CurrencyId": None,
+        "DocumentNumber": "",
+        "ExternalId": "",
+        "Gender": None,
+        "IBAN": None,
+        "IsEmailSubscribed": None,
+        "IsLocked": None,
+        "IsOrderedDesc": True,
+        "IsSMSSubscribed": None,
+        "IsSelfExcluded": None,
+        "IsStartWithSearch": False,
+        "IsTest": None,
+        "IsVerified": None,
+        "Login": login,
+        "MaxBalance": None,
+        "MaxCreatedLocal": None,
+        "MaxCreatedLocalDisable": True,
+        "MaxFirstDepositDateLocal": None,
+        "MaxLastTimeLoginDateLocal": None,
+        "MaxLastWrongLoginDateLocal": None,
+        "MaxLoyaltyPointBalance": None,
+        "MaxRows": 20,
+        "MaxVerificationDateLocal": None,
+        "MaxWrongLoginAttempts": None,
+        "MiddleName": "",
+        "MinBalance": None,
+        "MinCreatedLocal": None,
+        "MinCreatedLocalDisable": True,
+        "MinFirstDepositDateLocal": None,
+        "MinLastTimeLoginDateLocal": None,
+        "MinLastWrongLoginDateLocal": None,
+        "MinLoyaltyPointBalance": None,
+        "MinVerificationDateLocal": None,
+        "MinWrongLoginAttempts": None,
+        "MobilePhone": "",
+        "NickName": "",
+        "OrderedItem": 1,
+        "OwnerId": None,
+        "PartnerClientCategoryId": None,
+        "RegionId": None,
+        "RegistrationSource": None,
+        "SelectedPepStatuses": "",
+        "SkeepRows": 0,
+        "SportProfitnessFrom": None,
+        "SportProfitnessTo": None,
+        "Status": None,
+        "Time": "",
+        "TimeZone": "",
+    }
+
+
+class AsyncBackofficeClient:
+    """Backoffice API için asenkron, bağlantı havuzlu istemci"""
+
+    def __init__(self,
+                 api_key: str,
+                 base_url: str = BASE_API_URL,
+                 max_connections: int = 20,
+                 max_keepalive_connections: int = 10,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = 30):
+        """
+        Args:
+            api_key: Backoffice Authentication anahtarı
+            base_url: Client API kök adresi
+            max_connections: Havuzdaki maksimum eşzamanlı bağlantı
+            max_keepalive_connections: Açık tutulacak boştaki bağlantı sayısı
+            timeouts: Endpoint adı → zaman aşımı eşlemesi
+            default_timeout: Eşlemede olmayan endpoint'ler için zaman aşımı
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.default_timeout = default_timeout
+
+        # httpx.AsyncClient oluşturulduğu event loop'a bağlıdır
+        self._client = None
+        self._client_loop = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Çalışan event loop için paylaşımlı AsyncClient döndür"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is not loop:
+            await self._close_stale_client()
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.default_timeout)
+            self._client_loop = loop
+        return self._client
+
+    async def _close_stale_client(self):
+        """Başka bir event loop'a ait istemciyi bırakmadan önce kapat (bağlantı havuzu sızmasın)"""
+        client, old_loop = self._client, self._client_loop
+        self._client = None
+        self._client_loop = None
+        try:
+            await self._close_client(client, old_loop)
+        except Exception as e:
+            logger.error(f"Eski backoffice istemcisi kapatma hatası: {e}")
+
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        """İstemciyi bağlı olduğu event loop'ta kapat"""
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        elif loop is not None and loop.is_running() and not loop.is_closed():
+            # Loop başka thread'de çalışıyor: transport'lar yalnızca orada kapatılabilir
+            future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            await asyncio.wait_for(asyncio.wrap_future(future), timeout=10)
+        else:
+            # Loop kapanmış: transport'ları kapatacak loop yok, soketler çöp toplayıcıya kalır
+            logger.warning("Backoffice istemcisi event loop'u kapanmadan önce kapatılmamış (aclose çağrılmalı)")
+
+    def timeout_for(self, endpoint: str) -> float:
+        """Endpoint için zaman aşımını döndür"""
+        return timeout_for(endpoint, self.timeouts, self.default_timeout)
+
+    async def request(self,
+                      method: str,
+                      endpoint: str,
+                      *,
+                      params: Optional[Dict[str, Any]] = None,
+                      json: Any = None,
+                      timeout: Optional[float] = None,
+                      api_key: Optional[str] = None) -> httpx.Response:
+        """
+        Backoffice isteği gönder; 401 dönerse Bearer header ile bir kez tekrar dener.
+
+        Args:
+            method: HTTP metodu (GET/POST)
+            endpoint: Client API altındaki endpoint adı (örn. 'GetClientKpi')
+            params: Query parametreleri
+            json: JSON gövde
+            timeout: Endpoint varsayılanını ezmek için zaman aşımı
+            api_key: Varsayılan anahtar yerine kullanılacak anahtar
+        """
+        client = await self._get_client()
+        url = f"{self.base_url}/{endpoint}"
+        key = api_key or self.api_key
+        headers = build_headers(key)
+        request_timeout = timeout if timeout is not None else self.timeout_for(endpoint)
+
+        response = await client.request(method, url, params=params, json=json,
+                                        headers=headers, timeout=request_timeout)
+        if response.status_code == 401:
+            headers["Authorization"] = f"Bearer {key}"
+            response = await client.request(method, url, params=params, json=json,
+                                            headers=headers, timeout=request_timeout)
+        return response
+
+    async def get(self, endpoint: str, **kwargs) -> httpx.Response:
+        """GET isteği"""
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> httpx.Response:
+        """POST isteği"""
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def aclose(self):
+        """Bağlantı havuzunu kapat"""
+        client, self._client = self._client, None
+        if client is None or client.is_closed:
+            return
+        try:
+            await self._close_client(client, self._client_loop)
+        except Exception as e:
+            logger.error(f"Backoffice istemcisi kapatma hatası: {e}")
+        finally:
+            self._client_loop = None
+
+
+class BackofficeSession:
+    """Senkron çağrılar için paylaşımlı, keep-alive destekli backoffice oturumu"""
+
+    def __init__(self,
+                 api_key: str = "",
+                 base_url: str = BASE_API_URL,
+                 pool_size: int = 20,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = 30):
+        """
+        Args:
+            api_key: Backoffice Authentication anahtarı
+            base_url: Client API kök adresi
+            pool_size: Host başına açık tutulacak bağlantı sayısı
+            max_retries: Bağlantı hatası ve 502/503/504 için tekrar sayısı
+            backoff_factor: Tekrarlar arası üstel bekleme katsayısı
+            timeouts: Endpoint adı → zaman aşımı eşlemesi
+            default_timeout: Eşlemede olmayan URL'ler için zaman aşımı
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.default_timeout = default_timeout
+
+        # POST'lar (ör. ResetPassword) idempotent değil; yalnızca GET için
+        # durum koduna göre tekrar, bağlantı kurulamazsa her metot için tekrar
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size,
+                                   max_retries=retry, pool_block=False)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._auth_retry_count = 0
+
+    def request(self,
+                method: str,
+                url: str,
+                *,
+                headers: Optional[Dict[str, str]] = None,
+                auth: bool = True,
+                timeout: Optional[float] = None,
+                api_key: Optional[str] = None,
+                **kwargs) -> requests.Response:
+        """
+        Backoffice isteği gönder.
+
+        Args:
+            method: HTTP metodu
+            url: Client API endpoint adı (örn. 'GetClients') veya tam URL
+            headers: Ek/ezen header'lar
+            auth: True ise Authentication header eklenir ve 401'de Bearer ile tekrar denenir
+            timeout: Varsayılan zaman aşımını ezmek için
+            api_key: Varsayılan anahtar yerine kullanılacak anahtar
+        """
+        if not url.startswith('http'):
+            url = f"{self.base_url}/{url}"
+        key = api_key or self.api_key
+        req_headers = build_headers(key) if auth else {}
+        if headers:
+            req_headers.update(headers)
+        if timeout is None:
+            timeout = timeout_for(url, self.timeouts, self.default_timeout)
+
+        with self._lock:
+            self._request_count += 1
+        response = self.session.request(method, url, headers=req_headers, timeout=timeout, **kwargs)
+
+        if auth and response.status_code == 401:
+            req_headers["Authorization"] = f"Bearer {key}"
+            with self._lock:
+                self._request_count += 1
+                self._auth_retry_count += 1
+            response = self.session.request(method, url, headers=req_headers, timeout=timeout, **kwargs)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET isteği"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST isteği"""
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bağlantı havuzu ve handshake tekrar kullanım sayaçları"""
+        opened = 0
+        pool_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            opened += getattr(pool, 'num_connections', 0)
+            pool_requests += getattr(pool, 'num_requests', 0)
+
+        return {
+            'requests': self._request_count,
+            'auth_retries': self._auth_retry_count,
+            'connections_opened': opened,
+            'connections_reused': max(0, pool_requests - opened),
+            'reuse_ratio': (pool_requests - opened) / pool_requests if pool_requests else 0.0,
+            'pool_size': self.pool_size,
+        }
+
+    def close(self):
+        """Oturumu ve havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+
+# Global session instance
+_global_session = None
+_global_session_lock = threading.Lock()
+
+def get_backoffice_session() -> BackofficeSession:
+    """Global backoffice oturumunu döndür (ayarlar .env'den okunur)"""
+    global _global_session
+    with _global_session_lock:
+        if _global_session is None:
+            _global_session = BackofficeSession(
+                pool_size=int(os.getenv('BACKOFFICE_POOL_SIZE', '20')),
+                max_retries=int(os.getenv('BACKOFFICE_MAX_RETRIES', '3')),
+                backoff_factor=float(os.getenv('BACKOFFICE_BACKOFF', '0.5'))
+            )
+        return _global_session
@@ -0,0 +1,218 @@
+"""
+Tarih Ayrıştırma Hız Ölçümü
+api_datetime'ın skaler (önbellekli) ve vektörel ayrıştırıcılarını botta
+önceden kullanılan yöntemlerle gerçekçi payload biçimlerinde karşılaştırır:
+GetClientLogins oturum zamanları (saat dilimli, kesirli/kesirsiz), müşteri
+profili/KPI tarihleri (Excel satırları, tekrar eden değerler) ve işlem
+listesi CreatedLocal sütunu (3 ve 7 haneli kesirler). Eski yöntemin
+ayrıştırabildiği her değerde sonuçların aynı olduğu da kontrol edilir.
+
+Kullanım:
+    python bench_datetime.py --rows 20000
+    python bench_datetime.py --rows 50000 --repeat 5 --json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import api_datetime
+from api_datetime import format_api_datetime, parse_api_datetime, parse_api_datetime_array, parse_api_epoch
+
+
+# ---- Eski yöntemler (karşılaştırma için) ----
+
+def old_parse_api_datetime(date_str) -> Optional[datetime]:
+    """Eski KPIBot.parse_api_datetime: iki strptime denemesi, kesirsizde ValueError"""
+    try:
+        if not date_str:
+            return None
+        clean_date = date_str.split('+')[0]
+        try:
+            return datetime.strptime(clean_date, '%Y-%m-%dT%H:%M:%S.%f')
+        except ValueError:
+            return datetime.strptime(clean_date, '%Y-%m-%dT%H:%M:%S')
+    except Exception:
+        return None
+
+
+def old_fmt_dt(s) -> str:
+    """Eski KPIBot.fmt_dt"""
+    if not s or s == 'Bilinmiyor':
+        return 'Bilinmiyor'
+    try:
+        return datetime.fromisoformat(str(s).split('+')[0]).strftime('%d.%m.%Y %H:%M')
+    except Exception:
+        return str(s)
+
+
+def old_parse_column(values: List[str]) -> np.ndarray:
+    """Eski çevrim analizi: pandas metin bölme + to_datetime"""
+    series = pd.Series(values, dtype=object)
+    return pd.to_datetime(series.str.split('.').str[0], errors='coerce').to_numpy(dtype='datetime64[us]')
+
+
+# ---- Gerçekçi payload biçimleri ----
+
+def _stamp(rng: random.Random, base: datetime, fraction_digits: int, suffix: str) -> str:
+    value = base - timedelta(seconds=rng.randint(0, 90 * 86400), microseconds=rng.randint(0, 999999))
+    text = value.strftime('%Y-%m-%dT%H:%M:%S')
+    if fraction_digits:
+        text += '.' + f"{value.microsecond:06d}{rng.randint(0, 9)}"[:fraction_digits]
+    return text + suffix
+
+
+def login_times(count: int, rng: random.Random) -> List[Optional[str]]:
+    """GetClientLogins StartTime/EndTime: saat dilimli, kesirli/kesirsiz, açık oturumlar None"""
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    out = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            out.append(None)
+        else:
+            out.append(_stamp(rng, now, rng.choice((0, 3, 7)), rng.choice(('+04:00', '+03:00', ''))))
+    return out
+
+
+def profile_dates(count: int, rng: random.Random) -> List[str]:
+    """Profil/KPI tarihleri (Excel satırı başına ~6 alan, doğum tarihleri sık tekrar eder)"""
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    births = [f"{rng.randint(1960, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00" for _ in range(500)]
+    out = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            out.append(rng.choice(births))
+        else:
+            out.append(_stamp(rng, now, rng.choice((0, 3)), ''))
+    return out
+
+
+def transaction_dates(count: int, rng: random.Random) -> List[str]:
+    """İşlem listesi CreatedLocal (3 ve 7 haneli kesir)"""
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    return [_stamp(rng, now, rng.choice((3, 7)), '') for _ in range(count)]
+
+
+# ---- Ölçüm ----
+
+def _time(func: Callable, values, repeat: int) -> float:
+    """En iyi tekrarın değer başına süresi (µs)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(values)
+        best = min(best, time.perf_counter() - started)
+    return best / max(1, len(values)) * 1e6
+
+
+def _scalar(parse: Callable) -> Callable:
+    return lambda values: [parse(value) for value in values]
+
+
+def _clear_cache():
+    api_datetime._parse.cache_clear()
+    api_datetime._epoch.cache_clear()
+    api_datetime._format.cache_clear()
+
+
+def _cold(parse: Callable) -> Callable:
+    def run(values):
+        _clear_cache()
+        return [parse(value) for value in values]
+    return run
+
+
+def check(values: List[Optional[str]]) -> Dict[str, int]:
+    """Eski yöntemin ayrıştırdığı değerlerde sonuç aynı mı"""
+    same = differ = recovered = 0
+    for value in values:
+        old, new = old_parse_api_datetime(value), parse_api_datetime(value)
+        if old is None:
+            recovered += new is not None
+        elif old == new:
+            same += 1
+        else:
+            differ += 1
+    vector = parse_api_datetime_array(values)
+    scalar = [parse_api_datetime(value) for value in values]
+    vector_mismatch = sum(
+        1 for v, s in zip(vector, scalar)
+        if not ((np.isnat(v) and s is None) or (s is not None and v == np.datetime64(s, 'us')))
+    )
+    return {'same': same, 'differ': differ, 'recovered': recovered, 'vector_mismatch': vector_mismatch}
+
+
+def run(rows: int, repeat: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    logins = login_times(rows, rng)
+    profiles = profile_dates(rows, rng)
+    transactions = transaction_dates(rows, rng)
+
+    results = {
+        'logins': {
+            'old_parse_us': _time(_scalar(old_parse_api_datetime), logins, repeat),
+            'new_parse_cold_us': _time(_cold(parse_api_datetime), logins, repeat),
+            'new_parse_warm_us': _time(_scalar(parse_api_datetime), logins, repeat),
+            'new_epoch_cold_us': _time(_cold(parse_api_epoch), logins, repeat),
+            'check': check(logins),
+        },
+        'profiles': {
+            'old_fmt_dt_us': _time(_scalar(old_fmt_dt), profiles, repeat),
+            'new_fmt_cold_us': _time(_cold(format_api_datetime), profiles, repeat),
+            'new_fmt_warm_us': _time(_scalar(format_api_datetime), profiles, repeat),
+            'check': check(profiles),
+        },
+        'transactions': {
+            'old_column_us': _time(old_parse_column, transactions, repeat),
+            'old_scalar_us': _time(_scalar(old_parse_api_datetime), transactions, repeat),
+            'new_vector_us': _time(parse_api_datetime_array, transactions, repeat),
+            'check': check(transactions),
+        },
+    }
+    ok = all(section['check']['differ'] == 0 and section['check']['vector_mismatch'] == 0 for section in results.values())
+    return {'rows': rows, 'repeat': repeat, 'ok': ok, 'results': results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tarih ayrıştırma hız ölçümü (eski yöntemler vs api_datetime)")
+    parser.add_argument('--rows', type=int, default=20000, help="Her payload türü için değer sayısı")
+    parser.add_argument('--repeat', type=int, default=3, help="Ölçüm tekrarı (en iyisi raporlanır)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Sonucu JSON olarak yazdır")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.repeat, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0 if result['ok'] else 1
+
+    r = result['results']
+    logins, profiles, transactions = r['logins'], r['profiles'], r['transactions']
+    print(f"Değer sayısı: {args.rows} / tür • en iyi {args.repeat} tekrar (değer başına µs)")
+    print(f"Giriş zamanları   eski {logins['old_parse_us']:.2f} • yeni soğuk {logins['new_parse_cold_us']:.2f} "
+          f"• yeni sıcak {logins['new_parse_warm_us']:.2f} • epoch soğuk {logins['new_epoch_cold_us']:.2f} "
+          f"({logins['old_parse_us'] / logins['new_parse_cold_us']:.1f}x)")
+    print(f"Profil (fmt_dt)   eski {profiles['old_fmt_dt_us']:.2f} • yeni soğuk {profiles['new_fmt_cold_us']:.2f} "
+          f"• yeni sıcak {profiles['new_fmt_warm_us']:.2f} "
+          f"({profiles['old_fmt_dt_us'] / profiles['new_fmt_warm_us']:.1f}x sıcak)")
+    print(f"İşlem sütunu      eski pandas {transactions['old_column_us']:.2f} • eski skaler {transactions['old_scalar_us']:.2f} "
+          f"• yeni vektörel {transactions['new_vector_us']:.2f} "
+          f"({transactions['old_column_us'] / transactions['new_vector_us']:.1f}x)")
+    for name, section in r.items():
+        c = section['check']
+        print(f"  {name:<13} aynı {c['same']} • farklı {c['differ']} • eskide ayrıştırılamayan {c['recovered']} "
+              f"• vektörel/skaler uyuşmazlık {c['vector_mismatch']}")
+    if not result['ok']:
+        print("❌ Yeni ayrıştırıcı eski sonuçlardan farklı değer üretti")
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Çekim İzleyici Tekrar Oynatma / Hız Ölçümü
+Kaydedilmiş (FrameRecorder) veya sentetik SignalR çerçevelerini
+WithdrawalListener.on_message'a besler; Telegram gönderimi sahte bir
+göndericiyle sayılır. Saniyede çerçeve, aşama gecikme yüzdelikleri, hızlı yol
+sayaçları ve gönderilen uyarı sayıları raporlanır. Sentetik modda beklenen
+uyarı sayısıyla karşılaştırılır (tekrar önleme kontrolü).
+
+Kullanım:
+    python bench_listener.py --frames 50000
+    python bench_listener.py --input frames.jsonl --repeat 2
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+class StubNotifier:
+    """Telegram'a gitmeden broadcast çağrılarını sayan gönderici"""
+
+    def __init__(self):
+        self.alerts = {'withdrawal': 0, 'deposit': 0}
+
+    def broadcast(self, chat_ids, text, parse_mode='HTML', **kwargs):
+        kind = 'withdrawal' if 'ÇEKİM' in text else 'deposit'
+        self.alerts[kind] += 1
+        return []
+
+
+class StubBot:
+    """Listener'ın kullandığı KPIBot alanlarının sahtesi"""
+
+    def __init__(self):
+        self.application = True
+        self.telegram_chat_ids = [1]
+        self.notifier = StubNotifier()
+
+
+def _hub_frame(arg: str) -> str:
+    return json.dumps({
+        'C': 'd-bench',
+        'M': [{'H': 'commonnotificationhub', 'M': 'notification', 'A': [arg]}]
+    })
+
+
+def synthetic_frames(count: int, seed: int = 42) -> Tuple[List[str], Dict[str, int]]:
+    """Gerçekçi karışımda çerçeveler ve beklenen uyarı sayıları"""
+    rng = random.Random(seed)
+    frames = []
+    withdrawals_sent = set()
+    deposits_sent = set()
+    withdrawal_ids = []
+    deposit_ids = []
+    next_id = 1000000
+
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.50:
+            frames.append('{}')
+        elif roll < 0.60:
+            frames.append(json.dumps({'C': 'd-bench', 'S': 1, 'M': []}))
+        elif roll < 0.85:
+            frames.append(_hub_frame(json.dumps({
+                'Type': rng.choice((1, 5, 7, 24)), 'OperationType': rng.choice((1, 2)),
+                'Object': {'Type': rng.choice((1, 4, 6)), 'Id': rng.randint(1, 10 ** 6)}
+            })))
+        elif roll < 0.95:
+            # %30 tekrar (yeniden bağlanma/replay), %20 yeni olmayan durum
+            if withdrawal_ids and rng.random() < 0.3:
+                wid = rng.choice(withdrawal_ids)
+            else:
+                next_id += 1
+                wid = next_id
+                withdrawal_ids.append(wid)
+            state = 0 if rng.random() < 0.8 else rng.choice((1, 2, 3))
+            if state == 0:
+                withdrawals_sent.add(wid)
+            frames.append(_hub_frame(json.dumps({
+                'Type': 3, 'OperationType': 1,
+                'Object': {
+                    'Id': wid, 'Amount': rng.randint(100, 50000), 'State': state,
+                    'ClientId': rng.randint(1, 10 ** 6), 'ClientLogin': f'user{wid}',
+                    'ClientFirstName': 'Test', 'ClientLastName': 'Kullanıcı',
+                    'CurrencyId': 'TRY', 'PaymentSystemName': 'Havale',
+                    'Info': 'IBAN:TR000000000000000000000000, Banka', 'BTag': '0',
+                    'RequestTimeLocal': '2025-01-01T12:00:00'
+                }
+            })))
+        else:
+            if deposit_ids and rng.random() < 0.3:
+                did = rng.choice(deposit_ids)
+            else:
+                next_id += 1
+                did = next_id
+                deposit_ids.append(did)
+            deposits_sent.add(did)
+            frames.append(_hub_frame(json.dumps({
+                'Type': 5, 'OperationType': 1,
+                'Object': {'Type': 2, 'Id': did, 'Amount': rng.randint(100, 50000), 'CurrencyId': 'TRY',
+                           'ClientLogin': f'user{did}', 'PaymentSystemName': 'Havale'}
+            })))
+
+    return frames, {'withdrawal': len(withdrawals_sent), 'deposit': len(deposits_sent)}
+
+
+def run(frames: List[str]) -> Dict:
+    """Çerçeveleri listener'a besle, işlem hattı boşalana kadar bekle ve ölç"""
+    from bot import WithdrawalListener
+
+    stub = StubBot()
+    listener = WithdrawalListener(bot_instance=stub)
+    listener.pipeline.start()
+
+    started = time.perf_counter()
+    for frame in frames:
+        listener.on_message(None, frame)
+    submitted = time.perf_counter()
+    # stop(): kuyruktaki tüm çerçeveler işlenip teslim edildikten sonra döner
+    listener.pipeline.stop(timeout=None)
+    finished = time.perf_counter()
+
+    pipeline_stats = listener.pipeline.get_stats()
+    elapsed = finished - started
+    return {
+        'frames': len(frames),
+        'elapsed_sec': elapsed,
+        'frames_per_sec': len(frames) / elapsed if elapsed else 0,
+        'submit_per_sec': len(frames) / (submitted - started) if submitted > started else 0,
+        'frames_dropped': pipeline_stats['frames_dropped'],
+        'latency': pipeline_stats['latency'],
+        'frame_stats': dict(listener.frame_stats),
+        'alerts': dict(stub.notifier.alerts),
+    }
+
+
+def _format_latency(stats: Dict) -> str:
+    if 'p50' not in stats:
+        return "-"
+    return f"p50 {stats['p50'] * 1e6:.0f}µs • p95 {stats['p95'] * 1e6:.0f}µs • max {stats['max'] * 1e3:.1f}ms"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="WithdrawalListener tekrar oynatma / hız ölçümü")
+    parser.add_argument('--input', help="FrameRecorder kayıt dosyası (yoksa sentetik çerçeveler)")
+    parser.add_argument('--frames', type=int, default=20000, help="Sentetik çerçeve sayısı")
+    parser.add_argument('--repeat', type=int, default=1, help="Çerçeve dizisini kaç kez oynat (tekrar önleme kontrolü)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Sonucu JSON olarak yazdır")
+    parser.add_argument('--verbose', action='store_true', help="Listener loglarını göster")
+    args = parser.parse_args(argv)
+
+    # Ölçüm ortamı: kalıcı tekrar önleme kapalı, kuyruk tüm çerçeveleri alacak kadar büyük
+    os.environ['DEDUP_DIR'] = ''
+    os.environ.pop('LISTENER_RECORD_FILE', None)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        from log_control import get_log_control
+        for component in ('bot', 'listener', 'signalr', 'pipeline'):
+            get_log_control().set_level(component, 'WARNING')
+
+    expected = None
+    if args.input:
+        from frame_recorder import iter_recorded_frames
+        frames = [frame for _, frame in iter_recorded_frames(args.input)]
+    else:
+        frames, expected = synthetic_frames(args.frames, args.seed)
+    frames = frames * max(1, args.repeat)
+    os.environ['LISTENER_QUEUE_SIZE'] = str(len(frames) + 1)
+
+    result = run(frames)
+    result['expected_alerts'] = expected
+    ok = expected is None or result['alerts'] == expected
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(f"Çerçeve: {result['frames']} ({result['frames_dropped']} düşürüldü) • "
+              f"Süre: {result['elapsed_sec']:.2f}s • {result['frames_per_sec']:,.0f} çerçeve/sn "
+              f"(besleme {result['submit_per_sec']:,.0f}/sn)")
+        for stage in ('queue_wait', 'parse', 'event_wait', 'delivery'):
+            print(f"  {stage:<11} {_format_latency(result['latency'][stage])}")
+        print(f"Hızlı yol: {result['frame_stats']}")
+        print(f"Uyarılar: {result['alerts']}" + (f" • beklenen: {expected}" if expected else ""))
+        if not ok:
+            print("❌ Uyarı sayısı beklenenle uyuşmuyor (tekrar önleme/ayrıştırma hatası)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
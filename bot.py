@@ -3,19 +3,38 @@ import json
 import asyncio
 import logging
 import requests
-import pandas as pd
 from datetime import datetime, timedelta
-from io import BytesIO
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 import pytz
 from dotenv import load_dotenv
 from signalr_client import SignalRClientThread
+from backoffice_client import AsyncBackofficeClient, build_client_search_payload, get_backoffice_session
+from client_cache import ClientProfileCache, LoginIndex, MISSING
+from event_pipeline import (
+    ARG_IGNORE, FRAME_CONTROL, FRAME_ERROR, FRAME_HEARTBEAT,
+    FramePipeline, classify_envelope, classify_notification_arg
+)
+from notification_dispatcher import NotificationDispatcher, PRIORITY_DEPOSIT, PRIORITY_INFO, PRIORITY_WITHDRAWAL
+from notification_store import WithdrawalNotificationStore
+from dedup_store import TTLDedupSet
+from frame_recorder import FrameRecorder
+from turnover import analyze_turnover, describe_main_games
+from excel_export import FRAUD_COLUMNS, StreamingExcelWriter
+from fraud_precompute import FraudPrecomputer
+from login_history import LoginHistoryStore
+from api_datetime import format_api_datetime, parse_api_datetime
+from query_log import get_query_log_store
+from log_sync import get_github_log_sync
+from log_control import get_component_logger
 import websocket
 import urllib.parse
 import re
+import html
 
 # .env dosyasını güvenli şekilde yükle
 try:
@@ -48,8 +67,13 @@ class WithdrawalListener:
         self.subscribe_token = os.getenv('WITHDRAWAL_SUBSCRIBE_TOKEN', 'cd39f2aa7eef4cd1882b94099916443622ebdda141d8c93258c780905aa47ad2')
         self.subscription_ids = [2, 3, 50]
         self.base_url = "https://backofficewebadmin.betconstruct.com"
+        self.log = get_component_logger('listener')
         
-        self.withdrawal_notifications = []
+        # Sabit kapasiteli, çekim/müşteri ID indeksli bildirim tamponu
+        self.withdrawal_notifications = WithdrawalNotificationStore(
+            capacity=int(os.getenv('WITHDRAWAL_NOTIFICATION_CAPACITY', '1000')),
+            spill_path=os.getenv('WITHDRAWAL_NOTIFICATION_SPILL_FILE') or None
+        )
         self.is_running = False
 
         # Keepalive & reconnect
@@ -59,14 +83,49 @@ class WithdrawalListener:
         self._watchdog_thread = None
         self._renew_timer = None
         self.renew_interval_sec = 600  # 10 dakika
-        # Deposit detection (cache processed IDs to avoid duplicates)
-        self.processed_deposit_ids = set()
+        # İşlenmiş ID'ler: zaman pencereli, boyut sınırlı ve yeniden başlatmaya dayanıklı
+        dedup_ttl = float(os.getenv('DEDUP_TTL_HOURS', '48')) * 3600
+        dedup_max = int(os.getenv('DEDUP_MAX_IDS', '50000'))
+        dedup_dir = os.getenv('DEDUP_DIR', 'state')
+        if dedup_dir:
+            os.makedirs(dedup_dir, exist_ok=True)
+        self.processed_deposit_ids = TTLDedupSet(
+            ttl=dedup_ttl, max_size=dedup_max, name="deposit-dedup",
+            persist_path=os.path.join(dedup_dir, 'processed_deposits.tsv') if dedup_dir else None
+        )
+        self.processed_withdrawal_ids = TTLDedupSet(
+            ttl=dedup_ttl, max_size=dedup_max, name="withdrawal-dedup",
+            persist_path=os.path.join(dedup_dir, 'processed_withdrawals.tsv') if dedup_dir else None
+        )
         # Mesaj biçimi
         self.use_html_format = True
         
-    def log_message(self, message):
-        """Log mesajı"""
-        logger.info(f"[WithdrawalListener] {message}")
+        # Ham çerçeve kaydı (opsiyonel, LISTENER_RECORD_FILE)
+        self.recorder = None
+        if os.getenv('LISTENER_RECORD_FILE'):
+            self.start_recording(
+                os.getenv('LISTENER_RECORD_FILE'),
+                max_frames=int(os.getenv('LISTENER_RECORD_MAX_FRAMES', '0')) or None
+            )
+        
+        # Hızlı yol sınıflandırıcı sayaçları (yalnızca ayrıştırma worker'ı yazar)
+        self.frame_stats = dict.fromkeys(
+            ('total', 'heartbeat', 'control', 'error', 'other_method', 'ignored',
+             'decoded', 'withdrawal', 'deposit', 'parse_error'), 0
+        )
+        
+        # Socket thread'i → ayrıştırma → teslim işlem hattı (sınırlı kuyruklar)
+        self.pipeline = FramePipeline(
+            parse=self._parse_frame,
+            deliver=self._deliver_event,
+            max_frames=int(os.getenv('LISTENER_QUEUE_SIZE', '10000')),
+            delivery_workers=int(os.getenv('LISTENER_DELIVERY_WORKERS', '2')),
+            name="withdrawal-listener"
+        )
+        
+    def log_message(self, message, level=logging.INFO):
+        """Log mesajı (bileşen seviyesi kapalıysa yazılmaz, yalnızca sayılır)"""
+        self.log.log(level, "[WithdrawalListener] %s", message)
 
     def _esc(self, s):
         """HTML için güvenli kaçış"""
@@ -90,7 +149,7 @@ class WithdrawalListener:
                 '_': str(int(time.time() * 1000))
             }
             
-            response = requests.get(url, params=params, headers=headers)
+            response = get_backoffice_session().get(url, params=params, headers=headers, auth=False)
             if response.status_code == 200:
                 data = response.json()
                 self.connection_token = data.get('ConnectionToken', '')
@@ -169,7 +228,7 @@ class WithdrawalListener:
                 'Cookie': self.cookie,
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            r = requests.get(start_url, params=params, headers=headers, timeout=10)
+            r = get_backoffice_session().get(start_url, params=params, headers=headers, auth=False, timeout=10)
             self.log_message(f"SignalR start yanıtı: {r.status_code}")
         except Exception as e:
             self.log_message(f"SignalR start hatası: {e}")
@@ -265,105 +324,114 @@ class WithdrawalListener:
         self._schedule_periodic_renew()
         
     def on_message(self, ws, message):
-        """WebSocket mesajı geldiğinde"""
+        """WebSocket mesajı geldiğinde - yalnızca ham çerçeveyi işlem hattına bırakır"""
+        if message.strip() != '{}':
+            self.last_ws_msg_time = time.time()
+        if self.recorder is not None:
+            self.recorder.record(message)
+        self.pipeline.submit(message)
+
+    def start_recording(self, path, max_frames=None):
+        """Gelen ham çerçeveleri dosyaya kaydetmeye başla (bench_listener.py ile oynatılır)"""
+        self.stop_recording()
+        self.recorder = FrameRecorder(path, max_frames=max_frames)
+        self.log_message(f"🎙️ Çerçeve kaydı başladı: {path}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+            self.log_message(f"🎙️ Çerçeve kaydı durdu: {recorder.recorded} çerçeve")
+
+    def _deliver_event(self, event):
+        """İşlem hattı teslim worker'ı: sınıflandırılmış olayı işle ve gönder"""
+        kind, payload = event
+        if kind == 'withdrawal':
+            raw_message, withdrawal_data = payload
+            self.process_withdrawal_notification(raw_message, withdrawal_data)
+        elif kind == 'deposit':
+            self.process_deposit_notification(payload)
+
+    def _parse_frame(self, message):
+        """İşlem hattı ayrıştırma worker'ı: çerçeveyi çöz ve (anahtar, olay) listesi döndür
+
+        Heartbeat, kontrol yanıtları ve hedef dışı bildirimler zarf şekli ile
+        Type/OperationType/Object.Type alanlarına bakılarak tam çözüm yapılmadan
+        elenir; düşürülen çerçeveler frame_stats'ta sayılır.
+        """
+        events = []
+        stats = self.frame_stats
+        stats['total'] += 1
         try:
+            kind = classify_envelope(message)
+            if kind == FRAME_HEARTBEAT:
+                stats['heartbeat'] += 1
+                return events
+            if kind == FRAME_CONTROL:
+                stats['control'] += 1
+                if '"R"' in message:
+                    self.log.debug("[WithdrawalListener] ✅ Başarılı yanıt alındı")
+                return events
+
             data = json.loads(message)
-            
-            # Boş mesajları atla ama log'la
-            if message.strip() == '{}':
-                self.log_message("📭 Boş mesaj alındı (heartbeat)")
-                return
-            
-            self.last_ws_msg_time = time.time()
-            
-            # TÜM mesajları logla (debug için)
-            self.log_message(f"📨 Gelen mesaj: {message[:200]}{'...' if len(message) > 200 else ''}")
-            
+
             # Hata kontrolü
-            if 'E' in data and data['E']:
-                self.log_message(f"❌ HATA: {data['E']}")
-                return
-            
-            # Başarılı subscription kontrolü
-            if 'R' in data and data.get('I') is not None:
-                self.log_message(f"✅ Başarılı yanıt alındı! ID: {data['I']}")
-                return
-            
-            # Çekim verisi kontrolü - sadece log için (işleme SignalR method'unda yapılacak)
-            message_str = message.lower()
-            withdrawal_keywords = ['clientid', 'amount', 'withdrawal', 'payout', 'state', 'requesttime', 
-                                 'çekim', 'para', 'client', 'btag', 'paymentsystem', 'currency']
-            
-            if any(keyword in message_str for keyword in withdrawal_keywords):
-                self.log_message("🚨 ÇEKIM VERİSİ TESPİT EDİLDİ! 🚨")
-                self.log_message(f"🔍 Bulunan keyword'ler: {[kw for kw in withdrawal_keywords if kw in message_str]}")
-                # NOT: İşleme SignalR Notification method'unda yapılacak, burada çift işlem engellemek için çağırmıyoruz
-            
-            # SignalR mesajlarını kontrol et
-            if 'M' in data and data['M']:
-                self.log_message(f"📡 SignalR mesaj grubu bulundu: {len(data['M'])} mesaj")
-                for i, msg in enumerate(data['M']):
-                    method = msg.get('M', '')
-                    args = msg.get('A', [])
-                    
-                    self.log_message(f"📋 Mesaj {i+1}: Method='{method}', Args sayısı={len(args)}")
-                    
-                    # Notification method'unu yakala
-                    if method.lower() == 'notification':
-                        self.log_message("🔔 Notification method yakalandı!")
-                        if args:
-                            for j, arg in enumerate(args):
-                                self.log_message(f"📄 Arg {j+1} tipi: {type(arg)}")
-                                if isinstance(arg, str):
-                                    try:
-                                        notification_data = json.loads(arg)
-                                        self.log_message(f"🔍 Notification data: Type={notification_data.get('Type')}, OpType={notification_data.get('OperationType')}")
-                                        
-                                        # Type 3 ve OperationType 1 çekim bildirimi
-                                        if (notification_data.get('Type') == 3 and 
-                                            notification_data.get('OperationType') == 1 and 
-                                            'Object' in notification_data):
-                                            
-                                            self.log_message("🎯 Çekim bildirimi tespit edildi!")
-                                            withdrawal_data = notification_data['Object']
-                                            self.process_withdrawal_notification(arg, withdrawal_data)
-                                        # Yatırım bildirimi: Object.Type == 2 (bonus Type==24 filtrele)
-                                        elif (
-                                            notification_data.get('Type') != 24 and
-                                            'Object' in notification_data and isinstance(notification_data['Object'], dict) and
-                                            notification_data['Object'].get('Type') == 2
-                                        ):
-                                            self.log_message("💰 Yatırım (deposit) bildirimi tespit edildi!")
-                                            self.process_deposit_notification(notification_data['Object'])
-                                        else:
-                                            self.log_message(f"ℹ️ Çekim bildirimi değil: Type={notification_data.get('Type')}, OpType={notification_data.get('OperationType')}")
-                                        
-                                    except Exception as e:
-                                        self.log_message(f"❌ Notification parse hatası: {str(e)}")
-                                        self.log_message(f"🔍 Ham arg: {str(arg)[:100]}...")
-                                elif isinstance(arg, dict):
-                                    self.log_message(f"📊 Dict arg: {str(arg)[:100]}...")
-                                    # Dict formatında da kontrol et ama işleme (çift bildirim engellemek için)
-                                    if (arg.get('Type') == 3 and 
-                                        arg.get('OperationType') == 1 and 
-                                        'Object' in arg):
-                                        self.log_message("🎯 Dict formatında çekim bildirimi tespit edildi!")
-                                        self.log_message("ℹ️ Dict format çift bildirim engellemek için işlenmiyor (String format tercih ediliyor)")
-                                    # Dict formatında deposit kontrolü
-                                    elif (
-                                        arg.get('Type') != 24 and 'Object' in arg and isinstance(arg['Object'], dict) and
-                                        arg['Object'].get('Type') == 2
-                                    ):
-                                        self.log_message("💰 Dict formatında yatırım bildirimi tespit edildi!")
-                                        self.process_deposit_notification(arg['Object'])
-                    else:
-                        self.log_message(f"📝 Diğer method: '{method}'")
-            else:
-                self.log_message("📭 SignalR mesaj grubu yok")
-                                        
+            if kind == FRAME_ERROR or data.get('E'):
+                stats['error'] += 1
+                self.log_message(f"❌ HATA: {data.get('E')}")
+                return events
+
+            for msg in data.get('M') or []:
+                method = msg.get('M', '')
+                if method.lower() != 'notification':
+                    stats['other_method'] += 1
+                    continue
+
+                for arg in msg.get('A') or []:
+                    if isinstance(arg, str):
+                        if classify_notification_arg(arg) == ARG_IGNORE:
+                            stats['ignored'] += 1
+                            continue
+                        try:
+                            notification_data = json.loads(arg)
+                        except Exception as e:
+                            stats['parse_error'] += 1
+                            self.log_message(f"❌ Notification parse hatası: {str(e)}")
+                            self.log_message(f"🔍 Ham arg: {str(arg)[:100]}...")
+                            continue
+                        stats['decoded'] += 1
+                        obj = notification_data.get('Object')
+
+                        # Type 3 ve OperationType 1 çekim bildirimi
+                        if (notification_data.get('Type') == 3 and
+                                notification_data.get('OperationType') == 1 and
+                                'Object' in notification_data):
+                            self.log.event(logging.DEBUG, 'withdrawal_detected', id=obj.get('Id') if isinstance(obj, dict) else None)
+                            stats['withdrawal'] += 1
+                            events.append((obj.get('Id') if isinstance(obj, dict) else None,
+                                           ('withdrawal', (arg, obj))))
+                        # Yatırım bildirimi: Object.Type == 2 (bonus Type==24 filtrele)
+                        elif notification_data.get('Type') != 24 and isinstance(obj, dict) and obj.get('Type') == 2:
+                            self.log.event(logging.DEBUG, 'deposit_detected', id=obj.get('Id'))
+                            stats['deposit'] += 1
+                            events.append((obj.get('Id') or obj.get('TransactionId'), ('deposit', obj)))
+                        else:
+                            stats['ignored'] += 1
+                    elif isinstance(arg, dict):
+                        # Dict formatında çekimler çift bildirim engellemek için işlenmiyor (String format tercih ediliyor)
+                        obj = arg.get('Object')
+                        if arg.get('Type') != 24 and isinstance(obj, dict) and obj.get('Type') == 2:
+                            self.log.event(logging.DEBUG, 'deposit_detected', id=obj.get('Id'), format='dict')
+                            stats['deposit'] += 1
+                            events.append((obj.get('Id') or obj.get('TransactionId'), ('deposit', obj)))
+                        else:
+                            stats['ignored'] += 1
+
         except Exception as e:
+            stats['parse_error'] += 1
             self.log_message(f"❌ Mesaj işleme hatası: {str(e)}")
             self.log_message(f"🔍 Ham mesaj: {message[:200]}...")
+        return events
 
     def process_deposit_notification(self, deposit_obj: dict):
         """Yatırım (deposit) bildirimi işle ve Telegram'a gönder"""
@@ -372,7 +440,7 @@ class WithdrawalListener:
                 return
             dep_id = deposit_obj.get('Id') or deposit_obj.get('TransactionId')
             if dep_id and dep_id in self.processed_deposit_ids:
-                self.log_message(f"⚠️ LOCAL: Yatırım ID {dep_id} zaten işlendi, atlanıyor")
+                self.log.event(logging.DEBUG, 'deposit_duplicate', id=dep_id)
                 return
 
             # Temel alanlar
@@ -408,19 +476,16 @@ class WithdrawalListener:
                 if not chat_ids:
                     self.log_message("⚠️ Telegram chat ID yok, mesaj gönderilemedi")
                 else:
-                    for chat_id in chat_ids:
-                        try:
-                            loop = asyncio.get_event_loop()
-                            if loop.is_running():
-                                asyncio.create_task(self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg, parse_mode='HTML'))
-                            else:
-                                threading.Thread(target=lambda: asyncio.run(self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg, parse_mode='HTML')), daemon=True).start()
-                        except Exception as e:
-                            self.log_message(f"❌ Telegram gönderim hatası (deposit): {e}")
+                    try:
+                        self.bot_instance.notifier.broadcast(
+                            chat_ids, msg, parse_mode='HTML', priority=PRIORITY_DEPOSIT, coalesce=True
+                        )
+                    except Exception as e:
+                        self.log_message(f"❌ Telegram gönderim hatası (deposit): {e}")
 
             if dep_id:
                 self.processed_deposit_ids.add(dep_id)
-            self.log_message("✅ Yatırım bildirimi işlendi ve gönderildi")
+            self.log.event(logging.INFO, 'deposit_sent', id=dep_id)
         except Exception as e:
             self.log_message(f"❌ Yatırım bildirimi işleme hatası: {e}")
             
@@ -448,22 +513,14 @@ class WithdrawalListener:
             #         self.log_message(f"🚫 GLOBAL: Çekim ID {withdrawal_id} zaten işlendi, atlanıyor")
             #         return
             #     GLOBAL_PROCESSED_WITHDRAWALS.add(withdrawal_id)
-            self.log_message(f"🔍 DEBUG: Global kontrol geçici olarak devre dışı - ID: {withdrawal_id}")
-            
             # Local çift bildirim kontrolü - aynı ID'yi tekrar işleme
-            processed_ids = getattr(self, 'processed_withdrawal_ids', set())
-            if not hasattr(self, 'processed_withdrawal_ids'):
-                self.processed_withdrawal_ids = set()
-                
-            if withdrawal_id in processed_ids:
-                self.log_message(f"⚠️ LOCAL: Çekim ID {withdrawal_id} zaten işlendi, atlanıyor")
+            if withdrawal_id in self.processed_withdrawal_ids:
+                self.log.event(logging.DEBUG, 'withdrawal_duplicate', id=withdrawal_id)
                 return
                 
             # Sadece yeni çekim talepleri için bildirim gönder (State = 0: New)
             if state != 0:
-                state_names = {0: "Yeni", 1: "Onaylandı", 2: "İptal", 3: "Ödendi", 4: "Reddedildi"}
-                state_name = state_names.get(state, f"Bilinmeyen({state})")
-                self.log_message(f"ℹ️ Çekim talebi durumu '{state_name}' olduğu için bildirim gönderilmiyor (ID: {withdrawal_id})")
+                self.log.event(logging.DEBUG, 'withdrawal_state_skipped', id=withdrawal_id, state=state)
                 return
             
             # Withdrawal bilgilerini çıkar
@@ -512,22 +569,19 @@ class WithdrawalListener:
             )
 
             # Withdrawal bildirimini kaydet
-            notification_info = {
-                'timestamp': datetime.now().isoformat(),
-                'withdrawal_id': withdrawal_id,
-                'client_name': client_name or account_holder,
-                'client_login': client_login,
-                'amount': amount,
-                'currency': currency,
-                'payment_system': payment_system,
-                'account_holder': account_holder,
-                'state': state,
-                'request_time': request_time,
-                'telegram_message_html': msg_html,
-                'raw_data': withdrawal_data
-            }
-            
-            self.withdrawal_notifications.append(notification_info)
+            self.withdrawal_notifications.append(
+                withdrawal_id=withdrawal_id,
+                client_id=client_id,
+                client_name=client_name or account_holder,
+                client_login=client_login,
+                amount=amount,
+                currency=currency,
+                payment_system=payment_system,
+                account_holder=account_holder,
+                btag=btag,
+                state=state,
+                request_time=request_time
+            )
             self.processed_withdrawal_ids.add(withdrawal_id)
             self.log_message(f"✅ Yeni çekim bildirimi kaydedildi: {client_name or account_holder} - {amount} {currency} (ID: {withdrawal_id})")
             
@@ -538,18 +592,14 @@ class WithdrawalListener:
                     self.log_message("⚠️ Telegram chat ID'leri yok, bildirim gönderilemedi")
                 else:
                     try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            for chat_id in chat_ids:
-                                asyncio.create_task(self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg_html, parse_mode='HTML'))
-                        else:
-                            def _send_all():
-                                async def _run():
-                                    for chat_id in chat_ids:
-                                        await self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg_html, parse_mode='HTML')
-                                asyncio.run(_run())
-                            threading.Thread(target=_send_all, daemon=True).start()
-                        self.log_message("📤 Telegram HTML çekim bildirimi gönderildi")
+                        alert_futures = self.bot_instance.notifier.broadcast(
+                            chat_ids, msg_html, parse_mode='HTML', priority=PRIORITY_WITHDRAWAL, coalesce=True
+                        )
+                        self.log.event(logging.DEBUG, 'withdrawal_queued', id=withdrawal_id, chats=len(chat_ids))
+                        # Fraud raporunu arka planda hazırla; hazır olunca uyarıya yanıt olarak gelir
+                        precomputer = getattr(self.bot_instance, 'fraud_precomputer', None)
+                        if precomputer is not None and precomputer.submit(client_id, alert_futures):
+                            self.log.event(logging.DEBUG, 'fraud_precompute_queued', id=withdrawal_id, client=client_id)
                     except Exception as e:
                         self.log_message(f"❌ Telegram HTML gönderim hatası: {e}")
                 
@@ -604,6 +654,7 @@ class WithdrawalListener:
             
         self.is_running = True
         self.log_message("Withdrawal listener başlatılıyor...")
+        self.pipeline.start()
         
         def run_listener():
             self.connect_signalr()
@@ -617,6 +668,9 @@ class WithdrawalListener:
         self.connected = False
         if self.ws:
             self.ws.close()
+        # Kuyrukta kalan çerçeveler işlendikten sonra worker'lar durur
+        self.pipeline.stop()
+        self.stop_recording()
         self.log_message("Withdrawal listener durduruldu")
         try:
             if self._reconnect_timer and self._reconnect_timer.is_alive():
@@ -689,7 +743,15 @@ class WithdrawalListener:
             'is_running': self.is_running,
             'is_connected': self.connected,
             'notifications_count': len(self.withdrawal_notifications),
-            'last_notification': self.withdrawal_notifications[-1] if self.withdrawal_notifications else None
+            'notifications_total': self.withdrawal_notifications.total,
+            'last_notification': self.withdrawal_notifications.last(),
+            'notification_store': self.withdrawal_notifications.get_stats(),
+            'dedup': {
+                'withdrawal': self.processed_withdrawal_ids.get_stats(),
+                'deposit': self.processed_deposit_ids.get_stats(),
+            },
+            'frames': dict(self.frame_stats),
+            'pipeline': self.pipeline.get_stats()
         }
 
 class KPIBot:
@@ -699,6 +761,10 @@ class KPIBot:
         self.github_token = os.getenv('GITHUB_TOKEN')
         self.github_repo = os.getenv('GITHUB_REPO', 'https://github.com/Saxblue/telebot')
         
+        # Günlük segmentli, sadece ekleme yapılan sorgu logu
+        self.query_log = get_query_log_store()
+        self.log_sync = get_github_log_sync()
+        
         self.api_settings = {
             "api_url": "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClientById?id={}",
             "kpi_url": "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClientKpi?id={}",
@@ -717,6 +783,78 @@ class KPIBot:
         self.application = None
         self.is_running = False
         
+        # Listener thread'lerinden gelen bildirimler için tek loop'lu Telegram göndericisi
+        self.notifier = NotificationDispatcher(
+            self.token,
+            pool_size=int(os.getenv('NOTIFY_POOL_SIZE', '8')),
+            concurrency=int(os.getenv('NOTIFY_CONCURRENCY', '4')),
+            global_rate=float(os.getenv('NOTIFY_GLOBAL_RATE', '30')),
+            chat_rate=float(os.getenv('NOTIFY_CHAT_RATE', '1')),
+            group_rate=float(os.getenv('NOTIFY_GROUP_RATE_PER_MIN', '20')) / 60,
+            digest_threshold=int(os.getenv('NOTIFY_DIGEST_THRESHOLD', '5'))
+        )
+        
+        # Handler'lar için paylaşımlı asenkron backoffice istemcisi
+        self.backoffice = AsyncBackofficeClient(
+            self.kpi_api_key,
+            max_connections=int(os.getenv('BACKOFFICE_MAX_CONNECTIONS', '20'))
+        )
+        
+        # Thread'lerden yapılan senkron çağrılar için paylaşımlı keep-alive oturumu
+        self.http = get_backoffice_session()
+        self.http.api_key = self.kpi_api_key
+        
+        # GetClientById / GetClientKpi önbelleği (ayrı TTL'ler, LRU)
+        self.client_cache = ClientProfileCache(
+            profile_ttl=float(os.getenv('CLIENT_PROFILE_TTL', '300')),
+            kpi_ttl=float(os.getenv('CLIENT_KPI_TTL', '60')),
+            max_size=int(os.getenv('CLIENT_CACHE_SIZE', '5000'))
+        )
+        
+        # Kullanıcı adı → GetClients sonucu (bulunamayanlar daha kısa TTL ile)
+        self.login_index = LoginIndex(
+            ttl=float(os.getenv('LOGIN_CACHE_TTL', '600')),
+            negative_ttl=float(os.getenv('LOGIN_NEGATIVE_TTL', '60')),
+            max_size=int(os.getenv('CLIENT_CACHE_SIZE', '5000'))
+        )
+        
+        # Müşteri başına giriş geçmişi (fraud raporunda yalnızca yeni girişler çekilir)
+        self.login_history = LoginHistoryStore(
+            history_days=int(os.getenv('LOGIN_HISTORY_DAYS', '90')),
+            max_clients=int(os.getenv('LOGIN_HISTORY_CLIENTS', '2000'))
+        )
+        
+        # Toplu 'id' sorgularında aynı anda çalışacak maksimum istek çifti
+        self.fetch_concurrency = int(os.getenv('KPI_FETCH_CONCURRENCY', '10'))
+        self.last_fetch_stats = {'total': 0, 'elapsed': 0.0, 'latencies': []}
+        
+        # Bu kadar ve üzeri ID'lik Excel'ler sabit bellekli (constant_memory) yazılır
+        self.excel_streaming_threshold = int(os.getenv('EXCEL_STREAMING_THRESHOLD', '1000'))
+        
+        # Uzun 'id' listelerinde Excel bölüm boyutu ve ilerleme mesajı güncelleme aralığı (saniye)
+        self.excel_chunk_size = max(1, int(os.getenv('EXCEL_CHUNK_SIZE', '500')))
+        self.progress_interval = float(os.getenv('PROGRESS_UPDATE_INTERVAL', '3'))
+        
+        # Fraud raporu aşama süreleri (p95 takibi için son N rapor)
+        self.fraud_timing_window = 200
+        self.fraud_stage_timings = {}
+        self._fraud_timings_lock = threading.Lock()
+        
+        # Çoklu ID'li 'fraud' isteklerinde aynı anda hazırlanacak en fazla rapor (tüm istekler için ortak)
+        self.fraud_batch_concurrency = max(1, int(os.getenv('FRAUD_BATCH_CONCURRENCY', '5')))
+        self.fraud_batch_max_ids = int(os.getenv('FRAUD_BATCH_MAX_IDS', '200'))
+        self.fraud_batch_semaphore = asyncio.Semaphore(self.fraud_batch_concurrency)
+        
+        # Yeni çekim uyarılarında fraud raporunu arka planda hazırla (opsiyonel, varsayılan kapalı)
+        self.fraud_precomputer = FraudPrecomputer(
+            compute=self.create_fraud_report,
+            on_ready=self._post_precomputed_fraud_report,
+            workers=int(os.getenv('FRAUD_PRECOMPUTE_WORKERS', '2')),
+            queue_size=int(os.getenv('FRAUD_PRECOMPUTE_QUEUE', '100')),
+            cache_ttl=float(os.getenv('FRAUD_REPORT_CACHE_TTL', '900')),
+            enabled=os.getenv('FRAUD_PRECOMPUTE', '0').lower() in ('1', 'true', 'yes', 'on')
+        )
+        
         # SignalR client için token'lar (gerçek değerler .env'den alınacak)
         self.signalr_tokens = {
             'hub_access_token': os.getenv('HUB_ACCESS_TOKEN', 'hat_C18474C327B7C8E44F143642197E9E1E'),
@@ -725,6 +863,7 @@ class KPIBot:
         }
         
         self.signalr_client = None
+        self.signalr_log = get_component_logger('signalr')
         self.withdrawal_notifications = []  # Çekim bildirimlerini sakla
         
         # Withdrawal Listener entegrasyonu
@@ -782,13 +921,31 @@ class KPIBot:
             return self.withdrawal_listener.get_status()
         return {'is_running': False, 'is_connected': False, 'notifications_count': 0}
         
-    def get_withdrawal_notifications(self, limit=10):
-        """Son withdrawal bildirimlerini al"""
+    def get_withdrawal_notifications(self, limit=10, since=None, until=None):
+        """Son withdrawal bildirimlerini al (opsiyonel zaman aralığı, eskiden yeniye)"""
         if self.withdrawal_listener:
-            notifications = self.withdrawal_listener.withdrawal_notifications
-            return notifications[-limit:] if notifications else []
+            return self.withdrawal_listener.withdrawal_notifications.query(since=since, until=until, limit=limit)
         return []
         
+    def get_client_cache_stats(self):
+        """Müşteri önbelleği hit/miss istatistikleri"""
+        stats = self.client_cache.get_stats()
+        stats['login'] = self.login_index.get_stats()
+        stats['login_history'] = self.login_history.get_stats()
+        return stats
+        
+    def get_http_stats(self):
+        """Backoffice HTTP oturumu bağlantı havuzu istatistikleri"""
+        return self.http.get_stats()
+        
+    def get_notifier_stats(self):
+        """Telegram bildirim göndericisi teslim süresi ve bekleyen gönderim sayısı"""
+        return self.notifier.get_stats()
+    
+    def get_fraud_precompute_stats(self):
+        """Çekim uyarısı fraud ön hesaplama kuyruğu ve önbellek istatistikleri"""
+        return self.fraud_precomputer.get_stats()
+        
     def fmt_tl(self, val):
         """Para formatı"""
         try:
@@ -802,11 +959,7 @@ class KPIBot:
         """Tarih formatı"""
         if not s or s == 'Bilinmiyor':
             return 'Bilinmiyor'
-        try:
-            dt = datetime.fromisoformat(str(s).split('+')[0])
-            return dt.strftime('%d.%m.%Y %H:%M')
-        except Exception:
-            return str(s)
+        return format_api_datetime(s, '%d.%m.%Y %H:%M')
 
     def on_signalr_notification(self, notification_data):
         """SignalR bildirimini işle"""
@@ -816,9 +969,9 @@ class KPIBot:
             data = notification_data.get('data', {})
             timestamp = notification_data.get('timestamp', datetime.now().isoformat())
             
-            # Ham bildirimi logla
-            logger.info(f"🔔 SignalR Bildirimi - Type: {notification_type}, Method: {method}")
-            logger.info(f"📄 Ham bildirim verisi: {json.dumps(notification_data, indent=2, ensure_ascii=False)}")
+            # Ham bildirimi logla (döküm yalnızca DEBUG açıkken ve örneklenerek)
+            self.signalr_log.event(logging.DEBUG, 'signalr_notification', type=notification_type, method=method)
+            self.signalr_log.payload("📄 Ham bildirim verisi", notification_data)
             
             # ESKİ ÇEKİM BİLDİRİM SİSTEMİ - DEVRE DIŞI (Çift bildirim engellemek için)
             # Çekim bildirimi kontrolü (daha geniş kapsamlı) - KAPALI
@@ -832,8 +985,7 @@ class KPIBot:
             
             if is_withdrawal:
                 # ESKİ SİSTEM - DEVRE DIŞI (Çift bildirim engellemek için)
-                logger.info(f"🚫 ESKİ SİSTEM: Çekim bildirimi tespit edildi ama işlenmiyor (çift bildirim engellemek için)")
-                logger.info(f"ℹ️ Çekim işleme YENİ SİSTEM'de (WithdrawalListener) yapılıyor")
+                self.signalr_log.debug("🚫 ESKİ SİSTEM: Çekim bildirimi işlenmiyor (WithdrawalListener işliyor)")
                 # Eski kod devre dışı:
                 # withdrawal_info = {...}
                 # self.withdrawal_notifications.append(withdrawal_info)
@@ -841,8 +993,7 @@ class KPIBot:
             
             # Genel bildirimler
             else:
-                logger.info(f"📢 Genel bildirim: {method}")
-                logger.debug(f"Genel bildirim detayı: {json.dumps(data, indent=2, ensure_ascii=False)}")
+                self.signalr_log.debug("📢 Genel bildirim: %s", method)
                 
         except Exception as e:
             logger.error(f"SignalR bildirim işleme hatası: {e}")
@@ -900,17 +1051,14 @@ class KPIBot:
                                 f"🔎 <b>Hızlı Fraud:</b> /fraud{self._esc(client_id)}"
                             )
 
-                            if self.bot_instance and getattr(self.bot_instance, 'application', None):
-                                chat_ids = getattr(self, 'telegram_chat_ids', []) or getattr(self.bot_instance, 'telegram_chat_ids', [])
-                                for chat_id in chat_ids:
-                                    try:
-                                        loop = asyncio.get_event_loop()
-                                        if loop.is_running():
-                                            asyncio.create_task(self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg_html, parse_mode='HTML'))
-                                        else:
-                                            threading.Thread(target=lambda: asyncio.run(self.bot_instance.application.bot.send_message(chat_id=chat_id, text=msg_html, parse_mode='HTML')), daemon=True).start()
-                                    except Exception as e:
-                                        self.log_message(f"❌ Telegram gönderim hatası (withdrawal HTML): {e}")
+                            if getattr(self, 'application', None):
+                                chat_ids = getattr(self, 'telegram_chat_ids', [])
+                                try:
+                                    self.notifier.broadcast(
+                                        chat_ids, msg_html, parse_mode='HTML', priority=PRIORITY_WITHDRAWAL, coalesce=True
+                                    )
+                                except Exception as e:
+                                    self.log_message(f"❌ Telegram gönderim hatası (withdrawal HTML): {e}")
                                 # HTML formatını biz gönderdik; mevcut alt akışta ikinci kez göndermemek için erken çık
                                 return
                         except Exception as e:
@@ -1072,192 +1220,117 @@ class KPIBot:
                 "query_count": len(user_ids_queried)
             }
             
-            # logs.json dosyasını oku veya oluştur
-            logs_file = "logs.json"
-            if os.path.exists(logs_file):
-                with open(logs_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            else:
-                logs = {"queries": []}
-            
-            logs["queries"].append(log_entry)
-            
-            # Dosyaya kaydet
-            with open(logs_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+            # Günün segmentine tek satır ekle (tüm geçmiş okunmaz/yeniden yazılmaz)
+            segment_path = self.query_log.append(log_entry)
                 
-            # GitHub'a push et
-            self.push_logs_to_github()
+            # GitHub'a push (arka planda, toplu)
+            self.push_logs_to_github(segment_path)
             
         except Exception as e:
             logger.error(f"Log kaydetme hatası: {e}")
 
-    def push_logs_to_github(self):
-        """Logları GitHub'a push et"""
+    def push_logs_to_github(self, segment_path=None):
+        """Log segmentini arka plan GitHub senkronizasyonu kuyruğuna ekle (beklemez)"""
         try:
-            if not self.github_token:
-                return
-                
-            # logs.json dosyasını oku
-            with open("logs.json", 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # GitHub API kullanarak dosyayı güncelle
-            repo_parts = self.github_repo.replace('https://github.com/', '').split('/')
-            owner, repo = repo_parts[0], repo_parts[1]
-            
-            url = f"https://api.github.com/repos/{owner}/{repo}/contents/logs.json"
-            headers = {
-                "Authorization": f"token {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            # Mevcut dosyayı al (SHA için)
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                sha = response.json().get('sha')
-            
-            # Dosyayı güncelle
-            import base64
-            encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-            
-            data = {
-                "message": f"Log güncelleme - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                "content": encoded_content
-            }
-            
-            if sha:
-                data["sha"] = sha
-            
-            requests.put(url, headers=headers, json=data)
-            
+            if segment_path is None:
+                segment_path = self.query_log.segment_path(datetime.now().date())
+            self.log_sync.mark_dirty(segment_path)
         except Exception as e:
-            logger.error(f"GitHub push hatası: {e}")
+            logger.error(f"GitHub push kuyruk hatası: {e}")
 
-    def search_user_by_username(self, username):
-        """Kullanıcı adına göre arama yap"""
+    async def search_user_by_username(self, username, use_cache=True):
+        """Kullanıcı adına göre arama yap (use_cache=False önbelleği atlar)"""
         try:
-            search_url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClients"
-            
-            payload = {
-                "Id": "",
-                "FirstName": "",
-                "LastName": "",
-                "PersonalId": "",
-                "Email": "",
-                "Phone": "",
-                "ZipCode": None,
-                "AMLRisk": "",
-                "AffilateId": None,
-                "AffiliatePlayerType": None,
-                "BTag": None,
-                "BetShopGroupId": "",
-                "BirthDate": None,
-                "CashDeskId": None,
-                "CasinoProfileId": None,
-                "CasinoProfitnessFrom": None,
-                "CasinoProfitnessTo": None,
-                "City": "",
-                "ClientCategory": None,
-                "CurrencyId": None,
-                "DocumentNumber": "",
-                "ExternalId": "",
-                "Gender": None,
-                "IBAN": None,
-                "IsEmailSubscribed": None,
-                "IsLocked": None,
-                "IsOrderedDesc": True,
-                "IsSMSSubscribed": None,
-                "IsSelfExcluded": None,
-                "IsStartWithSearch": False,
-                "IsTest": None,
-                "IsVerified": None,
-                "Login": username.strip(),
-                "MaxBalance": None,
-                "MaxCreatedLocal": None,
-                "MaxCreatedLocalDisable": True,
-                "MaxFirstDepositDateLocal": None,
-                "MaxLastTimeLoginDateLocal": None,
-                "MaxLastWrongLoginDateLocal": None,
-                "MaxLoyaltyPointBalance": None,
-                "MaxRows": 20,
-                "MaxVerificationDateLocal": None,
-                "MaxWrongLoginAttempts": None,
-                "MiddleName": "",
-                "MinBalance": None,
-                "MinCreatedLocal": None,
-                "MinCreatedLocalDisable": True,
-                "MinFirstDepositDateLocal": None,
-                "MinLastTimeLoginDateLocal": None,
-                "MinLastWrongLoginDateLocal": None,
-                "MinLoyaltyPointBalance": None,
-                "MinVerificationDateLocal": None,
-                "MinWrongLoginAttempts": None,
-                "MobilePhone": "",
-                "NickName": "",
-                "OrderedItem": 1,
-                "OwnerId": None,
-                "PartnerClientCategoryId": None,
-                "RegionId": None,
-                "RegistrationSource": None,
-                "SelectedPepStatuses": "",
-                "SkeepRows": 0,
-                "SportProfitnessFrom": None,
-                "SportProfitnessTo": None,
-                "Status": None,
-                "Time": "",
-                "TimeZone": "",
-            }
-            
-            headers = dict(self.api_settings["headers"])
-            response = requests.post(search_url, headers=headers, json=payload)
-            
-            if response.status_code == 401:
-                headers["Authorization"] = f"Bearer {self.kpi_api_key}"
-                response = requests.post(search_url, headers=headers, json=payload)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and not data.get('HasError'):
-                    users = data.get('Data', {}).get('Objects', [])
-                    return users
-                else:
-                    logger.error(f"API Error: {data.get('AlertMessage', 'Unknown error')}")
-                    return []
-            else:
-                logger.error(f"Search API error: {response.status_code}")
-                return []
-                
+            users = await self.search_clients_by_login(username, use_cache=use_cache)
+            return users or []
         except Exception as e:
             logger.error(f"Username search error: {e}")
             return []
 
-    async def fetch_single_user_detailed(self, user_id):
-        """Tek kullanıcı için detaylı veri çek"""
+    def _store_login_search(self, login, response, store=True):
+        """GetClients yanıtını çöz ve (store=True ise) kullanıcı adı önbelleğine yaz
+
+        Returns: Objects listesi (bulunamazsa boş liste), hata durumunda None
+        """
+        if response.status_code != 200:
+            logger.error(f"GetClients HTTP hatası: {response.status_code}")
+            return None
+        
+        data = response.json()
+        if not data or data.get("HasError", True):
+            logger.error(f"GetClients API hatası: {(data or {}).get('AlertMessage', 'Bilinmeyen hata')}")
+            return None
+        
+        objects = (data.get("Data") or {}).get("Objects") or []
+        # Bulunamayan kullanıcı adları da (kısa süreli) önbelleğe alınır
+        if store:
+            self.login_index.set(login, objects)
+        return objects
+
+    async def search_clients_by_login(self, login, api_key=None, use_cache=True):
+        """Login ile GetClients araması (async, önbellekli)
+
+        Önbellek varsayılan anahtarla alınan yanıtları tutar; başka bir api_key
+        ile yapılan arama önbellekten okumaz ve önbelleğe yazmaz.
+        """
+        login = str(login).strip()
+        if api_key is not None:
+            use_cache = False
+        if use_cache:
+            cached = self.login_index.get(login)
+            if cached is not MISSING:
+                return cached
+        
+        response = await self.backoffice.post(
+            "GetClients", json=build_client_search_payload(login), api_key=api_key
+        )
+        return self._store_login_search(login, response, store=api_key is None)
+
+    def search_clients_by_login_sync(self, login, use_cache=True):
+        """Login ile GetClients araması (senkron, önbellekli)"""
+        login = str(login).strip()
+        if use_cache:
+            cached = self.login_index.get(login)
+            if cached is not MISSING:
+                return cached
+        
+        response = self.http.post("GetClients", json=build_client_search_payload(login))
+        return self._store_login_search(login, response)
+
+    def invalidate_client(self, client_id):
+        """Şifre/profil değişikliğinden sonra müşteriye ait önbellek kayıtlarını sil"""
+        self.login_index.invalidate_client(client_id)
+        self.client_cache.invalidate(client_id)
+
+    async def fetch_single_user_detailed(self, user_id, use_cache=True):
+        """Tek kullanıcı için detaylı veri çek (use_cache=False önbelleği atlar)"""
         try:
-            headers = dict(self.api_settings["headers"])
-            
-            # Ana kullanıcı bilgilerini çek
-            user_url = self.api_settings["api_url"].format(user_id)
-            user_response = requests.get(user_url, headers=headers)
-            
-            if user_response.status_code == 401:
-                headers["Authorization"] = f"Bearer {self.kpi_api_key}"
-                user_response = requests.get(user_url, headers=headers)
-            
-            if user_response.status_code != 200:
-                return None
-            
-            user_data = user_response.json().get('Data', {})
+            user_data = self.client_cache.get_profile(user_id) if use_cache else MISSING
+            kpi_data = self.client_cache.get_kpi(user_id) if use_cache else MISSING
             
-            # KPI verilerini çek
-            kpi_url = self.api_settings["kpi_url"].format(user_id)
-            kpi_response = requests.get(kpi_url, headers=headers)
+            # Önbellekte olmayanları birlikte çek (ikisi birbirinden bağımsız)
+            requests_needed = {}
+            if user_data is MISSING:
+                requests_needed['user'] = self.backoffice.get("GetClientById", params={"id": user_id})
+            if kpi_data is MISSING:
+                requests_needed['kpi'] = self.backoffice.get("GetClientKpi", params={"id": user_id})
             
-            kpi_data = {}
-            if kpi_response.status_code == 200:
-                kpi_data = kpi_response.json().get('Data', {})
+            if requests_needed:
+                responses = dict(zip(requests_needed, await asyncio.gather(*requests_needed.values())))
+                
+                if 'user' in responses:
+                    if responses['user'].status_code != 200:
+                        return None
+                    user_data = responses['user'].json().get('Data', {})
+                    if user_data:
+                        self.client_cache.set_profile(user_id, user_data)
+                
+                if 'kpi' in responses:
+                    kpi_data = {}
+                    if responses['kpi'].status_code == 200:
+                        kpi_data = responses['kpi'].json().get('Data', {})
+                        if kpi_data:
+                            self.client_cache.set_kpi(user_id, kpi_data)
             
             # Verileri birleştir
             combined_data = {
@@ -1329,62 +1402,60 @@ class KPIBot:
             logger.error(f"Response formatting error: {e}")
             return "❌ Yanıt formatlanırken hata oluştu."
 
-    def fetch_client_logins(self, client_id):
-        """Client login verilerini API'den getir"""
+    async def fetch_client_logins(self, client_id):
+        """Client giriş geçmişi: önbellekteki oturumlar + API'den en yeni girişten sonrakiler
+
+        ClientLoginHistory döndürür (hata varsa önbellekteki geçmiş, o da yoksa None).
+        """
+        history = self.login_history.get(client_id)
         try:
+            now = datetime.now()
             payload = {
                 "ClientId": int(client_id),
-                "StartDate": (datetime.now() - timedelta(days=90)).strftime("%d-%m-%y - %H:%M:%S"),
-                "EndDate": datetime.now().strftime("%d-%m-%y - %H:%M:%S"),
+                "StartDate": self.login_history.fetch_start(client_id, now).strftime("%d-%m-%y - %H:%M:%S"),
+                "EndDate": now.strftime("%d-%m-%y - %H:%M:%S"),
                 "MaxRows": 1000,
                 "SkipRows": 0
             }
             
-            response = requests.post(
-                self.api_settings["login_url"],
-                json=payload,
-                headers=self.api_settings["headers"],
-                timeout=30
-            )
+            response = await self.backoffice.post("GetClientLogins", json=payload)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get("HasError", False):
                     logger.error(f"Login API Error: {data.get('AlertMessage', 'Unknown error')}")
-                    return []
+                    return history
                 
-                if "Data" in data and "ClientLogins" in data["Data"]:
-                    return data["Data"]["ClientLogins"]
-                else:
-                    return []
+                logins = (data.get("Data") or {}).get("ClientLogins") or []
+                return self.login_history.merge(client_id, logins, now)
             else:
                 logger.error(f"Login API HTTP Error: {response.status_code}")
-                return []
+                return history
                 
         except Exception as e:
             logger.error(f"Login fetch error: {e}")
-            return []
+            return history
+
+    async def fetch_transaction_snapshot(self, user_id, days=90):
+        """Son N günün GetClientTransactionsByAccount verisini tek seferde çek
 
-    async def get_turnover_analysis(self, user_id):
-        """Çevrim analizi yap ve açıklama metni döndür"""
+        Dönen snapshot fraud raporu boyunca paylaşılır; çekim talebi, çevrim
+        analizi ve diğer analizler aynı işlem listesini tekrar indirmez.
+        'transactions' Data.Objects listesidir (çevrim analizi); 'requests'
+        varsa Data.ClientRequests, yoksa aynı listedir (çekim talebi araması).
+        Hata durumunda 'error' alanı doludur ve listeler boştur.
+        """
+        snapshot = {
+            'client_id': str(user_id),
+            'fetched_at': datetime.now(),
+            'transactions': [],
+            'requests': [],
+            'error': None
+        }
         try:
-            # İşlemleri getir (90 gün)
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClientTransactionsByAccount"
-            
-            # Headers
-            headers = {
-                "authentication": self.api_settings.get("token", ""),
-                "Content-Type": "application/json;charset=UTF-8",
-                "User-Agent": "Mozilla/5.0",
-                "Referer": "https://backoffice.betconstruct.com/",
-                "Origin": "https://backoffice.betconstruct.com"
-            }
-            
-            # Date range - last 90 days
             date_to = datetime.now()
-            date_from = date_to - timedelta(days=90)
+            date_from = date_to - timedelta(days=days)
             
-            # Payload
             payload = {
                 "StartTimeLocal": date_from.strftime("%d-%m-%y"),
                 "EndTimeLocal": date_to.strftime("%d-%m-%y"),
@@ -1395,135 +1466,116 @@ class KPIBot:
                 "GameId": None
             }
             
-            logger.info(f"TURNOVER DEBUG: URL: {url}")
-            logger.info(f"TURNOVER DEBUG: Payload: {payload}")
+            logger.info(f"TRANSACTIONS DEBUG: Payload: {payload}")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            logger.info(f"TURNOVER DEBUG: Response status: {response.status_code}")
+            response = await self.backoffice.post("GetClientTransactionsByAccount", json=payload)
+            logger.info(f"TRANSACTIONS DEBUG: Response status: {response.status_code}")
             
             if response.status_code != 200:
-                logger.error(f"TURNOVER DEBUG: API Error - Status: {response.status_code}, Response: {response.text[:500]}")
-                return f"Çevrim analizi yapılamadı (API hatası: {response.status_code})"
+                logger.error(f"TRANSACTIONS DEBUG: API Error - Status: {response.status_code}, Response: {response.text[:500]}")
+                snapshot['error'] = f"API hatası: {response.status_code}"
+                return snapshot
             
             try:
                 data = response.json()
             except Exception as json_error:
-                logger.error(f"TURNOVER DEBUG: JSON Parse Error: {json_error}")
-                return "Çevrim analizi yapılamadı (JSON hatası)"
-                
-            logger.info(f"TURNOVER DEBUG: Data keys: {list(data.keys()) if isinstance(data, dict) else 'Not dict'}")
+                logger.error(f"TRANSACTIONS DEBUG: JSON Parse Error: {json_error}")
+                snapshot['error'] = "JSON hatası"
+                return snapshot
             
             if data.get("HasError"):
                 error_msg = data.get('AlertMessage', 'Bilinmeyen hata')
-                logger.error(f"TURNOVER DEBUG: API returned error: {error_msg}")
-                return f"Çevrim analizi yapılamadı (API: {error_msg})"
+                logger.error(f"TRANSACTIONS DEBUG: API returned error: {error_msg}")
+                snapshot['error'] = f"API: {error_msg}"
+                return snapshot
                 
             if "Data" not in data:
-                logger.error(f"TURNOVER DEBUG: No Data field in response: {data}")
-                return "Çevrim analizi yapılamadı (Veri alanı yok)"
-                
-            # İşlemleri al
-            transactions = []
+                logger.error(f"TRANSACTIONS DEBUG: No Data field in response: {data}")
+                snapshot['error'] = "Veri alanı yok"
+                return snapshot
+            
+            # Olası yanıt yapıları
             if isinstance(data["Data"], dict):
-                if "Objects" in data["Data"]:
-                    transactions = data["Data"]["Objects"]
+                snapshot['transactions'] = data["Data"].get("Objects") or []
+                if "ClientRequests" in data["Data"]:
+                    snapshot['requests'] = data["Data"]["ClientRequests"] or []
+                else:
+                    snapshot['requests'] = snapshot['transactions']
             elif isinstance(data["Data"], list):
-                transactions = data["Data"]
+                snapshot['transactions'] = snapshot['requests'] = data["Data"]
             
-            if not transactions:
-                return "İşlem geçmişi bulunamadı"
-            
-            # Analiz yap (Üye Çevrim Analizi mantığı)
-            import pandas as pd
-            df = pd.DataFrame(transactions)
-            df['Date'] = pd.to_datetime(df['CreatedLocal'].str.split('.').str[0])
-            
-            # Yatırım bul
-            deposits = df[df['DocumentTypeName'].isin(['Yatırım', 'Yatırım Talebi Ödemesi', 'CashBack Düzeltmesi', 'Tournament Win'])]
-            if deposits.empty:
-                return "Son dönemde yatırım bulunamadı"
-            
-            last_deposit = deposits.sort_values('Date', ascending=False).iloc[0]
-            deposit_date = last_deposit['Date']
-            
-            # Base type belirle
-            if last_deposit['DocumentTypeName'] == 'CashBack Düzeltmesi':
-                base_type = 'Kayıp Bonusu'
-            elif last_deposit['DocumentTypeName'] == 'Tournament Win':
-                base_type = 'Turnuva Kazancı'
-            else:
-                base_type = 'Yatırım'
+            logger.info(f"TRANSACTIONS DEBUG: {len(snapshot['transactions'])} işlem alındı (user {user_id})")
+            return snapshot
+            
+        except Exception as e:
+            logger.error(f"Transaction snapshot error for user {user_id}: {str(e)}")
+            snapshot['error'] = "Sistem hatası"
+            return snapshot
+
+    async def fetch_client_bonuses(self, user_id):
+        """Son bonusları getir (hata durumunda boş liste)"""
+        try:
+            bonus_payload = {"ClientId": int(user_id), "SkipCount": 0, "TakeCount": 10}
+            bonus_response = await self.backoffice.post("GetClientBonuses", json=bonus_payload)
+            if bonus_response.status_code == 200:
+                bonus_data = bonus_response.json()
+                if not bonus_data.get("HasError") and "Data" in bonus_data:
+                    return bonus_data["Data"].get("Objects", []) or []
+            return []
+        except Exception as e:
+            logger.error(f"Bonus fetch error for user {user_id}: {e}")
+            return []
+
+    async def get_turnover_analysis(self, user_id, snapshot=None, bonuses=None):
+        """Çevrim analizi yap ve açıklama metni döndür
+
+        snapshot ve bonuses verilirse ilgili veriler yeniden çekilmez.
+        """
+        text, _ = await self.get_turnover_details(user_id, snapshot=snapshot, bonuses=bonuses)
+        return text
+
+    async def get_turnover_details(self, user_id, snapshot=None, bonuses=None):
+        """Çevrim açıklama metni ve motor sonucu (yatırım yoksa/hata varsa sonuç None)"""
+        result = None
+        try:
+            # İşlemleri getir (90 gün)
+            if snapshot is None:
+                snapshot = await self.fetch_transaction_snapshot(user_id)
             
-            base_amount = float(last_deposit['Amount'])
+            if snapshot['error']:
+                return f"Çevrim analizi yapılamadı ({snapshot['error']})", result
             
-            # Yatırım sonrası işlemleri filtrele
-            df_after = df[df['Date'] >= deposit_date].copy()
-            df_bets = df_after[df_after['DocumentTypeName'] == 'Bahis']
-            df_wins = df_after[df_after['DocumentTypeName'] == 'Kazanç Artar']
+            transactions = snapshot['transactions']
             
-            total_bet = df_bets['Amount'].sum()
-            total_win = df_wins['Amount'].sum()
-            net_profit = total_win - total_bet
-            turnover_ratio = total_bet / base_amount if base_amount else 0
+            if not transactions:
+                return "İşlem geçmişi bulunamadı", result
             
-            # Oyun bazında analiz yap (analiz.py mantığı)
-            game_analysis = None
-            game_text = ""
+            # Analiz yap (Üye Çevrim Analizi mantığı) - tek geçişli vektörel motor
+            result = analyze_turnover(transactions)
+            if result is None:
+                return "Son dönemde yatırım bulunamadı", result
             
-            if not df_bets.empty or not df_wins.empty:
-                # Bahis ve kazanç verilerini oyun bazında grupla
-                if not df_bets.empty:
-                    game_bets = df_bets.groupby('Game')['Amount'].sum().reset_index()
-                    game_bets.columns = ['Oyun', 'Toplam_Bahis']
-                else:
-                    game_bets = pd.DataFrame(columns=['Oyun', 'Toplam_Bahis'])
-                
-                if not df_wins.empty:
-                    game_wins = df_wins.groupby('Game')['Amount'].sum().reset_index()
-                    game_wins.columns = ['Oyun', 'Toplam_Kazanc']
-                else:
-                    game_wins = pd.DataFrame(columns=['Oyun', 'Toplam_Kazanc'])
-                
-                # Birleştir ve net karı hesapla
-                if not game_bets.empty or not game_wins.empty:
-                    game_analysis = pd.merge(game_bets, game_wins, on='Oyun', how='outer').fillna(0)
-                    game_analysis['Net_Kar'] = game_analysis['Toplam_Kazanc'] - game_analysis['Toplam_Bahis']
-                    game_analysis = game_analysis.sort_values('Net_Kar', ascending=False)
-                    
-                    # En çok kazandıran oyunları bul
-                    profitable_games = game_analysis[game_analysis['Net_Kar'] > 0]
-                    
-                    if not profitable_games.empty:
-                        # Ana kazancı oluşturan oyunları bul (toplam karın en az %10'unu kazandıran)
-                        total_net_profit = game_analysis['Net_Kar'].sum()
-                        main_profit = profitable_games[profitable_games['Net_Kar'] > total_net_profit * 0.1]
-                        
-                        if len(main_profit) == 1:
-                            game = main_profit.iloc[0]
-                            game_text = f"{game['Oyun']} oyunundan {game['Net_Kar']:,.2f} TL"
-                        elif len(main_profit) > 1:
-                            games_list = ", ".join([game['Oyun'] for _, game in main_profit.iterrows()])
-                            total_main_profit = main_profit['Net_Kar'].sum()
-                            game_text = f"{games_list} oyunlarından toplam {total_main_profit:,.2f} TL"
+            base_type = result['base_type']
+            base_amount = result['base_amount']
+            net_profit = result['net_profit']
+            turnover_ratio = result['turnover_ratio']
+            
+            # Ana kazancı oluşturan oyunlar (toplam karın en az %10'unu kazandıran)
+            game_text = describe_main_games(result['main_games'])
             
             # Bonus bilgilerini al
             bonus_info = None
             if base_type == 'Yatırım':
                 try:
-                    bonus_url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClientBonuses"
-                    bonus_payload = {"ClientId": int(user_id), "SkipCount": 0, "TakeCount": 10}
-                    bonus_response = requests.post(bonus_url, headers=headers, json=bonus_payload, timeout=30)
-                    if bonus_response.status_code == 200:
-                        bonus_data = bonus_response.json()
-                        if not bonus_data.get("HasError") and "Data" in bonus_data:
-                            bonuses = bonus_data["Data"].get("Objects", [])
-                            if bonuses:
-                                latest_bonus = bonuses[0]
-                                if latest_bonus.get('ResultType') == 1:  # Kazanıldı
-                                    bonus_info = {
-                                        'name': latest_bonus.get('Name', 'Bonus'),
-                                        'amount': float(latest_bonus.get('Amount', 0))
-                                    }
+                    if bonuses is None:
+                        bonuses = await self.fetch_client_bonuses(user_id)
+                    if bonuses:
+                        latest_bonus = bonuses[0]
+                        if latest_bonus.get('ResultType') == 1:  # Kazanıldı
+                            bonus_info = {
+                                'name': latest_bonus.get('Name', 'Bonus'),
+                                'amount': float(latest_bonus.get('Amount', 0))
+                            }
                 except:
                     pass
             
@@ -1542,99 +1594,49 @@ class KPIBot:
             if bonus_info:
                 # Bonus varsa
                 if game_text:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
+                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})", result
                 else:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
+                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})", result
             else:
                 # Bonus yoksa
                 if game_text:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
+                    return f"{kaynak} ile ({base_amount:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})", result
                 else:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
+                    return f"{kaynak} ile ({base_amount:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})", result
                     
         except Exception as e:
             logger.error(f"Turnover analysis error for user {user_id}: {str(e)}")
-            return "Çevrim analizi yapılamadı (Sistem hatası)"
+            return "Çevrim analizi yapılamadı (Sistem hatası)", result
+
+    async def fetch_latest_withdrawal_request(self, user_id, snapshot=None):
+        """Fetch the latest withdrawal request for a user
 
-    async def fetch_latest_withdrawal_request(self, user_id):
-        """Fetch the latest withdrawal request for a user"""
+        Uses the shared transaction snapshot when one is given.
+        """
         try:
-            # API endpoint
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClientTransactionsByAccount"
+            if snapshot is None:
+                logger.info(f"DEBUG: Fetching withdrawal requests for user {user_id}")
+                snapshot = await self.fetch_transaction_snapshot(user_id)
             
-            # Headers
-            headers = {
-                "authentication": self.api_settings.get("token", ""),
-                "Content-Type": "application/json;charset=UTF-8",
-                "User-Agent": "Mozilla/5.0",
-                "Referer": "https://backoffice.betconstruct.com/",
-                "Origin": "https://backoffice.betconstruct.com"
-            }
-            
-            # Date range - last 90 days
-            date_to = datetime.now()
-            date_from = date_to - timedelta(days=90)
-            
-            # Payload
-            payload = {
-                "StartTimeLocal": date_from.strftime("%d-%m-%y"),
-                "EndTimeLocal": date_to.strftime("%d-%m-%y"),
-                "ClientId": int(user_id),
-                "CurrencyId": "TRY",
-                "BalanceTypeId": "5211",
-                "DocumentTypeIds": [],
-                "GameId": None
-            }
+            if snapshot['error']:
+                logger.error(f"DEBUG: Transaction snapshot error for user {user_id}: {snapshot['error']}")
+                return None
             
-            logger.info(f"DEBUG: Fetching withdrawal requests for user {user_id}")
-            logger.info(f"DEBUG: Date range: {date_from.strftime('%d-%m-%y')} to {date_to.strftime('%d-%m-%y')}")
-            logger.info(f"DEBUG: Using token: {self.api_settings.get('token', 'NOT_SET')[:20]}...")
+            # Filter for withdrawal requests
+            withdrawal_requests = [
+                tx for tx in snapshot['requests']
+                if tx.get("DocumentTypeName") == "Çekim Talebi"
+            ]
             
-            # Make request
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            logger.info(f"DEBUG: API Response Status: {response.status_code}")
+            logger.info(f"DEBUG: Found {len(withdrawal_requests)} withdrawal requests")
             
-            if response.status_code == 200:
-                data = response.json()
-                logger.info(f"DEBUG: API Response Keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-                
-                if not data.get("HasError") and "Data" in data:
-                    # Try different possible response structures
-                    transactions = []
-                    if isinstance(data["Data"], dict):
-                        if "ClientRequests" in data["Data"]:
-                            transactions = data["Data"]["ClientRequests"]
-                            logger.info(f"DEBUG: Found {len(transactions)} transactions in ClientRequests")
-                        elif "Objects" in data["Data"]:
-                            transactions = data["Data"]["Objects"]
-                            logger.info(f"DEBUG: Found {len(transactions)} transactions in Objects")
-                    elif isinstance(data["Data"], list):
-                        transactions = data["Data"]
-                        logger.info(f"DEBUG: Found {len(transactions)} transactions in Data list")
-                    
-                    
-                    # Filter for withdrawal requests
-                    withdrawal_requests = [
-                        tx for tx in transactions 
-                        if tx.get("DocumentTypeName") == "Çekim Talebi"
-                    ]
-                    
-                    logger.info(f"DEBUG: Found {len(withdrawal_requests)} withdrawal requests")
-                    
-                    if withdrawal_requests:
-                        # Sort by creation date (most recent first)
-                        withdrawal_requests.sort(key=lambda x: x.get('Created', ''), reverse=True)
-                        latest_request = withdrawal_requests[0]
-                        logger.info(f"DEBUG: Latest withdrawal request: Amount={latest_request.get('Amount')}, Date={latest_request.get('Created')}")
-                        return latest_request
-                    else:
-                        logger.warning(f"DEBUG: No withdrawal requests found for user {user_id}")
-                        return None
-                else:
-                    logger.error(f"DEBUG: API Error - HasError: {data.get('HasError')}, Data present: {'Data' in data}")
-                    return None
+            if withdrawal_requests:
+                # Most recent first
+                latest_request = max(withdrawal_requests, key=lambda x: x.get('Created', ''))
+                logger.info(f"DEBUG: Latest withdrawal request: Amount={latest_request.get('Amount')}, Date={latest_request.get('Created')}")
+                return latest_request
             else:
-                logger.error(f"DEBUG: API request failed with status {response.status_code}")
+                logger.warning(f"DEBUG: No withdrawal requests found for user {user_id}")
                 return None
                 
         except Exception as e:
@@ -1642,22 +1644,11 @@ class KPIBot:
             return None
 
     def parse_api_datetime(self, date_str):
-        """API tarih formatını parse et"""
-        try:
-            if not date_str:
-                return None
-            
-            # Timezone bilgisini kaldır
-            clean_date = date_str.split('+')[0]
-            
-            # Farklı formatları dene
-            try:
-                return datetime.strptime(clean_date, '%Y-%m-%dT%H:%M:%S.%f')
-            except ValueError:
-                return datetime.strptime(clean_date, '%Y-%m-%dT%H:%M:%S')
-        except Exception as e:
-            logger.error(f"Date parsing error for '{date_str}': {e}")
-            return None
+        """API tarih formatını parse et (saat dilimi atılır, bkz. api_datetime)"""
+        parsed = parse_api_datetime(date_str)
+        if parsed is None and date_str:
+            logger.error(f"Date parsing error for '{date_str}'")
+        return parsed
 
     def format_turkish_currency(self, amount):
         """Türk Lirası formatı"""
@@ -1670,197 +1661,192 @@ class KPIBot:
         except:
             return "0,00 TL"
 
-    def fetch_user_data(self, user_ids):
-        """Kullanıcı verilerini çek"""
-        user_data_list = []
-        
-        for user_id in user_ids:
-            try:
-                # Ana kullanıcı bilgilerini çek
-                headers = dict(self.api_settings["headers"])
-                url = self.api_settings["api_url"].format(user_id.strip())
-                
-                response = requests.get(url, headers=headers)
-                
-                if response.status_code == 401:
-                    # Authorization header ekleyerek tekrar dene
-                    headers["Authorization"] = f"Bearer {self.kpi_api_key}"
-                    response = requests.get(url, headers=headers)
-                
-                if response.status_code == 200:
-                    try:
-                        user_data = response.json()
-                        data = user_data.get('Data', {})
-                        
-                        # Debug: API yanıtını logla
-                        logger.info(f"API Response for ID {user_id}: {data}")
-                        
-                    except Exception as e:
-                        logger.error(f"JSON parse error for ID {user_id}: {e}")
-                        data = {}
-                    
-                    # KPI verilerini çek
-                    kpi_dep_amt = None
-                    kpi_wd_amt = None
-                    kpi_last_dep = None
-                    
-                    try:
-                        kpi_url = self.api_settings["kpi_url"].format(user_id.strip())
-                        kpi_response = requests.get(kpi_url, headers=headers)
-                        
-                        if kpi_response.status_code == 200:
-                            kpi_json = kpi_response.json()
-                            kpi_data = kpi_json.get('Data', {})
-                            
-                            # Debug: KPI yanıtını logla
-                            logger.info(f"KPI Response for ID {user_id}: {kpi_data}")
-                            
-                            kpi_dep_amt = kpi_data.get('DepositAmount') or kpi_data.get('TotalDeposit', 0)
-                            kpi_wd_amt = kpi_data.get('WithdrawalAmount') or kpi_data.get('TotalWithdrawal', 0)
-                            kpi_last_dep = (kpi_data.get('LastDepositTimeLocal') or 
-                                          kpi_data.get('LastDepositTime') or 
-                                          kpi_data.get('LastDepositDateLocal') or 
-                                          kpi_data.get('LastDepositDate') or 'Bilinmiyor')
-                        else:
-                            logger.warning(f"KPI API error for ID {user_id}: {kpi_response.status_code}")
-                    except Exception as e:
-                        logger.error(f"KPI fetch error for ID {user_id}: {e}")
-                    
-                    # Verileri formatla - null/empty değerleri kontrol et
-                    first_name = data.get('FirstName', '').strip() if data.get('FirstName') else ''
-                    last_name = data.get('LastName', '').strip() if data.get('LastName') else ''
-                    full_name = f"{first_name} {last_name}".strip() or 'Bilinmiyor'
-                    
-                    user_info = {
-                        'ID': user_id,
-                        'Kullanıcı Adı': data.get('Login') or 'Bilinmiyor',
-                        'İsim': full_name,
-                        'Telefon': data.get('Phone') or 'Bilinmiyor',
-                        'E-posta': data.get('Email') or 'Bilinmiyor',
-                        'Doğum Tarihi': self.fmt_dt(data.get('BirthDate')) if data.get('BirthDate') else 'Bilinmiyor',
-                        'Partner': data.get('PartnerName') or 'Bilinmiyor',
-                        'Bakiye': f"{data.get('Balance', 0)} {data.get('CurrencyId', 'TRY')}",
-                        'Kayıt Tarihi': self.fmt_dt(data.get('CreatedLocalDate')) if data.get('CreatedLocalDate') else 'Bilinmiyor',
-                        'Son Giriş': self.fmt_dt(data.get('LastLoginLocalDate')) if data.get('LastLoginLocalDate') else 'Bilinmiyor',
-                        'Son Para Yatırma': self.fmt_dt(data.get('LastDepositDateLocal')) if data.get('LastDepositDateLocal') else 'Bilinmiyor',
-                        'Son Casino Bahis': self.fmt_dt(data.get('LastCasinoBetTimeLocal')) if data.get('LastCasinoBetTimeLocal') else 'Bilinmiyor',
-                        'Toplam Yatırım': (self.fmt_tl(kpi_dep_amt) if kpi_dep_amt is not None and kpi_dep_amt > 0 else 'Bilinmiyor'),
-                        'Toplam Çekim': (self.fmt_tl(kpi_wd_amt) if kpi_wd_amt is not None and kpi_wd_amt > 0 else 'Bilinmiyor'),
-                        'Son Yatırım': (self.fmt_dt(kpi_last_dep) if kpi_last_dep and kpi_last_dep != 'Bilinmiyor' else 'Bilinmiyor'),
-                    }
-                    user_data_list.append(user_info)
-                    
-                else:
-                    # Hata durumu
-                    user_info = {
-                        'ID': user_id,
-                        'Kullanıcı Adı': 'HATA',
-                        'İsim': f'API yanıt kodu: {response.status_code}',
-                        'Telefon': 'Bilinmiyor',
-                        'E-posta': 'Bilinmiyor',
-                        'Doğum Tarihi': 'Bilinmiyor',
-                        'Partner': 'Bilinmiyor',
-                        'Bakiye': 'Bilinmiyor',
-                        'Kayıt Tarihi': 'Bilinmiyor',
-                        'Son Giriş': 'Bilinmiyor',
-                        'Son Para Yatırma': 'Bilinmiyor',
-                        'Son Casino Bahis': 'Bilinmiyor',
-                        'Toplam Yatırım': 'Bilinmiyor',
-                        'Toplam Çekim': 'Bilinmiyor',
-                        'Son Yatırım': 'Bilinmiyor',
-                    }
-                    user_data_list.append(user_info)
-                    
-            except Exception as e:
-                # Bağlantı hatası
-                user_info = {
-                    'ID': user_id,
-                    'Kullanıcı Adı': 'HATA',
-                    'İsim': f'Bağlantı hatası: {str(e)}',
-                    'Telefon': 'Bilinmiyor',
-                    'E-posta': 'Bilinmiyor',
-                    'Doğum Tarihi': 'Bilinmiyor',
-                    'Partner': 'Bilinmiyor',
-                    'Bakiye': 'Bilinmiyor',
-                    'Kayıt Tarihi': 'Bilinmiyor',
-                    'Son Giriş': 'Bilinmiyor',
-                    'Son Para Yatırma': 'Bilinmiyor',
-                    'Son Casino Bahis': 'Bilinmiyor',
-                    'Toplam Yatırım': 'Bilinmiyor',
-                    'Toplam Çekim': 'Bilinmiyor',
-                    'Son Yatırım': 'Bilinmiyor',
-                }
-                user_data_list.append(user_info)
-        
-        return user_data_list
+    def _error_row(self, user_id, message):
+        """Hatalı ID için boş Excel satırı"""
+        return {
+            'ID': user_id,
+            'Kullanıcı Adı': 'HATA',
+            'İsim': message,
+            'Telefon': 'Bilinmiyor',
+            'E-posta': 'Bilinmiyor',
+            'Doğum Tarihi': 'Bilinmiyor',
+            'Partner': 'Bilinmiyor',
+            'Bakiye': 'Bilinmiyor',
+            'Kayıt Tarihi': 'Bilinmiyor',
+            'Son Giriş': 'Bilinmiyor',
+            'Son Para Yatırma': 'Bilinmiyor',
+            'Son Casino Bahis': 'Bilinmiyor',
+            'Toplam Yatırım': 'Bilinmiyor',
+            'Toplam Çekim': 'Bilinmiyor',
+            'Son Yatırım': 'Bilinmiyor',
+        }
 
-    def create_excel_file(self, user_data_list):
-        """Excel dosyası oluştur"""
+    def fetch_single_user_row(self, user_id, use_cache=True):
+        """Tek ID için GetClientById + GetClientKpi çek ve Excel satırı döndür"""
         try:
-            df = pd.DataFrame(user_data_list)
-            
-            # Kolon sırası
-            preferred = [
-                'ID','Kullanıcı Adı','İsim','Telefon','E-posta','Bakiye','Son Giriş',
-                'Toplam Yatırım','Toplam Çekim','Son Yatırım',
-                'Kayıt Tarihi','Doğum Tarihi','Partner','Son Para Yatırma','Son Casino Bahis'
-            ]
-            cols = [c for c in preferred if c in df.columns] + [c for c in df.columns if c not in preferred]
-            df = df.loc[:, cols]
+            data = self.client_cache.get_profile(user_id) if use_cache else MISSING
+            if data is MISSING:
+                # Ana kullanıcı bilgilerini çek (401'de Bearer ile tekrar dener)
+                response = self.http.get("GetClientById", params={"id": user_id.strip()})
+                
+                if response.status_code != 200:
+                    return self._error_row(user_id, f'API yanıt kodu: {response.status_code}')
+
+                try:
+                    user_data = response.json()
+                    data = user_data.get('Data', {}) or {}
+                    logger.info(f"API Response for ID {user_id}: {data}")
+                    if data:
+                        self.client_cache.set_profile(user_id, data)
+                except Exception as e:
+                    logger.error(f"JSON parse error for ID {user_id}: {e}")
+                    data = {}
             
-            # Excel dosyasını memory'de oluştur
-            output = BytesIO()
+            # KPI verilerini çek
+            kpi_dep_amt = None
+            kpi_wd_amt = None
+            kpi_last_dep = None
             
             try:
-                # XlsxWriter ile şık formatla
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    sheet_name = 'Kullanıcılar'
-                    df.to_excel(writer, index=False, sheet_name=sheet_name, startrow=1, header=False)
-                    workbook = writer.book
-                    worksheet = writer.sheets[sheet_name]
-
-                    # Biçimler
-                    header_fmt = workbook.add_format({
-                        'bold': True,
-                        'text_wrap': True,
-                        'valign': 'vcenter',
-                        'align': 'center',
-                        'bg_color': '#1E88E5',
-                        'font_color': '#FFFFFF',
-                        'border': 1
-                    })
-                    cell_fmt = workbook.add_format({
-                        'align': 'center',
-                        'valign': 'vcenter',
-                        'border': 1
-                    })
-
-                    # Tablo ekle
-                    nrows, ncols = df.shape
-                    columns = [{'header': col, 'header_format': header_fmt} for col in df.columns]
-
-                    worksheet.add_table(0, 0, nrows+1, ncols-1, {
-                        'style': 'Table Style Medium 9',
-                        'columns': columns
-                    })
-
-                    # Sütun genişlikleri
-                    for idx, col in enumerate(df.columns):
-                        maxlen = max([len(str(col))] + [len(str(x)) for x in df[col].astype(str).tolist()])
-                        width = min(60, max(12, maxlen + 2))
-                        worksheet.set_column(idx, idx, width, cell_fmt)
-
-                    # Başlık satırını sabitle
-                    worksheet.freeze_panes(1, 0)
+                kpi_data = self.client_cache.get_kpi(user_id) if use_cache else MISSING
+                if kpi_data is MISSING:
+                    kpi_data = None
+                    kpi_response = self.http.get("GetClientKpi", params={"id": user_id.strip()})
                     
-            except Exception:
-                # XlsxWriter yoksa basit Excel
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Kullanıcılar')
+                    if kpi_response.status_code == 200:
+                        kpi_json = kpi_response.json()
+                        kpi_data = kpi_json.get('Data', {}) or {}
+                        logger.info(f"KPI Response for ID {user_id}: {kpi_data}")
+                        if kpi_data:
+                            self.client_cache.set_kpi(user_id, kpi_data)
+                    else:
+                        logger.warning(f"KPI API error for ID {user_id}: {kpi_response.status_code}")
+                
+                if kpi_data is not None:
+                    kpi_dep_amt = kpi_data.get('DepositAmount') or kpi_data.get('TotalDeposit', 0)
+                    kpi_wd_amt = kpi_data.get('WithdrawalAmount') or kpi_data.get('TotalWithdrawal', 0)
+                    kpi_last_dep = (kpi_data.get('LastDepositTimeLocal') or 
+                                  kpi_data.get('LastDepositTime') or 
+                                  kpi_data.get('LastDepositDateLocal') or 
+                                  kpi_data.get('LastDepositDate') or 'Bilinmiyor')
+            except Exception as e:
+                logger.error(f"KPI fetch error for ID {user_id}: {e}")
             
-            output.seek(0)
-            return output
+            # Verileri formatla - null/empty değerleri kontrol et
+            first_name = data.get('FirstName', '').strip() if data.get('FirstName') else ''
+            last_name = data.get('LastName', '').strip() if data.get('LastName') else ''
+            full_name = f"{first_name} {last_name}".strip() or 'Bilinmiyor'
             
+            return {
+                'ID': user_id,
+                'Kullanıcı Adı': data.get('Login') or 'Bilinmiyor',
+                'İsim': full_name,
+                'Telefon': data.get('Phone') or 'Bilinmiyor',
+                'E-posta': data.get('Email') or 'Bilinmiyor',
+                'Doğum Tarihi': self.fmt_dt(data.get('BirthDate')) if data.get('BirthDate') else 'Bilinmiyor',
+                'Partner': data.get('PartnerName') or 'Bilinmiyor',
+                'Bakiye': f"{data.get('Balance', 0)} {data.get('CurrencyId', 'TRY')}",
+                'Kayıt Tarihi': self.fmt_dt(data.get('CreatedLocalDate')) if data.get('CreatedLocalDate') else 'Bilinmiyor',
+                'Son Giriş': self.fmt_dt(data.get('LastLoginLocalDate')) if data.get('LastLoginLocalDate') else 'Bilinmiyor',
+                'Son Para Yatırma': self.fmt_dt(data.get('LastDepositDateLocal')) if data.get('LastDepositDateLocal') else 'Bilinmiyor',
+                'Son Casino Bahis': self.fmt_dt(data.get('LastCasinoBetTimeLocal')) if data.get('LastCasinoBetTimeLocal') else 'Bilinmiyor',
+                'Toplam Yatırım': (self.fmt_tl(kpi_dep_amt) if kpi_dep_amt is not None and kpi_dep_amt > 0 else 'Bilinmiyor'),
+                'Toplam Çekim': (self.fmt_tl(kpi_wd_amt) if kpi_wd_amt is not None and kpi_wd_amt > 0 else 'Bilinmiyor'),
+                'Son Yatırım': (self.fmt_dt(kpi_last_dep) if kpi_last_dep and kpi_last_dep != 'Bilinmiyor' else 'Bilinmiyor'),
+            }
+                
+        except Exception as e:
+            # Bağlantı hatası
+            return self._error_row(user_id, f'Bağlantı hatası: {str(e)}')
+
+    def iter_user_rows(self, user_ids, max_concurrency=None, use_cache=True):
+        """Kullanıcı satırlarını sınırlı eşzamanlılıkla çekip giriş sırasıyla üret
+
+        Her ID için GetClientById/GetClientKpi çifti ayrı bir worker'da çalışır.
+        Aynı anda en fazla eşzamanlılık x 4 ID işleme alınır; böylece büyük
+        listelerde bellekte yalnızca sıradaki satırlar bekler. Liste sonunda ID
+        başına süreler self.last_fetch_stats içine yazılır.
+        """
+        if not user_ids:
+            self.last_fetch_stats = {'total': 0, 'elapsed': 0.0, 'latencies': []}
+            return
+
+        workers = max(1, min(max_concurrency or self.fetch_concurrency, len(user_ids)))
+        window = workers * 4
+        latencies = [0.0] * len(user_ids)
+
+        def _timed_fetch(user_id):
+            t0 = time.perf_counter()
+            row = self.fetch_single_user_row(user_id, use_cache=use_cache)
+            return row, time.perf_counter() - t0
+
+        batch_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='kpi-fetch') as executor:
+            pending = {}
+            next_submit = 0
+            for index, user_id in enumerate(user_ids):
+                while next_submit < len(user_ids) and next_submit < index + window:
+                    pending[next_submit] = executor.submit(_timed_fetch, user_ids[next_submit])
+                    next_submit += 1
+                row, latencies[index] = pending.pop(index).result()
+                yield row
+        batch_elapsed = time.perf_counter() - batch_start
+
+        self.last_fetch_stats = {
+            'total': len(user_ids),
+            'concurrency': workers,
+            'elapsed': batch_elapsed,
+            'latencies': [{'ID': uid, 'latency': lat} for uid, lat in zip(user_ids, latencies)],
+        }
+        logger.info(
+            f"KPI toplu çekim: {len(user_ids)} ID, eşzamanlılık={workers}, "
+            f"toplam={batch_elapsed:.2f}s, ort={sum(latencies) / len(latencies):.2f}s, maks={max(latencies):.2f}s"
+        )
+
+    def fetch_user_data(self, user_ids, max_concurrency=None, use_cache=True):
+        """Kullanıcı verilerini sınırlı eşzamanlılıkla paralel çek (giriş sırasıyla liste)"""
+        return list(self.iter_user_rows(user_ids, max_concurrency=max_concurrency, use_cache=use_cache))
+
+    def export_user_data(self, user_ids, use_cache=True, chunk_size=None, on_chunk=None, on_progress=None):
+        """ID'leri çekip satırları geldikçe Excel'e yaz (tüm liste bellekte tutulmaz)
+
+        chunk_size ve on_chunk verilirse her chunk_size satırda o ana kadarki
+        bölüm kapatılıp on_chunk(dosya, bölüm_no, satır_sayısı, bitenler)
+        ile teslim edilir ve yeni bir dosyaya geçilir. on_progress(bitenler,
+        toplam, hatalar) her satırdan sonra çağrılır (seyreltme çağıranda).
+
+        Returns: (son bölümün excel dosyası, toplam satır sayısı); hata durumunda (None, 0)
+        """
+        try:
+            total = len(user_ids)
+            constant_memory = min(total, chunk_size or total) >= self.excel_streaming_threshold
+            writer = StreamingExcelWriter(constant_memory=constant_memory)
+            done = errors = 0
+            part = 1
+            for row in self.iter_user_rows(user_ids, use_cache=use_cache):
+                writer.write_row(row)
+                done += 1
+                if row.get('Kullanıcı Adı') == 'HATA':
+                    errors += 1
+                if on_progress:
+                    on_progress(done, total, errors)
+                if on_chunk and chunk_size and writer.rows_written >= chunk_size and done < total:
+                    on_chunk(writer.close(), part, writer.rows_written, done)
+                    writer = StreamingExcelWriter(constant_memory=constant_memory)
+                    part += 1
+            if not writer.rows_written:
+                return None, 0
+            return writer.close(), done
+        except Exception as e:
+            logger.error(f"Excel oluşturma hatası: {e}")
+            return None, 0
+
+    def create_excel_file(self, user_data_list):
+        """Excel dosyası oluştur"""
+        try:
+            writer = StreamingExcelWriter()
+            writer.write_rows(user_data_list)
+            return writer.close()
         except Exception as e:
             logger.error(f"Excel oluşturma hatası: {e}")
             return None
@@ -1970,6 +1956,7 @@ Birden fazla ID girdiğinizde otomatik olarak Excel raporu oluşturulur.
 
 🚨 **Fraud Raporu:**
 • `fraud 201190504` - Detaylı fraud analizi raporu
+• `fraud 9470204, 9436169` - Toplu fraud özeti ve Excel raporu
 
 🔐 **TC Şifre Değiştirme:**
 • `/şifretc selimyunus01` - Üye TC'si ile şifre değiştir
@@ -1991,6 +1978,7 @@ fraud 201190504
 - ID sorgusu Excel dosyası oluşturur
 - Fraud raporu kapsamlı analiz sağlar
 - TC şifre değiştirme üyenin TC'sini yeni şifre yapar
+- `id!`, `kadı!`, `fraud!` önbelleği atlayıp taze veri çeker
     """
         await update.message.reply_text(help_text, parse_mode='Markdown')
 
@@ -2059,6 +2047,10 @@ fraud 201190504
         # 'kadı' kelimesini kaldır ve kullanıcı adını al
         username_text = text[4:].strip()  # 'kadı' kelimesini kaldır
         
+        # 'kadı!' önbelleği atlayıp taze veri çeker
+        use_cache = not username_text.startswith('!')
+        username_text = username_text.lstrip('!').strip()
+        
         if not username_text:
             await update.message.reply_text(
                 "❌ Kullanıcı adı belirtilmedi.\n\n"
@@ -2079,7 +2071,7 @@ fraud 201190504
         
         try:
             # Kullanıcı adına göre ara
-            users = self.search_user_by_username(username_text)
+            users = await self.search_user_by_username(username_text, use_cache=use_cache)
             
             if not users:
                 await processing_msg.edit_text(
@@ -2097,7 +2089,7 @@ fraud 201190504
                 return
             
             # Kullanıcı verilerini çek
-            user_data = await self.fetch_single_user_detailed(user_id)
+            user_data = await self.fetch_single_user_detailed(user_id, use_cache=use_cache)
             
             if not user_data:
                 await processing_msg.edit_text("❌ Kullanıcı verileri çekilemedi.")
@@ -2124,14 +2116,30 @@ fraud 201190504
     async def handle_fraud_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Fraud raporu arama işleyici"""
         text = update.message.text.strip()
-        user = update.effective_user
         
         # 'fraud' tetikleyicisi kontrolü
         if not text.lower().startswith('fraud'):
             return
         
         # 'fraud' kelimesini kaldır ve user ID'yi al
-        user_id_text = text[5:].strip()  # 'fraud' kelimesini kaldır
+        await self._handle_fraud_request(update, text[5:].strip())
+
+    async def fraud_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/fraud 201190504 komutu"""
+        await self._handle_fraud_request(update, " ".join(context.args or []))
+
+    async def handle_fraud_slash_inline(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/fraud201190504 kısayolu (çekim bildirimlerindeki hızlı fraud bağlantısı)"""
+        await self._handle_fraud_request(update, update.message.text.strip()[len('/fraud'):])
+
+    async def _handle_fraud_request(self, update: Update, user_id_text):
+        """'fraud' sonrası metinden tekli veya toplu fraud raporu"""
+        user = update.effective_user
+        user_id_text = user_id_text.strip()
+        
+        # 'fraud!' önbelleği atlayıp taze veri çeker
+        use_cache = not user_id_text.startswith('!')
+        user_id_text = user_id_text.lstrip('!').strip()
         
         if not user_id_text:
             await update.message.reply_text(
@@ -2143,6 +2151,12 @@ fraud 201190504
             )
             return
         
+        # Birden çok ID (boşluk, virgül veya satır ile ayrılmış) toplu moda gider
+        user_ids = list(dict.fromkeys(re.findall(r'\d+', user_id_text)))
+        if len(user_ids) > 1:
+            await self._handle_fraud_batch(update, user_ids, use_cache)
+            return
+        
         if not user_id_text.isdigit():
             await update.message.reply_text(
                 "❌ Geçerli bir kullanıcı ID'si girin!\n\n"
@@ -2160,8 +2174,14 @@ fraud 201190504
         start_time = time.time()
         
         try:
-            # Fraud raporu oluştur
-            fraud_report = await self.create_fraud_report(user_id_text)
+            # Çekim uyarısıyla önceden hazırlanmış (veya hâlâ hazırlanan) rapor varsa onu kullan
+            # (rapor önbelleği yalnızca FRAUD_PRECOMPUTE açıkken kullanılır)
+            precompute = self.fraud_precomputer.enabled
+            fraud_report = await self.fraud_precomputer.get_report(user_id_text) if use_cache and precompute else None
+            if fraud_report is None:
+                fraud_report = await self.create_fraud_report(user_id_text, use_cache=use_cache)
+                if precompute:
+                    self.fraud_precomputer.store(user_id_text, fraud_report)
             
             if fraud_report:
                 # Raporu mesaj olarak gönder
@@ -2180,17 +2200,175 @@ fraud 201190504
             logger.error(f"Fraud report error: {e}")
             await processing_msg.edit_text(f"❌ Bir hata oluştu: {str(e)}")
 
-    async def create_fraud_report(self, user_id):
-        """Fraud raporu oluştur"""
+    async def _handle_fraud_batch(self, update: Update, user_ids, use_cache=True):
+        """Çoklu ID'li fraud isteği: özet mesajı ve müşteri başına metrik Excel'i"""
+        user = update.effective_user
+        
+        if len(user_ids) > self.fraud_batch_max_ids:
+            await update.message.reply_text(
+                f"❌ Tek seferde en fazla {self.fraud_batch_max_ids} ID için fraud raporu hazırlanabilir "
+                f"({len(user_ids)} ID gönderildi)."
+            )
+            return
+        
+        total = len(user_ids)
+        processing_msg = await update.message.reply_text(
+            f"🚨 {total} kullanıcı için fraud raporu hazırlanıyor "
+            f"(aynı anda en fazla {self.fraud_batch_concurrency})..."
+        )
+        start_time = time.time()
+        state = {'last': start_time}
+        
+        async def on_progress(done, total):
+            # Telegram düzenleme limiti: en fazla progress_interval'da bir
+            now = time.time()
+            if done >= total or now - state['last'] < self.progress_interval:
+                return
+            state['last'] = now
+            elapsed = now - start_time
+            eta = elapsed / done * (total - done)
+            try:
+                await processing_msg.edit_text(
+                    f"🚨 Fraud raporları hazırlanıyor... {done}/{total} (%{done * 100 // total})\n"
+                    f"⏳ Tahmini kalan süre: {eta:.0f} saniye"
+                )
+            except Exception as e:
+                logger.debug(f"İlerleme mesajı güncellenemedi: {e}")
+        
         try:
-            # Kullanıcı verilerini çek
-            user_data = await self.fetch_single_user_detailed(user_id)
+            results = await self.create_fraud_reports_batch(user_ids, use_cache=use_cache, on_progress=on_progress)
+            
+            writer = StreamingExcelWriter(sheet_name='Fraud', columns=FRAUD_COLUMNS)
+            lines = []
+            failed = []
+            for user_id, metrics in results.items():
+                if not metrics:
+                    failed.append(user_id)
+                    writer.write_row({'ID': user_id, 'Hata': 'Rapor oluşturulamadı'})
+                    continue
+                row = self.fraud_metrics_row(metrics)
+                writer.write_row(row)
+                status = row['Çevrim Durumu'] or 'Yatırım yok'
+                ratio = f"x{row['Çevrim Oranı']:.2f}" if row['Çevrim Oranı'] is not None else '-'
+                lines.append(
+                    f"{user_id} | {metrics['username']} | Talep: {metrics['request_amount']} | "
+                    f"Çevrim: {ratio} {status} | IP: {metrics['ip_changes']}"
+                )
+            excel_file = writer.close()
+            elapsed = time.time() - start_time
+            
+            summary = f"🚨 Toplu Fraud Raporu\n\n✅ Başarılı: {total - len(failed)}\n❌ Hatalı: {len(failed)}\n"
+            summary += f"🕐 İşlem süresi: {elapsed:.2f} saniye\n"
+            if lines:
+                body = "\n".join(lines)
+                # Telegram mesaj sınırı: uzun özetler kısaltılır, tam liste Excel'de
+                if len(body) > 3000:
+                    body = body[:3000].rsplit("\n", 1)[0] + "\n..."
+                summary += f"\n```\n{body}\n```"
+            if failed:
+                summary += f"\n❌ Oluşturulamayan: {', '.join(failed[:20])}" + (" ..." if len(failed) > 20 else "")
+            await processing_msg.edit_text(summary, parse_mode='Markdown')
+            
+            report_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+            await update.message.reply_document(
+                document=excel_file,
+                filename=f"fraud_raporu_{report_time}.xlsx",
+                caption=f"🚨 Fraud Raporu\n\n📋 Toplam {total} kullanıcı\n"
+                       f"🕐 İşlem süresi: {elapsed:.2f} saniye\n"
+                       f"📅 Tarih: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+            )
             
-            # Çekim talebi bilgilerini getir
-            withdrawal_request = await self.fetch_latest_withdrawal_request(user_id)
+            self.log_query(user.id, user.username or user.first_name, user_ids, elapsed)
             
-            # Çevrim analizi yap
-            turnover_analysis = await self.get_turnover_analysis(user_id)
+        except Exception as e:
+            logger.error(f"Toplu fraud raporu hatası: {e}")
+            await processing_msg.edit_text(f"❌ Bir hata oluştu: {str(e)}")
+
+    async def _run_task_graph(self, graph):
+        """Bağımlılık grafiğindeki aşamaları mümkün olduğunca eşzamanlı çalıştır
+
+        graph: {aşama: (bağımlılıklar, factory)} - factory, o ana kadarki
+        sonuç sözlüğünü alıp coroutine döndürür. Her aşama bağımlılıkları
+        biter bitmez başlar. (sonuçlar, aşama süreleri) döndürür.
+        """
+        results = {}
+        timings = {}
+        tasks = {}
+
+        async def run_stage(name):
+            deps, factory = graph[name]
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+            t0 = time.perf_counter()
+            try:
+                results[name] = await factory(results)
+            finally:
+                timings[name] = time.perf_counter() - t0
+            return results[name]
+
+        for name in graph:
+            tasks[name] = asyncio.create_task(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return results, timings
+
+    def _record_fraud_timings(self, timings, total):
+        """Fraud raporu aşama sürelerini kayan pencerede sakla"""
+        with self._fraud_timings_lock:
+            for stage, elapsed in list(timings.items()) + [('total', total)]:
+                self.fraud_stage_timings.setdefault(stage, deque(maxlen=self.fraud_timing_window)).append(elapsed)
+
+    def get_fraud_stage_stats(self):
+        """Aşama bazında fraud raporu süre istatistikleri (p50/p95/max)"""
+        stats = {}
+        with self._fraud_timings_lock:
+            snapshot = {stage: sorted(values) for stage, values in self.fraud_stage_timings.items()}
+        for stage, values in snapshot.items():
+            if not values:
+                continue
+            stats[stage] = {
+                'count': len(values),
+                'p50': values[int(0.50 * (len(values) - 1))],
+                'p95': values[int(0.95 * (len(values) - 1))],
+                'max': values[-1],
+            }
+        return stats
+
+    async def create_fraud_report(self, user_id, use_cache=True):
+        """Fraud raporu oluştur"""
+        metrics = await self.compute_fraud_metrics(user_id, use_cache=use_cache)
+        return self.format_fraud_report(metrics) if metrics else None
+
+    async def compute_fraud_metrics(self, user_id, use_cache=True):
+        """Fraud raporunun veri ve metriklerini topla (rapor metni ve toplu Excel için)"""
+        try:
+            # Birbirinden bağımsız backoffice sorguları aynı anda başlar;
+            # çekim talebi ve çevrim analizi işlem snapshot'ını bekler.
+            # Bonuslar, çevrim analizinde gerekirse beklemeden kullanılmak üzere önden çekilir.
+            graph = {
+                'profile': ((), lambda r: self.fetch_single_user_detailed(user_id, use_cache=use_cache)),
+                'transactions': ((), lambda r: self.fetch_transaction_snapshot(user_id)),
+                'logins': ((), lambda r: self.fetch_client_logins(user_id)),
+                'bonuses': ((), lambda r: self.fetch_client_bonuses(user_id)),
+                'withdrawal_request': (('transactions',), lambda r: self.fetch_latest_withdrawal_request(
+                    user_id, snapshot=r['transactions'])),
+                'turnover': (('transactions', 'bonuses'), lambda r: self.get_turnover_details(
+                    user_id, snapshot=r['transactions'], bonuses=r['bonuses'])),
+            }
+            report_start = time.perf_counter()
+            results, timings = await self._run_task_graph(graph)
+            self._record_fraud_timings(timings, time.perf_counter() - report_start)
+            stage_summary = ", ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+            logger.info(f"Fraud raporu aşama süreleri (user {user_id}): {stage_summary}")
+            
+            user_data = results['profile']
+            withdrawal_request = results['withdrawal_request']
+            turnover_analysis, turnover_result = results['turnover']
+            login_data = results['logins']
             
             # Talep bilgileri - withdrawal_request'den al
             if not withdrawal_request:
@@ -2204,9 +2382,6 @@ fraud 201190504
             user = user_data.get('user', {})
             kpi = user_data.get('kpi', {})
             
-            # Login verilerini çek
-            login_data = self.fetch_client_logins(user_id)
-            
             # Temel bilgiler - Soyisim İsim formatında
             first_name = user.get('FirstName', '').strip()
             last_name = user.get('LastName', '').strip()
@@ -2283,69 +2458,22 @@ fraud 201190504
             most_active_period = "Bilinmiyor"
             
             if login_data:
-                # IP analizi
-                unique_ips = set()
-                thirty_days_ago = datetime.now() - timedelta(days=30)
-                
-                login_hours = []
-                session_durations = []
-                device_sources = {}
+                # Son 30 günün IP/saat/cihaz/oturum analizi (sayısal diziler üzerinde)
+                login_stats = login_data.analyze(datetime.now() - timedelta(days=30))
+                ip_changes = login_stats['ip_count']
                 
-                for login in login_data:
-                    try:
-                        start_time = self.parse_api_datetime(login.get('StartTime', ''))
-                        if start_time and start_time >= thirty_days_ago:
-                            unique_ips.add(login.get('LoginIP', ''))
-                            login_hours.append(start_time.hour)
-                            
-                            # Cihaz analizi
-                            source = login.get('SourceName', 'Bilinmiyor')
-                            device_sources[source] = device_sources.get(source, 0) + 1
-                            
-                            # Session süresi
-                            end_time = self.parse_api_datetime(login.get('EndTime', ''))
-                            if end_time:
-                                duration = (end_time - start_time).total_seconds() / 3600
-                                session_durations.append(duration)
-                    except:
-                        continue
-                
-                ip_changes = len(unique_ips)
-                
-                # En yoğun saat
-                if login_hours:
-                    hour_counts = {}
-                    for hour in login_hours:
-                        hour_counts[hour] = hour_counts.get(hour, 0) + 1
-                    most_active_hour_num, count = max(hour_counts.items(), key=lambda x: x[1])
+                if login_stats['most_active_hour']:
+                    most_active_hour_num, count = login_stats['most_active_hour']
                     most_active_hour = f"{most_active_hour_num}:00 ({count} kez)"
                 
-                # En çok kullanılan cihaz
-                if device_sources:
-                    most_used_device = max(device_sources.items(), key=lambda x: x[1])[0]
+                if login_stats['most_used_device'] is not None:
+                    most_used_device = login_stats['most_used_device']
                 
-                # Ortalama session süresi
-                if session_durations:
-                    avg_session_duration = sum(session_durations) / len(session_durations)
+                if login_stats['avg_session_hours'] is not None:
+                    avg_session_duration = login_stats['avg_session_hours']
                     avg_daily_play = avg_session_duration
                 
-                # Zaman dilimi analizi
-                time_periods = {
-                    (0, 6): "Gece",
-                    (6, 12): "Sabah", 
-                    (12, 18): "Öğleden sonra",
-                    (18, 24): "Akşam"
-                }
-                
-                period_counts = {period: 0 for period in time_periods.values()}
-                for hour in login_hours:
-                    for (start, end), period in time_periods.items():
-                        if start <= hour < end:
-                            period_counts[period] += 1
-                            break
-                
-                if period_counts:
-                    most_active_period = max(period_counts.items(), key=lambda x: x[1])[0]
+                most_active_period = login_stats['most_active_period']
             
             # Detaylı analiz metni
             game_desc = f"- Ağırlıklı {game_type.lower()} oyuncusu\n"
@@ -2373,7 +2501,9 @@ fraud 201190504
             game_desc += f"- En çok aktif zaman dilimi: {most_active_period}"
             
             # Talep bilgileri - withdrawal_request'den al
+            request_value = None
             if withdrawal_request:
+                request_value = float(withdrawal_request.get("Amount", 0) or 0)
                 request_amount = self.format_turkish_currency(withdrawal_request.get("Amount", 0))
                 payment_system = withdrawal_request.get("PaymentSystemName", "Bilinmiyor")
                 # Payment system adını Türkçe'ye çevir
@@ -2390,35 +2520,149 @@ fraud 201190504
                 request_method = "Bilinmiyor"
                 logger.warning(f"DEBUG: No withdrawal request found for user {user_id}")
             
-            # Kaynak türünü belirle
-            if base_type == 'Kayıp Bonusu':
-                kaynak = "Kayıp Bonusu"
-            elif base_type == 'Turnuva Kazancı':
-                kaynak = "Turnuva Kazancı"
-            else:
-                kaynak = "Ana Para"
-            
-            # Çevrim durumu
-            cevrim_durum = "Tamamlandı" if turnover_ratio >= 1 else "Tamamlanmadı"
-            
-            # Açıklama metni oluştur
-            if bonus_info:
-                # Bonus varsa
-                if game_text:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
-                else:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) Aldığı {bonus_info['name']} ile ({bonus_info['amount']:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
-            else:
-                # Bonus yoksa
-                if game_text:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) {game_text} net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
-                else:
-                    return f"{kaynak} ile ({base_amount:,.2f} TL) toplam {net_profit:,.2f} TL net kar elde edilmiştir. Çevrim: {turnover_ratio:.2f}x ({cevrim_durum})"
+            return {
+                'user_id': user_id,
+                'full_name': full_name,
+                'username': username,
+                'balance': current_balance,
+                'total_deposits': total_deposits,
+                'deposit_count': deposit_count,
+                'total_withdrawals': total_withdrawals,
+                'withdrawal_count': withdrawal_count,
+                'last_deposit': last_deposit,
+                'request_value': request_value,
+                'request_amount': request_amount,
+                'request_method': request_method,
+                'game_type': game_type,
+                'game_status': game_status,
+                'game_desc': game_desc,
+                'ip_changes': ip_changes,
+                'avg_session_duration': avg_session_duration,
+                'most_active_hour': most_active_hour,
+                'most_used_device': most_used_device,
+                'active_days': active_days,
+                'most_active_period': most_active_period,
+                'turnover_text': turnover_analysis,
+                'turnover': turnover_result,
+            }
                     
         except Exception as e:
             logger.error(f"Fraud report creation error: {e}")
             return None
 
+    def format_fraud_report(self, m):
+        """Fraud metriklerinden rapor metni"""
+        report = f"👤 Üye: {m['full_name'] or 'Bilinmiyor'} ({m['username']})\n"
+        report += f"🆔 ID: {m['user_id']}\n"
+        report += f"💰 Bakiye: {self.format_turkish_currency(m['balance'])}\n"
+        report += f"📥 Toplam Yatırım: {self.format_turkish_currency(m['total_deposits'])} ({m['deposit_count']} adet)\n"
+        report += f"📤 Toplam Çekim: {self.format_turkish_currency(m['total_withdrawals'])} ({m['withdrawal_count']} adet)\n"
+        report += f"💵 Son Yatırım: {self.format_turkish_currency(m['last_deposit'])}\n"
+        report += f"🧾 Talep Miktarı: {m['request_amount']}\n"
+        report += f"🏦 Talep Yöntemi: {m['request_method']}\n"
+        report += f"🎮 Oyun Türü: {m['game_type']}\n"
+        report += f"▶️ Oyuna Devam: {m['game_status']}\n\n"
+        report += f"📝 Analiz:\n{m['game_desc']}\n\n"
+        report += f"🔄 Çevrim: {m['turnover_text']}"
+        return report
+
+    async def _post_precomputed_fraud_report(self, client_id, report, alert_message):
+        """Ön hesaplanan fraud raporunu çekim uyarısına yanıt olarak gönder"""
+        self.notifier.submit(
+            alert_message.chat_id,
+            f"🚨 <b>Fraud Raporu</b>\n\n<pre>{html.escape(report)}</pre>",
+            parse_mode='HTML',
+            priority=PRIORITY_INFO,
+            reply_to_message_id=alert_message.message_id
+        )
+
+    def fraud_metrics_row(self, m):
+        """Toplu fraud Excel'i için tek satır"""
+        turnover = m.get('turnover') or {}
+        ratio = turnover.get('turnover_ratio')
+        return {
+            'ID': m['user_id'],
+            'Kullanıcı Adı': m['username'],
+            'İsim': m['full_name'],
+            'Bakiye': m['balance'],
+            'Toplam Yatırım': m['total_deposits'],
+            'Yatırım Adedi': m['deposit_count'],
+            'Toplam Çekim': m['total_withdrawals'],
+            'Çekim Adedi': m['withdrawal_count'],
+            'Son Yatırım': m['last_deposit'],
+            'Talep Miktarı': m['request_value'],
+            'Talep Yöntemi': m['request_method'],
+            'Oyun Türü': m['game_type'],
+            'Oyuna Devam': m['game_status'],
+            'Çevrim Kaynağı': turnover.get('base_type'),
+            'Çevrim Tutarı': turnover.get('base_amount'),
+            'Çevrim Oranı': round(ratio, 2) if ratio is not None else None,
+            'Çevrim Durumu': ('Tamamlandı' if ratio >= 1 else 'Tamamlanmadı') if ratio is not None else None,
+            'Net Kar': turnover.get('net_profit'),
+            'IP Sayısı (30g)': m['ip_changes'],
+            'Ort. Oturum (saat)': round(m['avg_session_duration'], 1),
+            'En Yoğun Saat': m['most_active_hour'],
+            'Cihaz': m['most_used_device'],
+            'Aktiflik (gün)': m['active_days'],
+            'Çevrim Açıklaması': m['turnover_text'],
+        }
+
+    async def create_fraud_reports_batch(self, user_ids, use_cache=True, on_progress=None):
+        """Birden çok müşteri için fraud metrikleri (global eşzamanlılık sınırı altında)
+
+        Aynı anda en fazla fraud_batch_concurrency rapor hazırlanır; sınır tüm
+        toplu istekler arasında paylaşılır. {id: metrikler veya None} döndürür.
+        """
+        results = {}
+        done = 0
+
+        async def run_one(user_id):
+            nonlocal done
+            async with self.fraud_batch_semaphore:
+                try:
+                    results[user_id] = await self.compute_fraud_metrics(user_id, use_cache=use_cache)
+                except Exception as e:
+                    logger.error(f"Toplu fraud raporu hatası ({user_id}): {e}")
+                    results[user_id] = None
+            done += 1
+            if on_progress:
+                await on_progress(done, len(user_ids))
+
+        await asyncio.gather(*(run_one(user_id) for user_id in user_ids))
+        return {user_id: results.get(user_id) for user_id in user_ids}
+
+    def _make_progress_reporter(self, loop, processing_msg, start_time):
+        """Worker thread'den çağrılabilen, seyreltilmiş ilerleme mesajı güncelleyicisi"""
+        state = {'last': time.time(), 'busy': False}
+        lock = threading.Lock()
+
+        async def _edit(text):
+            try:
+                await processing_msg.edit_text(text)
+            except Exception as e:
+                logger.debug(f"İlerleme mesajı güncellenemedi: {e}")
+            finally:
+                state['busy'] = False
+
+        def report(done, total, errors):
+            now = time.time()
+            with lock:
+                # Telegram düzenleme limiti: en fazla progress_interval'da bir ve tek seferde bir istek
+                if state['busy'] or done >= total or now - state['last'] < self.progress_interval:
+                    return
+                state['last'] = now
+                state['busy'] = True
+            elapsed = now - start_time
+            eta = elapsed / done * (total - done) if done else 0
+            text = (
+                f"🔄 KPI verileri çekiliyor... {done}/{total} (%{done * 100 // total})\n"
+                f"❌ Hatalı: {errors}\n"
+                f"⏳ Tahmini kalan süre: {eta:.0f} saniye"
+            )
+            asyncio.run_coroutine_threadsafe(_edit(text), loop)
+
+        return report
+
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Mesaj işleyici - 'id', 'kadı', 'fraud' ve 'şifretc' ile başlayan mesajları işler"""
         text = update.message.text.strip()
@@ -2445,6 +2689,10 @@ fraud 201190504
         
         # 'id' kelimesini kaldır ve ID'leri parse et
         id_text = text[2:].strip()  # 'id' kelimesini kaldır
+        
+        # 'id!' önbelleği atlayıp taze veri çeker
+        use_cache = not id_text.startswith('!')
+        id_text = id_text.lstrip('!').strip()
         user_ids = []
         
         # Virgülle ayrılmış ID'ler
@@ -2479,28 +2727,64 @@ fraud 201190504
         start_time = time.time()
         
         try:
-            # Verileri çek
-            user_data_list = self.fetch_user_data(user_ids)
-            
-            if not user_data_list:
-                await processing_msg.edit_text("❌ Veri çekilemedi. Lütfen daha sonra tekrar deneyin.")
-                return
-            
-            # Excel dosyası oluştur
-            excel_file = self.create_excel_file(user_data_list)
+            loop = asyncio.get_running_loop()
+            total = len(user_ids)
+            report_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+            
+            # Uzun listelerde sonuçlar chunk_size'lık bölümler halinde gönderilir
+            progressive = total > self.excel_chunk_size
+            on_progress = self._make_progress_reporter(loop, processing_msg, start_time)
+            failed_parts = []  # (bölüm, ilk satır, son satır)
+            
+            def on_chunk(excel_part, part, part_rows, done):
+                # Worker thread'den çağrılır; bölümlerin sırası korunsun diye gönderim beklenir
+                future = asyncio.run_coroutine_threadsafe(
+                    update.message.reply_document(
+                        document=excel_part,
+                        filename=f"kpi_raporu_{report_time}_bolum{part}.xlsx",
+                        caption=f"📊 KPI Raporu - Bölüm {part}\n\n"
+                               f"📋 {done - part_rows + 1}-{done} / {total} kullanıcı\n"
+                               f"🕐 Geçen süre: {time.time() - start_time:.2f} saniye"
+                    ),
+                    loop
+                )
+                try:
+                    future.result(timeout=120)
+                except Exception as e:
+                    # Zaman aşımında geç gelen gönderim sırayı bozmasın
+                    future.cancel()
+                    failed_parts.append((part, done - part_rows + 1, done))
+                    logger.error(f"Excel bölümü gönderilemedi (bölüm {part}): {e}")
+            
+            # Verileri çek ve satırları geldikçe Excel'e yaz (event loop'u bloklamamak için ayrı thread'de)
+            excel_file, row_count = await asyncio.to_thread(
+                self.export_user_data, user_ids, use_cache=use_cache,
+                chunk_size=self.excel_chunk_size if progressive else None,
+                on_chunk=on_chunk if progressive else None,
+                on_progress=on_progress
+            )
             
             if excel_file is None:
-                await processing_msg.edit_text("❌ Excel dosyası oluşturulamadı.")
+                await processing_msg.edit_text("❌ Veri çekilemedi veya Excel dosyası oluşturulamadı.")
                 return
             
-            # Dosyayı gönder
-            filename = f"kpi_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            # Dosyayı gönder (bölümlü modda son bölüm)
+            if progressive:
+                last_part = (row_count - 1) // self.excel_chunk_size + 1
+                first_row = (last_part - 1) * self.excel_chunk_size + 1
+                filename = f"kpi_raporu_{report_time}_bolum{last_part}.xlsx"
+                title = f"📊 KPI Raporu - Bölüm {last_part} (son)\n\n📋 {first_row}-{row_count} / {total} kullanıcı\n"
+                if failed_parts:
+                    missing = ", ".join(f"{part} ({first}-{last})" for part, first, last in failed_parts)
+                    title += f"⚠️ Gönderilemeyen bölümler: {missing}\n"
+            else:
+                filename = f"kpi_raporu_{report_time}.xlsx"
+                title = f"📊 KPI Raporu\n\n📋 Toplam {row_count} kullanıcı\n"
             
             await update.message.reply_document(
                 document=excel_file,
                 filename=filename,
-                caption=f"📊 KPI Raporu\n\n"
-                       f"📋 Toplam {len(user_data_list)} kullanıcı\n"
+                caption=title +
                        f"🕐 İşlem süresi: {time.time() - start_time:.2f} saniye\n"
                        f"📅 Tarih: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
             )
@@ -2518,7 +2802,10 @@ fraud 201190504
     def update_kpi_api_key(self, new_key):
         """KPI API anahtarını güncelle"""
         self.kpi_api_key = new_key
+        self.api_settings["token"] = new_key
         self.api_settings["headers"]["Authentication"] = new_key
+        self.backoffice.api_key = new_key
+        self.http.api_key = new_key
 
     async def run(self):
         """Bot'u çalıştır"""
@@ -2547,6 +2834,10 @@ fraud 201190504
             self.is_running = True
             logger.info("Bot başlatıldı!")
             
+            # Fraud ön hesaplama worker'ları bot'un event loop'unda çalışır
+            if self.fraud_precomputer.enabled:
+                await self.fraud_precomputer.start()
+            
             # SignalR client'ı başlat
             self.start_signalr_client()
             
@@ -2563,6 +2854,11 @@ fraud 201190504
         finally:
             # SignalR client'ı durdur
             self.stop_signalr_client()
+            await self.fraud_precomputer.stop()
+            await self.backoffice.aclose()
+            # Bekleyen log segmentlerini gönder
+            await asyncio.to_thread(self.log_sync.stop)
+            await asyncio.to_thread(self.notifier.stop)
             
             # Bot'u düzgün şekilde durdur
             if self.application:
@@ -2603,123 +2899,32 @@ fraud 201190504
     def get_client_info_by_login(self, username):
         """Üye bilgilerini Login ile GetClients endpoint'i ile al"""
         try:
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClients"
-            
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "Authentication": self.kpi_api_key,
-                "Accept": "application/json, text/plain, */*",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            # Request body - sadece Login ile arama
-            payload = {
-                "Id": "",
-                "FirstName": "",
-                "LastName": "",
-                "PersonalId": "",
-                "Email": "",
-                "Phone": "",
-                "ZipCode": None,
-                "AMLRisk": "",
-                "AffilateId": None,
-                "AffiliatePlayerType": None,
-                "BTag": None,
-                "BetShopGroupId": "",
-                "BirthDate": None,
-                "CashDeskId": None,
-                "CasinoProfileId": None,
-                "CasinoProfitnessFrom": None,
-                "CasinoProfitnessTo": None,
-                "City": "",
-                "ClientCategory": None,
-                "CurrencyId": None,
-                "DocumentNumber": "",
-                "ExternalId": "",
-                "Gender": None,
-                "IBAN": None,
-                "IsEmailSubscribed": None,
-                "IsLocked": None,
-                "IsOrderedDesc": True,
-                "IsSMSSubscribed": None,
-                "IsSelfExcluded": None,
-                "IsStartWithSearch": False,
-                "IsTest": None,
-                "IsVerified": None,
-                "Login": username,
-                "MaxBalance": None,
-                "MaxCreatedLocal": None,
-                "MaxCreatedLocalDisable": True,
-                "MaxFirstDepositDateLocal": None,
-                "MaxLastTimeLoginDateLocal": None,
-                "MaxLastWrongLoginDateLocal": None,
-                "MaxLoyaltyPointBalance": None,
-                "MaxRows": 20,
-                "MaxVerificationDateLocal": None,
-                "MaxWrongLoginAttempts": None,
-                "MiddleName": "",
-                "MinBalance": None,
-                "MinCreatedLocal": None,
-                "MinCreatedLocalDisable": True,
-                "MinFirstDepositDateLocal": None,
-                "MinLastTimeLoginDateLocal": None,
-                "MinLastWrongLoginDateLocal": None,
-                "MinLoyaltyPointBalance": None,
-                "MinVerificationDateLocal": None,
-                "MinWrongLoginAttempts": None,
-                "MobilePhone": "",
-                "NickName": "",
-                "OrderedItem": 1,
-                "OwnerId": None,
-                "PartnerClientCategoryId": None,
-                "RegionId": None,
-                "RegistrationSource": None,
-                "SelectedPepStatuses": "",
-                "SkeepRows": 0,
-                "SportProfitnessFrom": None,
-                "SportProfitnessTo": None,
-                "Status": None,
-                "Time": "",
-                "TimeZone": ""
-            }
-            
             logger.info(f"Üye bilgileri sorgulanıyor: {username}")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            objects = self.search_clients_by_login_sync(username)
+            if objects is None:
+                return None
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get("HasError", True):
-                    logger.error(f"API Hatası: {data.get('AlertMessage', 'Bilinmeyen hata')}")
-                    return None
-                    
-                objects = data.get("Data", {}).get("Objects", [])
-                
-                if not objects:
-                    logger.warning(f"Üye bulunamadı: {username}")
-                    return None
-                    
-                client = objects[0]
-                client_id = client.get("Id")
-                doc_number = client.get("DocNumber")
-                first_name = client.get("FirstName", "")
-                last_name = client.get("LastName", "")
-                
-                logger.info(f"Üye bulundu: {first_name} {last_name} (ID: {client_id})")
-                logger.info(f"TC Numarası: {doc_number}")
-                
-                return {
-                    "client_id": client_id,
-                    "doc_number": doc_number,
-                    "first_name": first_name,
-                    "last_name": last_name
-                }
-                
-            else:
-                logger.error(f"HTTP Hatası: {response.status_code}")
+            if not objects:
+                logger.warning(f"Üye bulunamadı: {username}")
                 return None
                 
+            client = objects[0]
+            client_id = client.get("Id")
+            doc_number = client.get("DocNumber")
+            first_name = client.get("FirstName", "")
+            last_name = client.get("LastName", "")
+            
+            logger.info(f"Üye bulundu: {first_name} {last_name} (ID: {client_id})")
+            logger.info(f"TC Numarası: {doc_number}")
+            
+            return {
+                "client_id": client_id,
+                "doc_number": doc_number,
+                "first_name": first_name,
+                "last_name": last_name
+            }
+                
         except requests.exceptions.Timeout:
             logger.error("İstek zaman aşımına uğradı")
             return None
@@ -2733,15 +2938,6 @@ fraud 201190504
     def reset_client_password(self, client_id, new_password):
         """ResetPassword endpoint'i ile şifreyi değiştir"""
         try:
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/ResetPassword"
-            
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "Authentication": self.kpi_api_key,
-                "Accept": "application/json, text/plain, */*",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
             payload = {
                 "ClientId": client_id,
                 "Password": new_password
@@ -2749,7 +2945,7 @@ fraud 201190504
             
             logger.info(f"Şifre değiştiriliyor... (Client ID: {client_id})")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self.http.post("ResetPassword", json=payload)
             
             if response.status_code == 200:
                 data = response.json()
@@ -2759,6 +2955,7 @@ fraud 201190504
                     return False
                     
                 logger.info("✅ Şifre başarıyla TC numarası olarak değiştirildi!")
+                self.invalidate_client(client_id)
                 return True
                 
             else:
@@ -2800,7 +2997,7 @@ fraud 201190504
             )
             
             # 1. Üye bilgilerini al
-            client_info = self.get_client_info_by_login(username)
+            client_info = await asyncio.to_thread(self.get_client_info_by_login, username)
             
             if not client_info:
                 await processing_msg.edit_text(
@@ -2824,7 +3021,7 @@ fraud 201190504
                 return
                 
             # 2. Şifreyi TC numarası olarak değiştir
-            success = self.reset_client_password(client_id, doc_number)
+            success = await asyncio.to_thread(self.reset_client_password, client_id, doc_number)
             
             if success:
                 await processing_msg.edit_text(
@@ -2935,124 +3132,32 @@ fraud 201190504
     async def get_client_info_for_tc(self, username, api_key):
         """TC şifre değiştirme için üye bilgilerini al - TC.py ile aynı API kullanımı"""
         try:
-            # TC.py ile aynı URL ve header yapısı
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/GetClients"
-            
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "Authentication": api_key,  # TC.py'deki gibi Authentication header
-                "Accept": "application/json, text/plain, */*",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            # TC.py ile aynı payload yapısı
-            payload = {
-                "Id": "",
-                "FirstName": "",
-                "LastName": "",
-                "PersonalId": "",
-                "Email": "",
-                "Phone": "",
-                "ZipCode": None,
-                "AMLRisk": "",
-                "AffilateId": None,
-                "AffiliatePlayerType": None,
-                "BTag": None,
-                "BetShopGroupId": "",
-                "BirthDate": None,
-                "CashDeskId": None,
-                "CasinoProfileId": None,
-                "CasinoProfitnessFrom": None,
-                "CasinoProfitnessTo": None,
-                "City": "",
-                "ClientCategory": None,
-                "CurrencyId": None,
-                "DocumentNumber": "",
-                "ExternalId": "",
-                "Gender": None,
-                "IBAN": None,
-                "IsEmailSubscribed": None,
-                "IsLocked": None,
-                "IsOrderedDesc": True,
-                "IsSMSSubscribed": None,
-                "IsSelfExcluded": None,
-                "IsStartWithSearch": False,
-                "IsTest": None,
-                "IsVerified": None,
-                "Login": username,  # Sadece bu alanı dolduruyoruz
-                "MaxBalance": None,
-                "MaxCreatedLocal": None,
-                "MaxCreatedLocalDisable": True,
-                "MaxFirstDepositDateLocal": None,
-                "MaxLastTimeLoginDateLocal": None,
-                "MaxLastWrongLoginDateLocal": None,
-                "MaxLoyaltyPointBalance": None,
-                "MaxRows": 20,
-                "MaxVerificationDateLocal": None,
-                "MaxWrongLoginAttempts": None,
-                "MiddleName": "",
-                "MinBalance": None,
-                "MinCreatedLocal": None,
-                "MinCreatedLocalDisable": True,
-                "MinFirstDepositDateLocal": None,
-                "MinLastTimeLoginDateLocal": None,
-                "MinLastWrongLoginDateLocal": None,
-                "MinLoyaltyPointBalance": None,
-                "MinVerificationDateLocal": None,
-                "MinWrongLoginAttempts": None,
-                "MobilePhone": "",
-                "NickName": "",
-                "OrderedItem": 1,
-                "OwnerId": None,
-                "PartnerClientCategoryId": None,
-                "RegionId": None,
-                "RegistrationSource": None,
-                "SelectedPepStatuses": "",
-                "SkeepRows": 0,
-                "SportProfitnessFrom": None,
-                "SportProfitnessTo": None,
-                "Status": None,
-                "Time": "",
-                "TimeZone": ""
-            }
-            
             logger.info(f"TC şifre değiştirme için üye bilgileri sorgulanıyor: {username}")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            objects = await self.search_clients_by_login(username, api_key=api_key, use_cache=False)
+            if objects is None:
+                return None
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get("HasError", True):
-                    logger.error(f"GetClients API hatası: {data.get('AlertMessage', 'Bilinmeyen hata')}")
-                    return None
-                
-                # TC.py ile aynı response yapısı
-                objects = data.get("Data", {}).get("Objects", [])
-                
-                if not objects:
-                    logger.error(f"Kullanıcı bulunamadı: {username}")
-                    return None
-                
-                client = objects[0]
-                client_id = client.get("Id")
-                doc_number = client.get("DocNumber")  # TC.py'de DocNumber
-                first_name = client.get("FirstName", "")
-                last_name = client.get("LastName", "")
-                
-                logger.info(f"Üye bulundu: {first_name} {last_name} (ID: {client_id})")
-                logger.info(f"TC Numarası: {doc_number}")
-                
-                return {
-                    "client_id": client_id,
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "doc_number": doc_number,
-                    "username": username
-                }
-            else:
-                logger.error(f"GetClients HTTP hatası: {response.status_code}")
+            if not objects:
+                logger.error(f"Kullanıcı bulunamadı: {username}")
                 return None
+            
+            client = objects[0]
+            client_id = client.get("Id")
+            doc_number = client.get("DocNumber")  # TC.py'de DocNumber
+            first_name = client.get("FirstName", "")
+            last_name = client.get("LastName", "")
+            
+            logger.info(f"Üye bulundu: {first_name} {last_name} (ID: {client_id})")
+            logger.info(f"TC Numarası: {doc_number}")
+            
+            return {
+                "client_id": client_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "doc_number": doc_number,
+                "username": username
+            }
                 
         except Exception as e:
             logger.error(f"get_client_info_for_tc hatası: {str(e)}")
@@ -3061,16 +3166,6 @@ fraud 201190504
     async def reset_password_with_tc(self, client_id, new_password, api_key):
         """TC numarası ile şifre sıfırlama - TC.py ile aynı API kullanımı"""
         try:
-            # TC.py ile aynı URL ve header yapısı
-            url = "https://backofficewebadmin.betconstruct.com/api/tr/Client/ResetPassword"
-            
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "Authentication": api_key,  # TC.py'deki gibi Authentication header
-                "Accept": "application/json, text/plain, */*",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
             # TC.py ile aynı payload yapısı
             payload = {
                 "ClientId": client_id,
@@ -3079,7 +3174,7 @@ fraud 201190504
             
             logger.info(f"Şifre değiştiriliyor... (Client ID: {client_id})")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = await self.backoffice.post("ResetPassword", json=payload, api_key=api_key)
             
             if response.status_code == 200:
                 data = response.json()
@@ -3089,6 +3184,7 @@ fraud 201190504
                     return False
                 
                 logger.info(f"✅ Şifre başarıyla TC numarası olarak değiştirildi! (Client ID: {client_id})")
+                self.invalidate_client(client_id)
                 return True
             else:
                 logger.error(f"ResetPassword HTTP hatası: {response.status_code}")
@@ -3105,6 +3201,9 @@ fraud 201190504
                 await self.application.updater.stop()
                 await self.application.stop()
                 await self.application.shutdown()
+                await self.backoffice.aclose()
+                await asyncio.to_thread(self.log_sync.stop)
+                await asyncio.to_thread(self.notifier.stop)
                 self.is_running = False
                 logger.info("Bot durduruldu!")
                 return True
@@ -3138,11 +3237,11 @@ def get_withdrawal_listener_status():
         return bot_instance.get_withdrawal_listener_status()
     return {'is_running': False, 'is_connected': False, 'notifications_count': 0}
 
-def get_withdrawal_notifications(limit=10):
+def get_withdrawal_notifications(limit=10, since=None, until=None):
     """Global withdrawal bildirimleri alma fonksiyonu"""
     global bot_instance
     if bot_instance:
-        return bot_instance.get_withdrawal_notifications(limit)
+        return bot_instance.get_withdrawal_notifications(limit, since=since, until=until)
     return []
 
 def update_telegram_chat_ids(chat_ids_str):
@@ -3192,6 +3291,48 @@ def get_bot_status():
     global bot_instance
     return bot_instance.is_running if bot_instance else False
 
+def get_backoffice_http_stats():
+    """Global backoffice HTTP istatistikleri fonksiyonu"""
+    return get_backoffice_session().get_stats()
+
+def get_notifier_stats():
+    """Global Telegram bildirim göndericisi istatistikleri fonksiyonu"""
+    global bot_instance
+    if bot_instance:
+        return bot_instance.get_notifier_stats()
+    return {}
+
+def get_client_cache_stats():
+    """Global müşteri önbelleği istatistikleri fonksiyonu"""
+    global bot_instance
+    if bot_instance:
+        return bot_instance.get_client_cache_stats()
+    return {}
+
+def clear_client_cache():
+    """Global müşteri önbelleğini temizle"""
+    global bot_instance
+    if bot_instance:
+        bot_instance.client_cache.clear()
+        bot_instance.login_index.clear()
+        bot_instance.login_history.clear()
+        return True
+    return False
+
+def get_fraud_stage_stats():
+    """Global fraud raporu aşama süreleri fonksiyonu"""
+    global bot_instance
+    if bot_instance:
+        return bot_instance.get_fraud_stage_stats()
+    return {}
+
+def get_fraud_precompute_stats():
+    """Global fraud ön hesaplama istatistikleri fonksiyonu"""
+    global bot_instance
+    if bot_instance:
+        return bot_instance.get_fraud_precompute_stats()
+    return {}
+
 def update_api_key(new_key):
     """API anahtarını güncelle"""
     global bot_instance
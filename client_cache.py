@@ -0,0 +1,204 @@
+"""
+Müşteri Verisi Önbelleği
+Aynı müşteri kısa süre içinde tekrar sorgulandığında (çekim bildirimi → /fraud →
+id → kadı) GetClientById / GetClientKpi çağrılarını tekrarlamamak için
+süre sınırlı (TTL) ve boyut sınırlı (LRU) bellek içi önbellek.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Önbellekte "değer yok" ile "None değeri" ayırt etmek için
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe, TTL'li LRU önbellek"""
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300, name: str = "cache"):
+        """
+        Args:
+            max_size: Maksimum kayıt sayısı; aşıldığında en eski kullanılan silinir
+            ttl: Kayıt ömrü (saniye)
+            name: İstatistiklerde görünecek ad
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Geçerli kaydı döndür, yoksa default"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Kayıt ekle/güncelle"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Kaydı sil"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        """Tüm kayıtları sil"""
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> set:
+        """Kayıtlı anahtarların anlık kopyası (süresi dolmuş olanlar dahil)"""
+        with self._lock:
+            return set(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçları"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class ClientProfileCache:
+    """Müşteri ID'sine göre profil (GetClientById) ve KPI (GetClientKpi) önbelleği"""
+
+    def __init__(self, profile_ttl: float = 300, kpi_ttl: float = 60, max_size: int = 5000):
+        """
+        Args:
+            profile_ttl: Profil verisi ömrü (saniye)
+            kpi_ttl: KPI verisi ömrü (saniye) - bakiye/yatırım daha sık değişir
+            max_size: Her iki önbellek için maksimum müşteri sayısı
+        """
+        self.profiles = TTLCache(max_size=max_size, ttl=profile_ttl, name="profile")
+        self.kpis = TTLCache(max_size=max_size, ttl=kpi_ttl, name="kpi")
+
+    @staticmethod
+    def _key(client_id) -> str:
+        return str(client_id).strip()
+
+    def get_profile(self, client_id) -> Any:
+        return self.profiles.get(self._key(client_id))
+
+    def set_profile(self, client_id, data: Dict[str, Any]):
+        self.profiles.set(self._key(client_id), data)
+
+    def get_kpi(self, client_id) -> Any:
+        return self.kpis.get(self._key(client_id))
+
+    def set_kpi(self, client_id, data: Dict[str, Any]):
+        self.kpis.set(self._key(client_id), data)
+
+    def invalidate(self, client_id):
+        """Müşterinin profil ve KPI kayıtlarını sil"""
+        key = self._key(client_id)
+        self.profiles.invalidate(key)
+        self.kpis.invalidate(key)
+
+    def clear(self):
+        self.profiles.clear()
+        self.kpis.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'profile': self.profiles.get_stats(),
+            'kpi': self.kpis.get_stats(),
+        }
+
+
+class LoginIndex:
+    """Kullanıcı adı → GetClients sonucu eşlemesi (TTL + negatif önbellek)"""
+
+    def __init__(self, ttl: float = 600, negative_ttl: float = 60, max_size: int = 5000):
+        """
+        Args:
+            ttl: Bulunan kullanıcı adları için kayıt ömrü (saniye)
+            negative_ttl: Bulunamayan kullanıcı adları için kayıt ömrü (saniye)
+            max_size: Maksimum kullanıcı adı sayısı
+        """
+        self.cache = TTLCache(max_size=max_size, ttl=ttl, name="login")
+        self.negative_ttl = negative_ttl
+        self._by_client = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(login) -> str:
+        return str(login).strip()
+
+    def get(self, login) -> Any:
+        """Önbellekteki GetClients nesne listesini döndür (bulunamayan için boş liste)"""
+        return self.cache.get(self._key(login))
+
+    def set(self, login, objects):
+        """Arama sonucunu kaydet; boş sonuç negatif TTL ile saklanır"""
+        key = self._key(login)
+        objects = list(objects or [])
+        self.cache.set(key, objects, ttl=None if objects else self.negative_ttl)
+        with self._lock:
+            for obj in objects:
+                client_id = obj.get('Id') if isinstance(obj, dict) else None
+                if client_id is not None:
+                    self._by_client.setdefault(str(client_id), set()).add(key)
+            # Süresi dolmuş/çıkarılmış kayıtların ters indeksini temizle
+            if len(self._by_client) > self.cache.max_size:
+                live = self.cache.keys()
+                self._by_client = {
+                    cid: keys & live for cid, keys in self._by_client.items() if keys & live
+                }
+
+    def invalidate_login(self, login):
+        self.cache.invalidate(self._key(login))
+
+    def invalidate_client(self, client_id):
+        """Müşteri ID'sine bağlı tüm kullanıcı adı kayıtlarını sil"""
+        with self._lock:
+            keys = self._by_client.pop(str(client_id), set())
+        for key in keys:
+            self.cache.invalidate(key)
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self._by_client.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.cache.get_stats()
+        stats['negative_ttl'] = self.negative_ttl
+        return stats
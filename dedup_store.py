@@ -0,0 +1,172 @@
+"""
+Tekrar Bildirim Önleyici
+İşlenmiş çekim/yatırım ID'leri sonsuza kadar büyüyen set'lerde tutulmak yerine
+zaman pencereli (TTL) ve boyut sınırlı bir kümede tutulur. Her yeni ID küçük
+bir günlük dosyasına tek satır olarak eklenir; yeniden başlatmada dosya okunup
+süresi geçmemiş ID'ler geri yüklenir, böylece yeniden bağlanma/deploy sonrası
+aynı talep için ikinci Telegram bildirimi gitmez. Dosya, süresi geçmiş
+satırlar birikince yeniden yazılarak küçültülür.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLDedupSet:
+    """Eklenme zamanına göre sıralı, TTL ve boyut sınırlı, diske yazılabilen ID kümesi"""
+
+    def __init__(self, ttl: float = 86400, max_size: int = 50000, persist_path: Optional[str] = None,
+                 name: str = "dedup"):
+        """
+        Args:
+            ttl: ID'nin hatırlanacağı süre (saniye)
+            max_size: Bellekte tutulacak en fazla ID (aşılırsa en eski düşer)
+            persist_path: Günlük dosyası (None = yalnızca bellekte)
+            name: Loglarda kullanılacak ad
+        """
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.persist_path = persist_path
+        self.name = name
+        # ID (str) -> eklenme zamanı (epoch); eklenme sırasını korur
+        self._items: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._journal_lines = 0
+
+        self.hits = 0
+        self.added = 0
+        self.expired = 0
+        self.persist_errors = 0
+
+        if self.persist_path:
+            self._load()
+
+    @staticmethod
+    def _key(item: Hashable) -> str:
+        # Socket'ten ID bazen sayı bazen metin gelir; dosyayla tutarlı olsun diye metne çevrilir
+        return str(item)
+
+    # ---- Bellek ----
+
+    def _expire(self, now: float):
+        """Süresi geçen ve boyut sınırını aşan en eski ID'leri at (kilit altında)"""
+        cutoff = now - self.ttl
+        items = self._items
+        while items:
+            key, added_at = next(iter(items.items()))
+            if added_at >= cutoff and len(items) <= self.max_size:
+                break
+            items.popitem(last=False)
+            self.expired += 1
+
+    def __contains__(self, item: Hashable) -> bool:
+        key = self._key(item)
+        with self._lock:
+            self._expire(time.time())
+            found = key in self._items
+            if found:
+                self.hits += 1
+            return found
+
+    def add(self, item: Hashable) -> bool:
+        """ID'yi ekle; zaten varsa False döner"""
+        key = self._key(item)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._items:
+                self.hits += 1
+                return False
+            self._items[key] = now
+            self.added += 1
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.expired += 1
+            if self.persist_path:
+                self._append(key, now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            if self.persist_path:
+                self._compact()
+
+    # ---- Kalıcılık ----
+
+    def _load(self):
+        """Günlük dosyasından süresi geçmemiş ID'leri yükle"""
+        if not os.path.exists(self.persist_path):
+            return
+        now = time.time()
+        cutoff = now - self.ttl
+        loaded = {}
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    key, _, added_at = line.rstrip("\n").rpartition("\t")
+                    try:
+                        added_at = float(added_at)
+                    except ValueError:
+                        continue
+                    if key and added_at >= cutoff:
+                        loaded[key] = added_at
+                    self._journal_lines += 1
+        except Exception as e:
+            self.persist_errors += 1
+            logger.error(f"[{self.name}] Tekrar önleme dosyası okunamadı: {e}")
+            return
+
+        for key, added_at in sorted(loaded.items(), key=lambda kv: kv[1]):
+            self._items[key] = added_at
+        self._expire(now)
+        logger.info(f"[{self.name}] {len(self._items)} işlenmiş ID diskten yüklendi")
+        if self._journal_lines > 2 * len(self._items) + 100:
+            self._compact()
+
+    def _append(self, key: str, added_at: float):
+        """Yeni ID'yi günlüğe ekle; dosya gereğinden büyüdüyse küçült (kilit altında)"""
+        try:
+            with open(self.persist_path, 'a', encoding='utf-8') as f:
+                f.write(f"{key}\t{added_at:.3f}\n")
+            self._journal_lines += 1
+        except Exception as e:
+            self.persist_errors += 1
+            logger.error(f"[{self.name}] Tekrar önleme dosyasına yazılamadı: {e}")
+            return
+        if self._journal_lines > 2 * len(self._items) + 100:
+            self._compact()
+
+    def _compact(self):
+        """Dosyayı yalnızca bellekteki ID'lerle yeniden yaz (kilit altında)"""
+        tmp_path = self.persist_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for key, added_at in self._items.items():
+                    f.write(f"{key}\t{added_at:.3f}\n")
+            os.replace(tmp_path, self.persist_path)
+            self._journal_lines = len(self._items)
+        except Exception as e:
+            self.persist_errors += 1
+            logger.error(f"[{self.name}] Tekrar önleme dosyası küçültülemedi: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._items),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'added': self.added,
+            'expired': self.expired,
+            'persistent': bool(self.persist_path),
+            'persist_errors': self.persist_errors,
+        }
@@ -0,0 +1,245 @@
+"""
+Bildirim Olay Hattı
+WebSocket okuyucu thread'i yalnızca ham çerçeveyi sınırlı bir kuyruğa bırakır.
+Ayrıştırma/sınıflandırma tek bir worker'da (çerçeve sırası korunur), bildirim
+işleme ve gönderim ise anahtara göre paylaştırılmış worker'larda çalışır; aynı
+çekim/yatırım ID'si her zaman aynı worker'a düşer. Kuyruk derinlikleri ve aşama
+süreleri (p50/p95/max) raporlanır.
+
+Ham çerçeveler önce hızlı yoldan sınıflandırılır: heartbeat, kontrol yanıtları
+ve hedef dışı bildirimler tam JSON çözümü ve metin taraması yapılmadan elenir.
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# ---- Hızlı yol sınıflandırıcı ----
+
+# Zarf türleri
+FRAME_HEARTBEAT = 'heartbeat'
+FRAME_CONTROL = 'control'  # abonelik/çağrı yanıtı, init ({"C":..,"S":1,"M":[]}) vb.
+FRAME_ERROR = 'error'
+FRAME_HUB = 'hub'
+
+# Notification argümanı türleri
+ARG_CANDIDATE = 'candidate'  # çekim/yatırım olabilir, tam çözümle doğrulanır
+ARG_IGNORE = 'ignore'
+
+_HUB_MESSAGES = re.compile(r'"M"\s*:\s*\[\s*\{')
+_ERROR_FIELD = re.compile(r'"E"\s*:\s*"')
+_TYPE_VALUES = re.compile(r'"(Type|OperationType)"\s*:\s*(-?\d+)')
+
+
+def classify_envelope(message: str) -> str:
+    """SignalR zarfını JSON çözmeden sınıflandır"""
+    stripped = message.strip()
+    if stripped == '{}' or not stripped:
+        return FRAME_HEARTBEAT
+    if _HUB_MESSAGES.search(message):
+        return FRAME_HUB
+    if _ERROR_FIELD.search(message):
+        return FRAME_ERROR
+    return FRAME_CONTROL
+
+
+def classify_notification_arg(arg: str) -> str:
+    """Notification argüman metnini Type/OperationType/Object.Type alanlarına bakarak sınıflandır
+
+    Yalnızca kesin olarak hedef dışı olan argümanlar için ARG_IGNORE döner;
+    tam çözümün kabul edeceği hiçbir bildirim hızlı yolda düşürülmez.
+    """
+    if '"Object"' not in arg:
+        return ARG_IGNORE
+    types = set()
+    op_types = set()
+    for field, value in _TYPE_VALUES.findall(arg):
+        (types if field == 'Type' else op_types).add(int(value))
+    # Çekim: Type=3 + OperationType=1; yatırım: Object.Type=2
+    if (3 in types and 1 in op_types) or 2 in types:
+        return ARG_CANDIDATE
+    return ARG_IGNORE
+
+
+class LatencyWindow:
+    """Son N ölçümün p50/p95/max değerlerini tutan kayan pencere"""
+
+    def __init__(self, size: int = 500):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, value: float):
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            values = sorted(self._values)
+            count = self.count
+        if not values:
+            return {'count': count}
+        return {
+            'count': count,
+            'p50': values[int(0.50 * (len(values) - 1))],
+            'p95': values[int(0.95 * (len(values) - 1))],
+            'max': values[-1],
+        }
+
+
+class FramePipeline:
+    """Sınırlı kuyruklu, iki aşamalı (ayrıştır → teslim et) çerçeve işleme hattı"""
+
+    def __init__(self,
+                 parse: Callable[[Any], Iterable[Tuple[Hashable, Any]]],
+                 deliver: Callable[[Any], None],
+                 max_frames: int = 10000,
+                 delivery_workers: int = 2,
+                 max_events: int = 10000,
+                 name: str = "pipeline"):
+        """
+        Args:
+            parse: Ham çerçeveyi (anahtar, olay) çiftlerine dönüştüren fonksiyon
+            deliver: Tek olayı işleyen/gönderen fonksiyon
+            max_frames: Ham çerçeve kuyruğu kapasitesi
+            delivery_workers: Teslim worker sayısı
+            max_events: Her teslim kuyruğunun kapasitesi
+            name: Thread adlarında ve loglarda kullanılacak ad
+        """
+        self.parse = parse
+        self.deliver = deliver
+        self.name = name
+        self.frames = queue.Queue(maxsize=max_frames)
+        self.event_queues = [queue.Queue(maxsize=max_events) for _ in range(max(1, delivery_workers))]
+        self._threads: List[threading.Thread] = []
+        self.is_running = False
+
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.events_delivered = 0
+        self.parse_errors = 0
+        self.delivery_errors = 0
+
+        self.queue_wait = LatencyWindow()
+        self.parse_time = LatencyWindow()
+        self.event_wait = LatencyWindow()
+        self.delivery_time = LatencyWindow()
+
+    # ---- Giriş (socket thread'i) ----
+
+    def submit(self, frame: Any) -> bool:
+        """Ham çerçeveyi kuyruğa bırak; kuyruk doluysa çerçeve düşürülür (okuyucu hiç beklemez)"""
+        self.frames_received += 1
+        try:
+            self.frames.put_nowait((time.perf_counter(), frame))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            if self.frames_dropped == 1 or self.frames_dropped % 100 == 0:
+                logger.error(f"[{self.name}] Çerçeve kuyruğu dolu, {self.frames_dropped} çerçeve düşürüldü")
+            return False
+
+    # ---- Worker'lar ----
+
+    def _parse_loop(self):
+        while True:
+            item = self.frames.get()
+            if item is _STOP:
+                # Teslim worker'larına durma sinyali ayrıştırılan son olaylardan sonra gider
+                for events in self.event_queues:
+                    events.put(_STOP)
+                break
+            enqueued_at, frame = item
+            started = time.perf_counter()
+            self.queue_wait.add(started - enqueued_at)
+            try:
+                events = list(self.parse(frame) or ())
+            except Exception as e:
+                self.parse_errors += 1
+                logger.error(f"[{self.name}] Çerçeve ayrıştırma hatası: {e}")
+                continue
+            finally:
+                self.parse_time.add(time.perf_counter() - started)
+
+            for key, event in events:
+                target = self.event_queues[hash(key) % len(self.event_queues)]
+                try:
+                    target.put((time.perf_counter(), event), timeout=5)
+                except queue.Full:
+                    self.delivery_errors += 1
+                    logger.error(f"[{self.name}] Teslim kuyruğu dolu, olay düşürüldü (anahtar: {key})")
+
+    def _deliver_loop(self, events: queue.Queue):
+        while True:
+            item = events.get()
+            if item is _STOP:
+                break
+            enqueued_at, event = item
+            started = time.perf_counter()
+            self.event_wait.add(started - enqueued_at)
+            try:
+                self.deliver(event)
+                self.events_delivered += 1
+            except Exception as e:
+                self.delivery_errors += 1
+                logger.error(f"[{self.name}] Olay teslim hatası: {e}")
+            finally:
+                self.delivery_time.add(time.perf_counter() - started)
+
+    def start(self) -> bool:
+        if self.is_running:
+            return False
+        if any(thread.is_alive() for thread in self._threads):
+            # Önceki stop() zaman aşımına uğradı; tek ayrıştırıcı varsayımı bozulmasın
+            logger.error(f"[{self.name}] Önceki worker'lar hâlâ çalışıyor, hat başlatılmadı")
+            return False
+        self.is_running = True
+        self._threads = [threading.Thread(target=self._parse_loop, daemon=True, name=f"{self.name}-parse")]
+        for i, events in enumerate(self.event_queues):
+            self._threads.append(threading.Thread(
+                target=self._deliver_loop, args=(events,), daemon=True, name=f"{self.name}-deliver-{i}"
+            ))
+        for thread in self._threads:
+            thread.start()
+        return True
+
+    def stop(self, timeout: Optional[float] = 5):
+        """Kuyruktakiler işlendikten sonra worker'ları durdur"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.frames.put(_STOP)
+        # Ayrıştırıcı durma sinyalini teslim kuyruklarına kendisi iletir
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        alive = [thread.name for thread in self._threads if thread.is_alive()]
+        if alive:
+            logger.warning(f"[{self.name}] Worker'lar zaman aşımında durmadı: {', '.join(alive)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.is_running,
+            'frame_queue_depth': self.frames.qsize(),
+            'frame_queue_capacity': self.frames.maxsize,
+            'event_queue_depths': [q.qsize() for q in self.event_queues],
+            'frames_received': self.frames_received,
+            'frames_dropped': self.frames_dropped,
+            'events_delivered': self.events_delivered,
+            'parse_errors': self.parse_errors,
+            'delivery_errors': self.delivery_errors,
+            'latency': {
+                'queue_wait': self.queue_wait.get_stats(),
+                'parse': self.parse_time.get_stats(),
+                'event_wait': self.event_wait.get_stats(),
+                'delivery': self.delivery_time.get_stats(),
+            },
+        }
@@ -0,0 +1,162 @@
+"""
+Akışlı Excel Dışa Aktarımı
+Satırları DataFrame'e toplamak yerine üretildikçe doğrudan XlsxWriter'a yazar
+ve sütun genişliklerini yazım sırasında günceller. Büyük listelerde
+constant_memory modu açılır: her satır yazıldığı anda geçici dosyaya aktarılır.
+Bu modda XlsxWriter tablo nesnesi (add_table) desteklemediği için 'Kullanıcılar'
+tablo görünümü başlık biçimi, otomatik filtre ve şeritli satırlarla verilir.
+"""
+
+import logging
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import xlsxwriter
+except ImportError:  # XlsxWriter yoksa pandas + openpyxl ile toplu yazılır
+    xlsxwriter = None
+
+logger = logging.getLogger(__name__)
+
+# KPI raporundaki tercih edilen sütun sırası
+KPI_COLUMNS = [
+    'ID', 'Kullanıcı Adı', 'İsim', 'Telefon', 'E-posta', 'Bakiye', 'Son Giriş',
+    'Toplam Yatırım', 'Toplam Çekim', 'Son Yatırım',
+    'Kayıt Tarihi', 'Doğum Tarihi', 'Partner', 'Son Para Yatırma', 'Son Casino Bahis'
+]
+
+# Toplu fraud raporunun sabit sütunları (oluşturulamayan satırlarda yalnızca ID ve Hata dolu)
+FRAUD_COLUMNS = [
+    'ID', 'Kullanıcı Adı', 'İsim', 'Bakiye', 'Toplam Yatırım', 'Yatırım Adedi',
+    'Toplam Çekim', 'Çekim Adedi', 'Son Yatırım', 'Talep Miktarı', 'Talep Yöntemi',
+    'Oyun Türü', 'Oyuna Devam', 'Çevrim Kaynağı', 'Çevrim Tutarı', 'Çevrim Oranı',
+    'Çevrim Durumu', 'Net Kar', 'IP Sayısı (30g)', 'Ort. Oturum (saat)', 'En Yoğun Saat',
+    'Cihaz', 'Aktiflik (gün)', 'Çevrim Açıklaması', 'Hata'
+]
+
+MIN_COLUMN_WIDTH = 12
+MAX_COLUMN_WIDTH = 60
+
+# 'Table Style Medium 9' şerit rengi (constant_memory modunda elle uygulanır)
+BAND_COLOR = '#DCE6F1'
+
+
+class StreamingExcelWriter:
+    """Satırları geldikçe yazan tek sayfalık XLSX yazıcı (istenirse sabit bellekli)"""
+
+    def __init__(self, sheet_name: str = 'Kullanıcılar', preferred_columns: Optional[List[str]] = None,
+                 constant_memory: bool = False, columns: Optional[List[str]] = None):
+        """
+        Args:
+            sheet_name: Sayfa adı
+            preferred_columns: Önce gelecek sütunlar; ilk satırdaki diğer sütunlar sona eklenir
+            constant_memory: Satırları yazıldığı anda diske aktar (büyük dışa aktarımlar için)
+            columns: Sabit sütun listesi; verilirse sütunlar ilk satırdan seçilmez,
+                satırda olmayan sütunlar boş yazılır
+        """
+        self.sheet_name = sheet_name
+        self.constant_memory = constant_memory
+        self.preferred_columns = KPI_COLUMNS if preferred_columns is None else preferred_columns
+        self.output = BytesIO()
+        self.columns = None
+        self.widths = []
+        self.rows_written = 0
+        self._buffered = []  # Yalnızca XlsxWriter yoksa kullanılır
+
+        self.workbook = None
+        self.worksheet = None
+        if xlsxwriter is not None:
+            self.workbook = xlsxwriter.Workbook(self.output, {'constant_memory': constant_memory})
+            self.worksheet = self.workbook.add_worksheet(sheet_name)
+            self.header_fmt = self.workbook.add_format({
+                'bold': True,
+                'text_wrap': True,
+                'valign': 'vcenter',
+                'align': 'center',
+                'bg_color': '#1E88E5',
+                'font_color': '#FFFFFF',
+                'border': 1
+            })
+            self.cell_fmt = self.workbook.add_format({
+                'align': 'center',
+                'valign': 'vcenter',
+                'border': 1
+            })
+            self.band_fmt = self.workbook.add_format({
+                'align': 'center',
+                'valign': 'vcenter',
+                'border': 1,
+                'bg_color': BAND_COLOR
+            })
+
+        if columns is not None:
+            self._write_header(list(columns))
+
+    def _start(self, first_row: Dict[str, Any]):
+        """Sütunları ilk satırdan belirle ve başlık satırını yaz"""
+        self._write_header([c for c in self.preferred_columns if c in first_row] +
+                           [c for c in first_row if c not in self.preferred_columns])
+
+    def _write_header(self, columns: List[str]):
+        self.columns = columns
+        self.widths = [len(str(col)) for col in self.columns]
+        if self.worksheet is not None:
+            self.worksheet.write_row(0, 0, self.columns, self.header_fmt)
+
+    def write_row(self, row: Dict[str, Any]):
+        """Tek satır yaz"""
+        if self.columns is None:
+            self._start(row)
+
+        values = [row.get(col) for col in self.columns]
+        for idx, value in enumerate(values):
+            length = len(str(value)) if value is not None else 0
+            if length > self.widths[idx]:
+                self.widths[idx] = length
+
+        if self.worksheet is not None:
+            if self.constant_memory:
+                fmt = self.band_fmt if self.rows_written % 2 == 0 else self.cell_fmt
+                self.worksheet.write_row(self.rows_written + 1, 0, values, fmt)
+            else:
+                self.worksheet.write_row(self.rows_written + 1, 0, values)
+        else:
+            self._buffered.append(values)
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.write_row(row)
+
+    def close(self) -> BytesIO:
+        """Tabloyu/genişlikleri ekle, dosyayı kapat ve başa sarılmış çıktıyı döndür"""
+        if self.worksheet is None:
+            import pandas as pd
+            df = pd.DataFrame(self._buffered, columns=self.columns or [])
+            with pd.ExcelWriter(self.output, engine='openpyxl') as writer:
+                df.to_excel(writer, index=False, sheet_name=self.sheet_name)
+            self.output.seek(0)
+            return self.output
+
+        if self.columns:
+            ncols = len(self.columns)
+            if self.constant_memory:
+                self.worksheet.autofilter(0, 0, self.rows_written, ncols - 1)
+            else:
+                columns = [{'header': col, 'header_format': self.header_fmt} for col in self.columns]
+                self.worksheet.add_table(0, 0, self.rows_written + 1, ncols - 1, {
+                    'style': 'Table Style Medium 9',
+                    'columns': columns
+                })
+
+            # Sütun genişlikleri (yazım sırasında izlenen en uzun değer)
+            for idx, maxlen in enumerate(self.widths):
+                width = min(MAX_COLUMN_WIDTH, max(MIN_COLUMN_WIDTH, maxlen + 2))
+                self.worksheet.set_column(idx, idx, width, self.cell_fmt)
+
+            # Başlık satırını sabitle
+            self.worksheet.freeze_panes(1, 0)
+
+        self.workbook.close()
+        self.output.seek(0)
+        return self.output
@@ -0,0 +1,83 @@
+"""
+WebSocket Çerçeve Kaydedici
+Listener'a gelen ham SignalR çerçevelerini zaman damgasıyla JSON Lines
+dosyasına yazar. Kayıtlar bench_listener.py ile yeniden oynatılarak işlem
+hattının hızı ve tekrar önleme davranışı ölçülür.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRecorder:
+    """Ham çerçeveleri {"t": epoch, "f": çerçeve} satırları olarak kaydeden yazıcı"""
+
+    def __init__(self, path: str, max_frames: Optional[int] = None, flush_every: int = 100):
+        """
+        Args:
+            path: Kayıt dosyası (ekleme modunda açılır)
+            max_frames: Bu kadar çerçeveden sonra kaydı durdur (None = sınırsız)
+            flush_every: Diske yazma aralığı (çerçeve)
+        """
+        self.path = path
+        self.max_frames = max_frames
+        self.flush_every = max(1, flush_every)
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def record(self, frame: str):
+        """Çerçeveyi kaydet (socket thread'inden çağrılır, hata fırlatmaz)"""
+        if self._file is None:
+            return
+        line = json.dumps({'t': time.time(), 'f': frame}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.write(line)
+                self.recorded += 1
+                if self.recorded % self.flush_every == 0:
+                    self._file.flush()
+            except Exception as e:
+                logger.error(f"Çerçeve kaydı yazılamadı: {e}")
+                self._close()
+                return
+            if self.max_frames and self.recorded >= self.max_frames:
+                logger.info(f"Çerçeve kaydı tamamlandı: {self.recorded} çerçeve ({self.path})")
+                self._close()
+
+    def _close(self):
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        self._file = None
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._close()
+
+
+def iter_recorded_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """Kayıt dosyasındaki (zaman, çerçeve) çiftleri"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield item.get('t', 0.0), item.get('f', '')
@@ -0,0 +1,262 @@
+"""
+Çekim Uyarısı Fraud Ön Hesaplayıcı
+Yeni çekim talebi (State 0) geldiğinde müşterinin fraud raporu, operatör
+/fraud kısayoluna basmadan arka planda hazırlanır. İşler sınırlı bir kuyruğa
+alınır ve bot'un event loop'unda sabit sayıda worker tarafından işlenir
+(backoffice istemcisi o loop'a bağlıdır). Hazır rapor müşteri ID'siyle
+önbelleğe yazılır ve uyarı mesajına yanıt olarak gönderilir; /fraud isteği
+önbellekten ya da hâlâ hesaplanıyorsa aynı işin sonucundan anında döner.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FraudReportCache:
+    """Müşteri ID -> (rapor, zaman) TTL ve boyut sınırlı önbellek"""
+
+    def __init__(self, ttl: float = 900, max_size: int = 500):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, client_id) -> Optional[str]:
+        key = str(client_id)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or time.time() - item[1] > self.ttl:
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return item[0]
+
+    def put(self, client_id, report: str):
+        key = str(client_id)
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (report, time.time())
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class FraudPrecomputer:
+    """Çekim uyarıları için sınırlı worker havuzlu arka plan fraud raporu hesaplayıcı"""
+
+    def __init__(self,
+                 compute: Callable[[str], Awaitable[Optional[str]]],
+                 on_ready: Optional[Callable[[str, str, Any], Awaitable[None]]] = None,
+                 workers: int = 2,
+                 queue_size: int = 100,
+                 cache_ttl: float = 900,
+                 cache_size: int = 500,
+                 enabled: bool = False):
+        """
+        Args:
+            compute: Müşteri ID'si için rapor metni üreten coroutine (None = oluşturulamadı)
+            on_ready: Rapor hazır olunca her uyarı mesajı için çağrılır (client_id, rapor, Message)
+            workers: Aynı anda hazırlanan en fazla rapor
+            queue_size: Bekleyen en fazla iş (dolu kuyrukta yeni işler düşürülür)
+            cache_ttl: Hazır raporun geçerli sayılacağı süre (saniye)
+            cache_size: Önbellekte tutulacak en fazla rapor
+            enabled: Yeni çekimlerde otomatik ön hesaplama açık mı
+        """
+        self.compute = compute
+        self.on_ready = on_ready
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.enabled = enabled
+        self.cache = FraudReportCache(ttl=cache_ttl, max_size=cache_size)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Kuyrukta/hesaplanmakta olan müşteri -> (sonuç future'ı, yanıtlanacak uyarı future'ları)
+        self._pending: Dict[str, tuple] = {}
+        # Uyarı gönderimini bekleyen yanıt görevleri (worker'lar Telegram kuyruğunu beklemez)
+        self._reply_tasks: set = set()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.joined = 0
+        self.durations: List[float] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self.loop is not None and bool(self._tasks)
+
+    # ---- Yaşam döngüsü (bot'un event loop'unda) ----
+
+    async def start(self):
+        """Worker'ları çalışan event loop'ta başlat"""
+        if self.is_running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"fraud-precompute-{i}") for i in range(self.workers)
+        ]
+        logger.info(f"Fraud ön hesaplama başlatıldı ({self.workers} worker)")
+
+    async def stop(self):
+        """Worker'ları durdur; bekleyen işler ve yanıtlar iptal edilir (uyarı mesajları etkilenmez)"""
+        tasks, self._tasks = self._tasks + list(self._reply_tasks), []
+        self._reply_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for result, _ in self._pending.values():
+            if not result.done():
+                result.cancel()
+        self._pending.clear()
+        self.loop = None
+
+    # ---- İş gönderimi (herhangi bir thread'den) ----
+
+    def submit(self, client_id, alert_futures: Optional[List[concurrent.futures.Future]] = None) -> bool:
+        """Müşteri için rapor işini kuyruğa al; hazır olunca uyarı mesajlarına yanıt verilir
+
+        alert_futures: Bildirim göndericisinin döndürdüğü, gönderilen uyarı
+        Message'ını taşıyan Future'lar. Kuyruk doluysa veya çalışmıyorsa False.
+        """
+        loop = self.loop
+        if not self.enabled or loop is None or not str(client_id).isdigit():
+            return False
+        self.submitted += 1
+        loop.call_soon_threadsafe(self._enqueue, str(client_id), list(alert_futures or ()))
+        return True
+
+    def _enqueue(self, client_id: str, alert_futures: List[concurrent.futures.Future]):
+        # Aynı müşteri için bekleyen iş varsa yalnızca yanıtlanacak uyarılar eklenir
+        pending = self._pending.get(client_id)
+        if pending is not None:
+            pending[1].extend(alert_futures)
+            self.joined += 1
+            return
+
+        report = self.cache.get(client_id)
+        if report is not None:
+            # Önbellekte taze rapor var: yeniden hesaplamadan uyarıya yanıtla
+            for alert in alert_futures:
+                self._spawn_reply(client_id, report, alert)
+            return
+
+        if self._queue is None or self._queue.full():
+            self.dropped += 1
+            logger.warning(f"Fraud ön hesaplama kuyruğu dolu, müşteri {client_id} atlandı")
+            return
+        self._pending[client_id] = (self.loop.create_future(), alert_futures)
+        self._queue.put_nowait(client_id)
+
+    # ---- Sonuç alma (bot'un event loop'unda) ----
+
+    async def get_report(self, client_id) -> Optional[str]:
+        """Önbellekteki rapor; iş hâlâ sürüyorsa sonucunu bekle (yoksa None)"""
+        report = self.cache.get(client_id)
+        if report is not None:
+            return report
+        pending = self._pending.get(str(client_id))
+        if pending is None or self.loop is not asyncio.get_running_loop():
+            return None
+        try:
+            return await asyncio.shield(pending[0])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return None
+
+    def store(self, client_id, report: Optional[str]):
+        """İstek üzerine hazırlanan raporu da önbelleğe yaz"""
+        if report:
+            self.cache.put(client_id, report)
+
+    # ---- Worker ----
+
+    async def _worker(self):
+        while True:
+            client_id = await self._queue.get()
+            result, alert_futures = self._pending[client_id]
+            started = time.perf_counter()
+            report = None
+            try:
+                report = await self.compute(client_id)
+            except asyncio.CancelledError:
+                result.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Fraud ön hesaplama hatası (müşteri {client_id}): {e}")
+            finally:
+                self._pending.pop(client_id, None)
+                self._queue.task_done()
+
+            self.durations.append(time.perf_counter() - started)
+            if len(self.durations) > 200:
+                del self.durations[:-200]
+            if report:
+                self.completed += 1
+                self.cache.put(client_id, report)
+            else:
+                self.failed += 1
+            if not result.done():
+                result.set_result(report)
+            if report:
+                for alert in alert_futures:
+                    self._spawn_reply(client_id, report, alert)
+
+    def _spawn_reply(self, client_id: str, report: str, alert: concurrent.futures.Future):
+        task = asyncio.create_task(self._reply(client_id, report, alert))
+        self._reply_tasks.add(task)
+        task.add_done_callback(self._reply_tasks.discard)
+
+    async def _reply(self, client_id: str, report: str, alert: concurrent.futures.Future):
+        """Uyarı gönderildikten sonra rapor yanıtını ilet"""
+        if self.on_ready is None:
+            return
+        try:
+            # shield: yanıt iptal edilirse uyarının Future'ı iptal edilmez (mesaj kuyrukta kalır)
+            message = await asyncio.shield(asyncio.wrap_future(alert))
+        except Exception as e:
+            logger.debug(f"Uyarı mesajı gönderilemediği için fraud yanıtı atlandı ({client_id}): {e}")
+            return
+        try:
+            await self.on_ready(client_id, report, message)
+        except Exception as e:
+            logger.error(f"Fraud raporu yanıtı gönderilemedi (müşteri {client_id}): {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        durations = sorted(self.durations)
+        return {
+            'enabled': self.enabled,
+            'running': self.is_running,
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'pending': len(self._pending),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'joined': self.joined,
+            'cache_size': len(self.cache),
+            'cache_hits': self.cache.hits,
+            'p95': durations[int(0.95 * (len(durations) - 1))] if durations else 0.0,
+        }
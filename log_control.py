@@ -0,0 +1,177 @@
+"""
+Log Hacmi Kontrolü
+Sıcak yoldaki (listener, SignalR istemcisi) loglar bileşen başına ayrı
+logger'lardan geçer. Seviyesi kapalı mesajlar hiç biçimlendirilmez, büyük
+payload dökümleri (json.dumps) yalnızca DEBUG açıkken ve örneklenerek (her N
+kayıttan biri) üretilir; atlanan mesajlar sayılır. Bileşen seviyeleri
+LOG_LEVELS ortam değişkeninden okunur ve çalışma anında panelden değiştirilebilir.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# Bileşen adı -> logger adı
+COMPONENTS = {
+    'bot': 'bot',
+    'listener': 'bot.listener',
+    'signalr': 'signalr_client',
+    'pipeline': 'event_pipeline',
+    'notifier': 'notification_dispatcher',
+    'backoffice': 'backoffice_client',
+}
+
+LEVEL_NAMES = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+
+
+class LazyJSON:
+    """Yalnızca log kaydı gerçekten yazılırken json.dumps yapan sarmalayıcı"""
+
+    __slots__ = ('obj', 'limit')
+
+    def __init__(self, obj: Any, limit: int = 2000):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        try:
+            text = json.dumps(self.obj, indent=2, ensure_ascii=False, default=str)
+        except Exception:
+            text = repr(self.obj)
+        if self.limit and len(text) > self.limit:
+            return f"{text[:self.limit]}... (+{len(text) - self.limit} karakter)"
+        return text
+
+
+class ComponentLogger:
+    """Seviye kontrolü biçimlendirmeden önce yapılan, örneklemeli bileşen logger'ı"""
+
+    def __init__(self, component: str, logger: logging.Logger, sample_every: int = 50):
+        self.component = component
+        self.logger = logger
+        self.sample_every = max(1, sample_every)
+        self.suppressed = 0
+        self.emitted = 0
+        self._payloads = 0
+
+    def log(self, level: int, msg: str, *args, **kwargs):
+        """logging.Logger.log gibi; %-biçimlendirme yalnızca kayıt yazılırken yapılır"""
+        if not self.logger.isEnabledFor(level):
+            self.suppressed += 1
+            return
+        self.emitted += 1
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg: str, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+    def event(self, level: int, name: str, **fields):
+        """Yapılandırılmış kayıt: 'ad anahtar=değer ...'"""
+        if not self.logger.isEnabledFor(level):
+            self.suppressed += 1
+            return
+        self.emitted += 1
+        self.logger.log(level, "%s %s", name, " ".join(f"{k}={v}" for k, v in fields.items()))
+
+    def payload(self, label: str, obj: Any, level: int = logging.DEBUG, limit: int = 2000):
+        """Büyük veri dökümü: seviye açıksa her sample_every kayıttan biri yazılır"""
+        if not self.logger.isEnabledFor(level):
+            self.suppressed += 1
+            return
+        self._payloads += 1
+        if (self._payloads - 1) % self.sample_every:
+            self.suppressed += 1
+            return
+        self.emitted += 1
+        self.logger.log(level, "%s (örnek 1/%d): %s", label, self.sample_every, LazyJSON(obj, limit))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'level': logging.getLevelName(self.logger.getEffectiveLevel()),
+            'emitted': self.emitted,
+            'suppressed': self.suppressed,
+            'sample_every': self.sample_every,
+        }
+
+
+class LogControl:
+    """Bileşen logger'larını ve seviyelerini yöneten kayıt defteri"""
+
+    def __init__(self, levels: Optional[str] = None, sample_every: int = 50):
+        """
+        Args:
+            levels: 'listener=WARNING,signalr=INFO' biçiminde başlangıç seviyeleri
+            sample_every: Payload dökümlerinde örnekleme aralığı
+        """
+        self.sample_every = sample_every
+        self._loggers: Dict[str, ComponentLogger] = {}
+        self._lock = threading.Lock()
+        for item in (levels or '').split(','):
+            component, _, level = item.partition('=')
+            if component.strip() and level.strip():
+                self.set_level(component.strip(), level.strip())
+
+    def get_logger(self, component: str) -> ComponentLogger:
+        with self._lock:
+            component_logger = self._loggers.get(component)
+            if component_logger is None:
+                name = COMPONENTS.get(component, component)
+                component_logger = self._loggers[component] = ComponentLogger(
+                    component, logging.getLogger(name), self.sample_every
+                )
+            return component_logger
+
+    def set_level(self, component: str, level: str) -> bool:
+        """Bileşen seviyesini değiştir (DEBUG/INFO/WARNING/ERROR)"""
+        level = str(level).upper()
+        if level not in LEVEL_NAMES:
+            return False
+        self.get_logger(component).logger.setLevel(level)
+        return True
+
+    def get_levels(self) -> Dict[str, str]:
+        return {
+            component: logging.getLevelName(logging.getLogger(name).getEffectiveLevel())
+            for component, name in COMPONENTS.items()
+        }
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            loggers = dict(self._loggers)
+        return {component: component_logger.get_stats() for component, component_logger in loggers.items()}
+
+    def total_suppressed(self) -> int:
+        with self._lock:
+            return sum(component_logger.suppressed for component_logger in self._loggers.values())
+
+
+# Global log control instance
+_global_log_control = None
+_global_log_control_lock = threading.Lock()
+
+def get_log_control() -> LogControl:
+    """Global log kontrolünü döndür"""
+    global _global_log_control
+    with _global_log_control_lock:
+        if _global_log_control is None:
+            _global_log_control = LogControl(
+                levels=os.getenv('LOG_LEVELS', ''),
+                sample_every=int(os.getenv('LOG_PAYLOAD_SAMPLE_EVERY', '50')),
+            )
+        return _global_log_control
+
+
+def get_component_logger(component: str) -> ComponentLogger:
+    """Bileşen logger'ı (global log kontrolü üzerinden)"""
+    return get_log_control().get_logger(component)
@@ -0,0 +1,288 @@
+"""
+GitHub Log Senkronizasyonu
+Sorgu log segmentlerini Telegram yanıtını bekletmeden arka planda GitHub'a
+gönderir. Eklenen kayıtlar biriktirilir; bekleyen kayıt sayısı veya ilk
+kayıttan bu yana geçen süre eşiği aşınca yalnızca değişen segmentler push
+edilir. İşçi thread'i ve panelden elle push aynı anda çalışmaz (push
+kilidi). SHA çakışmasında (409/422) SHA yenilenip artan beklemeyle tekrar
+denenir.
+"""
+
+import base64
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubLogSync:
+    """Log segmentlerini toplu ve gecikmeli olarak GitHub'a push eden arka plan işçisi"""
+
+    def __init__(self,
+                 github_token: Optional[str],
+                 github_repo: str,
+                 remote_dir: str = "logs",
+                 batch_size: int = 20,
+                 flush_interval: float = 60,
+                 max_retries: int = 4,
+                 backoff: float = 2.0):
+        """
+        Args:
+            github_token: GitHub API token'ı (yoksa senkronizasyon kapalı)
+            github_repo: https://github.com/<owner>/<repo> biçiminde depo adresi
+            remote_dir: Segmentlerin depodaki klasörü
+            batch_size: Bu kadar kayıt birikince beklemeden push et
+            flush_interval: İlk bekleyen kayıttan sonra en geç push süresi (saniye)
+            max_retries: Çakışma/ağ hatasında tekrar deneme sayısı
+            backoff: Tekrar denemeler arası temel bekleme (saniye, katlanarak artar)
+        """
+        self.github_token = github_token
+        self.github_repo = github_repo
+        self.remote_dir = remote_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        # Push'ları sıralar: işçi ve elle push aynı segmenti aynı anda göndermez (SHA çakışması)
+        self._push_lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._dirty = {}  # segment yolu -> bekleyen kayıt sayısı
+        self._pending = 0
+        self._first_pending_at = None
+        self._shas = {}  # uzak yol -> son bilinen SHA
+        self.is_running = False
+        self.thread = None
+
+        self.pushes = 0
+        self.conflicts = 0
+        self.failures = 0
+        self.last_push_time = None
+        self.last_error = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.github_token)
+
+    # ---- Kuyruk ----
+
+    def mark_dirty(self, segment_path: str, count: int = 1):
+        """Segmente yeni kayıt eklendiğini bildir (çağıran hiç beklemez)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._dirty[segment_path] = self._dirty.get(segment_path, 0) + count
+            self._pending += count
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+            if self._pending >= self.batch_size:
+                self._wakeup.set()
+        if not self.is_running:
+            self.start()
+
+    def _take_batch(self, force: bool = False) -> Dict[str, int]:
+        """Eşik aşıldıysa bekleyen segmentleri al ve kuyruğu boşalt"""
+        with self._lock:
+            if not self._dirty:
+                return {}
+            age = time.monotonic() - self._first_pending_at
+            if not force and self._pending < self.batch_size and age < self.flush_interval:
+                return {}
+            batch, self._dirty = self._dirty, {}
+            self._pending = 0
+            self._first_pending_at = None
+            return batch
+
+    def _requeue(self, batch: Dict[str, int]):
+        with self._lock:
+            for path, count in batch.items():
+                self._dirty[path] = self._dirty.get(path, 0) + count
+                self._pending += count
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+
+    # ---- Push ----
+
+    def _contents_url(self, segment_path: str) -> Tuple[str, str]:
+        repo_parts = self.github_repo.replace('https://github.com/', '').split('/')
+        owner, repo = repo_parts[0], repo_parts[1]
+        remote_path = f"{self.remote_dir}/{os.path.basename(segment_path)}"
+        return remote_path, f"https://api.github.com/repos/{owner}/{repo}/contents/{remote_path}"
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"token {self.github_token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+
+    def _fetch_sha(self, url: str) -> Optional[str]:
+        response = self.session.get(url, headers=self._headers(), timeout=15)
+        if response.status_code == 200:
+            return response.json().get('sha')
+        return None
+
+    def push_segment(self, segment_path: str) -> Tuple[bool, str]:
+        """Tek segmenti push et (çakışmada SHA yenilenir, artan beklemeyle tekrar denenir)"""
+        with self._push_lock:
+            return self._push_segment(segment_path)
+
+    def _push_segment(self, segment_path: str) -> Tuple[bool, str]:
+        if not self.enabled:
+            return False, "GitHub token bulunamadı"
+        if not os.path.exists(segment_path):
+            return False, "Segment dosyası bulunamadı"
+
+        remote_path, url = self._contents_url(segment_path)
+        with open(segment_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+
+        error = "Bilinmeyen hata"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                sha = self._shas.get(remote_path)
+                if sha is None:
+                    sha = self._fetch_sha(url)
+
+                data = {
+                    "message": f"Log güncelleme - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    "content": encoded_content
+                }
+                if sha:
+                    data["sha"] = sha
+
+                response = self.session.put(url, headers=self._headers(), json=data, timeout=30)
+
+                if response.status_code in (200, 201):
+                    self._shas[remote_path] = response.json().get('content', {}).get('sha')
+                    self.pushes += 1
+                    self.last_push_time = datetime.now()
+                    return True, "Başarıyla GitHub'a yüklendi"
+
+                if response.status_code in (409, 422):
+                    # SHA eskimiş (başka bir yazıcı güncellemiş), yeniden al
+                    self.conflicts += 1
+                    self._shas.pop(remote_path, None)
+                    error = f"GitHub çakışması: {response.status_code}"
+                    continue
+
+                if response.status_code >= 500 or response.status_code == 429:
+                    error = f"GitHub API hatası: {response.status_code}"
+                    continue
+
+                error = f"GitHub API hatası: {response.status_code}"
+                break
+
+            except requests.exceptions.RequestException as e:
+                error = f"GitHub bağlantı hatası: {e}"
+
+        self.failures += 1
+        self.last_error = error
+        logger.error(f"Log segmenti push edilemedi ({remote_path}): {error}")
+        return False, error
+
+    def flush(self, force: bool = True) -> bool:
+        """Bekleyen segmentleri şimdi push et; başarısızlar kuyruğa geri döner"""
+        with self._push_lock:
+            return self._flush(force)[0]
+
+    def _flush(self, force: bool) -> Tuple[bool, Set[str]]:
+        """(hepsi başarılı mı, push edilen segmentler); _push_lock altında çağrılır"""
+        batch = self._take_batch(force=force)
+        if not batch:
+            return True, set()
+        failed = {}
+        for path, count in batch.items():
+            ok, _ = self._push_segment(path)
+            if not ok:
+                failed[path] = count
+        if failed:
+            self._requeue(failed)
+        return not failed, set(batch) - set(failed)
+
+    def push_now(self, segment_path: str) -> Tuple[bool, str]:
+        """Bekleyenleri ve verilen segmenti hemen push et (bekleyenlerle gittiyse tekrar gönderilmez)"""
+        if not self.enabled:
+            return False, "GitHub token bulunamadı"
+        with self._push_lock:
+            ok, pushed = self._flush(force=True)
+            if not ok:
+                return False, self.last_error or "GitHub push hatası"
+            if segment_path in pushed:
+                return True, "Başarıyla GitHub'a yüklendi"
+            if not os.path.exists(segment_path):
+                return True, "Bekleyen log gönderildi (bugüne ait log yok)"
+            return self._push_segment(segment_path)
+
+    # ---- İşçi ----
+
+    def _run(self):
+        while self.is_running:
+            self._wakeup.wait(timeout=min(self.flush_interval, 5))
+            self._wakeup.clear()
+            try:
+                self.flush(force=False)
+            except Exception as e:
+                logger.error(f"Log senkronizasyon döngü hatası: {e}")
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.is_running:
+                return False
+            self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="github-log-sync")
+        self.thread.start()
+        return True
+
+    def stop(self, flush: bool = True):
+        """İşçiyi durdur ve (istenirse) kalan kayıtları push et"""
+        self.is_running = False
+        self._wakeup.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=10)
+        if flush:
+            self.flush(force=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+            segments = len(self._dirty)
+        return {
+            'enabled': self.enabled,
+            'running': self.is_running,
+            'pending_entries': pending,
+            'pending_segments': segments,
+            'pushes': self.pushes,
+            'conflicts': self.conflicts,
+            'failures': self.failures,
+            'last_push_time': self.last_push_time.isoformat() if self.last_push_time else None,
+            'last_error': self.last_error,
+        }
+
+
+# Global sync instance
+_global_sync = None
+_global_sync_lock = threading.Lock()
+
+def get_github_log_sync() -> GitHubLogSync:
+    """Global GitHub log senkronizasyon işçisini döndür"""
+    global _global_sync
+    with _global_sync_lock:
+        if _global_sync is None:
+            _global_sync = GitHubLogSync(
+                github_token=os.getenv('GITHUB_TOKEN'),
+                github_repo=os.getenv('GITHUB_REPO', 'https://github.com/Saxblue/telebot'),
+                batch_size=int(os.getenv('LOG_SYNC_BATCH_SIZE', '20')),
+                flush_interval=float(os.getenv('LOG_SYNC_INTERVAL', '60')),
+            )
+        return _global_sync
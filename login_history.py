@@ -0,0 +1,251 @@
+"""
+Müşteri Giriş Geçmişi Önbelleği
+GetClientLogins her fraud raporunda 90 günlük geçmişi baştan indirmek yerine
+müşteri başına saklanan oturumlara yalnızca en yeni kayıtlı girişten sonraki
+kayıtları (delta) ekler. Zamanlar ayrıştırılıp sayısal (epoch saniye) olarak,
+IP ve cihaz adları kodlanarak kompakt dizilerde (array) tutulur; IP/saat/cihaz/
+oturum analizi sözlükler yerine bu diziler üzerinde numpy ile yapılır.
+Zaman damgaları api_datetime'ın önbellekli ayrıştırıcısıyla çevrilir.
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+from api_datetime import EPOCH, parse_api_epoch
+
+logger = logging.getLogger(__name__)
+
+# Saat aralığı -> zaman dilimi (analiz metnindeki sırayla)
+TIME_PERIODS = (
+    (0, 6, "Gece"),
+    (6, 12, "Sabah"),
+    (12, 18, "Öğleden sonra"),
+    (18, 24, "Akşam"),
+)
+
+
+def to_epoch(value: datetime) -> float:
+    """Saat dilimsiz datetime -> EPOCH'tan bu yana saniye"""
+    return (value - EPOCH).total_seconds()
+
+
+def from_epoch(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _mode(codes: np.ndarray):
+    """En sık kod ve sayısı; eşitlikte ilk görülen (sözlükle sayımdaki max() ile aynı)"""
+    counts = np.bincount(codes)
+    best = np.flatnonzero(counts == counts.max())
+    if len(best) > 1:
+        values, first_index = np.unique(codes, return_index=True)
+        first_seen = dict(zip(values.tolist(), first_index.tolist()))
+        best = [min(best.tolist(), key=first_seen.__getitem__)]
+    code = int(best[0])
+    return code, int(counts[code])
+
+
+class ClientLoginHistory:
+    """Tek müşterinin oturumları: sütun bazlı sayısal diziler"""
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.start = array('d')    # epoch saniye
+        self.end = array('d')      # epoch saniye (açık oturum: nan)
+        self.ip = array('i')       # self.ips içindeki kod
+        self.source = array('i')   # self.sources içindeki kod
+        self.ips: List[Any] = []
+        self.sources: List[Any] = []
+        self._ip_codes: Dict[Any, int] = {}
+        self._source_codes: Dict[Any, int] = {}
+        self._rows: Dict[Hashable, int] = {}  # oturum anahtarı -> satır
+        self.newest = -math.inf
+        self.fetched_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @staticmethod
+    def _row_key(login: Dict[str, Any]) -> Hashable:
+        row_id = login.get('Id')
+        if row_id is not None:
+            return row_id
+        return (login.get('StartTime'), login.get('LoginIP'), login.get('SourceName'))
+
+    def _code(self, value, codes: Dict[Any, int], values: List[Any]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def merge(self, logins: Iterable[Dict[str, Any]]) -> int:
+        """API satırlarını ekle; bilinen oturumların yalnızca bitiş zamanı güncellenir
+
+        Delta sorgusu en yeni girişten başladığı için o oturum tekrar gelir;
+        açık kalmış oturum kapandıysa bitiş zamanı bu sayede dolar.
+        """
+        added = 0
+        for login in logins:
+            key = self._row_key(login)
+            row = self._rows.get(key)
+            if row is not None:
+                end = parse_api_epoch(login.get('EndTime'))
+                if not math.isnan(end):
+                    self.end[row] = end
+                continue
+            start = parse_api_epoch(login.get('StartTime'))
+            self._rows[key] = len(self.start)
+            self.start.append(start)
+            self.end.append(parse_api_epoch(login.get('EndTime')))
+            self.ip.append(self._code(login.get('LoginIP', ''), self._ip_codes, self.ips))
+            self.source.append(self._code(login.get('SourceName', 'Bilinmiyor'), self._source_codes, self.sources))
+            if start > self.newest:
+                self.newest = start
+            added += 1
+        self.fetched_at = time.time()
+        return added
+
+    def prune(self, cutoff: float) -> int:
+        """cutoff'tan önce başlamış oturumları at (ayrıştırılamayanlar korunur)"""
+        start = np.frombuffer(self.start, dtype=np.float64)
+        old = start < cutoff
+        removed = int(old.sum())
+        if not removed:
+            return 0
+        keep = np.flatnonzero(~old)
+        remap = dict(zip(keep.tolist(), range(len(keep))))
+        self.start = array('d', start[keep].tobytes())
+        self.end = array('d', np.frombuffer(self.end, dtype=np.float64)[keep].tobytes())
+        self.ip = array('i', np.frombuffer(self.ip, dtype=np.int32)[keep].tobytes())
+        self.source = array('i', np.frombuffer(self.source, dtype=np.int32)[keep].tobytes())
+        self._rows = {key: remap[row] for key, row in self._rows.items() if row in remap}
+        return removed
+
+    def newest_datetime(self) -> Optional[datetime]:
+        """Delta sorgusunun başlangıcı: en yeni kayıtlı giriş"""
+        return from_epoch(self.newest) if math.isfinite(self.newest) else None
+
+    def analyze(self, since: datetime) -> Dict[str, Any]:
+        """since sonrası girişlerde IP, saat, cihaz, oturum süresi ve zaman dilimi analizi
+
+        Dönen sözlük: sessions, ip_count, most_active_hour ((saat, adet) / None),
+        most_used_device (None = yok), avg_session_hours (None = yok),
+        most_active_period.
+        """
+        start = np.frombuffer(self.start, dtype=np.float64)
+        recent = start >= to_epoch(since)  # nan (ayrıştırılamayan) dışarıda kalır
+        starts = start[recent]
+        result = {
+            'sessions': int(recent.sum()),
+            'ip_count': int(np.unique(np.frombuffer(self.ip, dtype=np.int32)[recent]).size),
+            'most_active_hour': None,
+            'most_used_device': None,
+            'avg_session_hours': None,
+        }
+
+        hours = (starts // 3600 % 24).astype(np.int64)
+        hour_counts = np.bincount(hours, minlength=24)
+        if hours.size:
+            result['most_active_hour'] = _mode(hours)
+            code, _ = _mode(np.frombuffer(self.source, dtype=np.int32)[recent].astype(np.int64))
+            result['most_used_device'] = self.sources[code]
+
+        ends = np.frombuffer(self.end, dtype=np.float64)[recent]
+        closed = ~np.isnan(ends)
+        if closed.any():
+            result['avg_session_hours'] = float(((ends[closed] - starts[closed]) / 3600).mean())
+
+        period_counts = [int(hour_counts[lo:hi].sum()) for lo, hi, _ in TIME_PERIODS]
+        result['most_active_period'] = TIME_PERIODS[int(np.argmax(period_counts))][2]
+        return result
+
+
+class LoginHistoryStore:
+    """Müşteri ID -> ClientLoginHistory (LRU, gün penceresi sınırlı)"""
+
+    def __init__(self, history_days: int = 90, max_clients: int = 2000):
+        """
+        Args:
+            history_days: Saklanan ve ilk sorguda istenen geçmiş (gün)
+            max_clients: Bellekte tutulacak en fazla müşteri (aşılırsa en eski kullanılan düşer)
+        """
+        self.history_days = history_days
+        self.max_clients = max(1, max_clients)
+        self._clients: "OrderedDict[str, ClientLoginHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.rows_received = 0
+        self.rows_added = 0
+        self.evictions = 0
+
+    def get(self, client_id) -> Optional[ClientLoginHistory]:
+        key = str(client_id)
+        with self._lock:
+            history = self._clients.get(key)
+            if history is not None:
+                self._clients.move_to_end(key)
+            return history
+
+    def fetch_start(self, client_id, now: Optional[datetime] = None) -> datetime:
+        """API sorgusunun başlangıcı: önbellekte giriş varsa en yenisi, yoksa tam pencere"""
+        history = self.get(client_id)
+        newest = history.newest_datetime() if history is not None else None
+        if newest is not None:
+            return newest
+        return (now or datetime.now()) - timedelta(days=self.history_days)
+
+    def merge(self, client_id, logins: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> ClientLoginHistory:
+        """API sonucunu müşterinin geçmişine ekle, pencere dışını at ve geçmişi döndür"""
+        key = str(client_id)
+        logins = list(logins or ())
+        cutoff = to_epoch((now or datetime.now()) - timedelta(days=self.history_days))
+        with self._lock:
+            history = self._clients.get(key)
+            if history is None or not math.isfinite(history.newest):
+                self.full_fetches += 1
+            else:
+                self.delta_fetches += 1
+            if history is None:
+                history = self._clients[key] = ClientLoginHistory(key)
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._clients.move_to_end(key)
+            self.rows_received += len(logins)
+            self.rows_added += history.merge(logins)
+            history.prune(cutoff)
+        return history
+
+    def invalidate(self, client_id):
+        with self._lock:
+            self._clients.pop(str(client_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = sum(len(history) for history in self._clients.values())
+            return {
+                'clients': len(self._clients),
+                'max_clients': self.max_clients,
+                'sessions': sessions,
+                'full_fetches': self.full_fetches,
+                'delta_fetches': self.delta_fetches,
+                'rows_received': self.rows_received,
+                'rows_added': self.rows_added,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,394 @@
+"""
+Telegram Bildirim Dağıtıcısı
+Çekim/yatırım bildirimleri listener worker thread'lerinden gelir. Her mesaj
+için yeni thread + asyncio.run() açmak yerine tek bir thread'de yaşayan tek
+bir event loop ve tek bir Telegram bağlantı havuzu kullanılır; mesajlar
+thread-safe olarak kuyruğa alınır. Teslim süresi ve bekleyen gönderim sayısı
+raporlanır.
+
+Gönderimler Telegram flood limitlerine göre zamanlanır: sohbet başına ve bot
+geneli token bucket, RetryAfter yanıtında sohbetin bekletilmesi, öncelik
+şeritleri (çekim > yatırım > bilgi) ve birikmesi eşiği aşan sohbetlerde
+bekleyen uyarıların tek bir özet mesajda birleştirilmesi.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, RetryAfter
+from telegram.request import HTTPXRequest
+
+from event_pipeline import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+# Öncelik şeritleri (küçük değer önce gönderilir)
+PRIORITY_WITHDRAWAL = 0
+PRIORITY_DEPOSIT = 1
+PRIORITY_INFO = 2
+LANE_NAMES = ('withdrawal', 'deposit', 'info')
+
+# Telegram mesaj uzunluğu sınırı
+MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+
+class TokenBucket:
+    """Saniyede rate token dolan, en fazla capacity token biriktiren kova"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Bir token için beklenecek süre (0 = hemen)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _ChatState:
+    """Sohbet başına öncelik şeritleri, kova ve bekletme durumu"""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.lanes = [deque() for _ in LANE_NAMES]
+        self.blocked_until = 0.0
+        # Sohbet içi sırayı korumak için sohbet başına tek gönderim
+        self.inflight = False
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+    def head(self) -> Optional[Dict[str, Any]]:
+        for lane in self.lanes:
+            if lane:
+                return lane[0]
+        return None
+
+    def requeue(self, items: List[Dict[str, Any]]):
+        """Gönderilemeyen mesajları şeritlerinin başına geri koy"""
+        for item in reversed(items):
+            self.lanes[item['priority']].appendleft(item)
+
+
+class NotificationDispatcher:
+    """Kendi event loop'u ve bağlantı havuzu olan, thread-safe Telegram gönderici"""
+
+    def __init__(self,
+                 token: str,
+                 pool_size: int = 8,
+                 concurrency: int = 4,
+                 name: str = "notify",
+                 global_rate: float = 30.0,
+                 chat_rate: float = 1.0,
+                 group_rate: float = 20 / 60,
+                 digest_threshold: int = 5,
+                 max_retries: int = 3):
+        """
+        Args:
+            token: Telegram bot token'ı
+            pool_size: Telegram HTTP bağlantı havuzu boyutu
+            concurrency: Aynı anda yapılan en fazla gönderim sayısı
+            name: Thread adı
+            global_rate: Bot geneli saniyede mesaj
+            chat_rate: Özel sohbet başına saniyede mesaj
+            group_rate: Grup/kanal (negatif ID) başına saniyede mesaj
+            digest_threshold: Sohbette bu kadar uyarı birikince özet mesaja birleştir (0 = kapalı)
+            max_retries: RetryAfter dışındaki geçici hatalarda tekrar deneme sayısı (BadRequest/Forbidden denenmez)
+        """
+        self.token = token
+        self.pool_size = pool_size
+        self.concurrency = max(1, concurrency)
+        self.name = name
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.digest_threshold = digest_threshold
+        self.max_retries = max_retries
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.bot: Optional[Bot] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.is_running = False
+
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chats: Dict[Any, _ChatState] = {}
+        self._inflight = 0
+
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.retry_after = 0
+        self.digests = 0
+        self.coalesced = 0
+        self.latency = LatencyWindow()
+
+    # ---- Yaşam döngüsü ----
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.is_running:
+                return False
+            self.is_running = True
+            self._stopping = False
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, daemon=True, name=self.name)
+            self._thread.start()
+        self._ready.wait(timeout=10)
+        return True
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    async def _main(self):
+        self._wakeup = asyncio.Event()
+        self.bot = Bot(self.token, request=HTTPXRequest(connection_pool_size=self.pool_size))
+        try:
+            await self.bot.initialize()
+        except Exception as e:
+            # get_me başarısız olsa da istek havuzu hazırdır; gönderimler denenir
+            logger.error(f"[{self.name}] Telegram bot başlatma hatası: {e}")
+        self._ready.set()
+
+        await self._schedule()
+        try:
+            await self.bot.shutdown()
+        except Exception as e:
+            logger.error(f"[{self.name}] Telegram bot kapatma hatası: {e}")
+
+    def stop(self, timeout: float = 10):
+        """Kuyruktaki mesajlar gönderildikten sonra loop'u kapat"""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.is_running = False
+        if self.loop is not None and self._wakeup is not None:
+            self.loop.call_soon_threadsafe(self._request_stop)
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _request_stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    # ---- Zamanlayıcı (dağıtıcı loop'unda çalışır) ----
+
+    def _chat_state(self, chat_id) -> _ChatState:
+        state = self.chats.get(chat_id)
+        if state is None:
+            try:
+                is_group = int(chat_id) < 0
+            except (TypeError, ValueError):
+                is_group = str(chat_id).startswith('@')
+            rate = self.group_rate if is_group else self.chat_rate
+            state = self.chats[chat_id] = _ChatState(TokenBucket(rate, max(1.0, rate * 3)))
+        return state
+
+    def _enqueue(self, item: Dict[str, Any]):
+        self._chat_state(item['kwargs']['chat_id']).lanes[item['priority']].append(item)
+        self._wakeup.set()
+
+    def _pick(self, now: float):
+        """Gönderilebilir en öncelikli sohbeti seç; yoksa en yakın hazır olma süresini döndür"""
+        best, best_key, wait = None, None, None
+        for chat_id, state in self.chats.items():
+            if state.inflight:
+                continue
+            head = state.head()
+            if head is None:
+                continue
+            delay = max(state.blocked_until - now, state.bucket.wait_time(now))
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            key = (head['priority'], head['submitted_at'])
+            if best_key is None or key < best_key:
+                best, best_key = chat_id, key
+        return best, wait
+
+    def _take(self, state: _ChatState) -> List[Dict[str, Any]]:
+        """Sıradaki mesajı al; birikme eşiği aşıldıysa birleştirilebilir uyarıları da topla"""
+        first = state.head()
+        state.lanes[first['priority']].popleft()
+        batch = [first]
+        if not (self.digest_threshold and first['coalesce'] and state.backlog + 1 >= self.digest_threshold):
+            return batch
+
+        parse_mode = first['kwargs'].get('parse_mode')
+        length = len(first['kwargs']['text']) + 64  # özet başlığı payı
+        for lane in state.lanes:
+            while lane and lane[0]['coalesce'] and lane[0]['kwargs'].get('parse_mode') == parse_mode:
+                extra = len(lane[0]['kwargs']['text']) + len(DIGEST_SEPARATOR)
+                if length + extra > MAX_MESSAGE_LENGTH:
+                    return batch
+                length += extra
+                batch.append(lane.popleft())
+        return batch
+
+    async def _schedule(self):
+        while True:
+            now = time.monotonic()
+            chat_id, wait = None, None
+            if self._inflight < self.concurrency:
+                wait = self.global_bucket.wait_time(now) or None
+                if wait is None:
+                    chat_id, wait = self._pick(now)
+
+            if chat_id is not None:
+                state = self.chats[chat_id]
+                batch = self._take(state)
+                state.bucket.consume(now)
+                self.global_bucket.consume(now)
+                state.inflight = True
+                self._inflight += 1
+                asyncio.create_task(self._send(chat_id, state, batch))
+                continue
+
+            if self._stopping and not self._inflight and not any(s.backlog for s in self.chats.values()):
+                break
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait if wait is not None else 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, chat_id, state: _ChatState, batch: List[Dict[str, Any]]):
+        kwargs = dict(batch[0]['kwargs'])
+        if len(batch) > 1:
+            count = f"<b>{len(batch)} bildirim</b>" if kwargs.get('parse_mode') == 'HTML' else f"{len(batch)} bildirim"
+            kwargs['text'] = f"📦 {count}" + DIGEST_SEPARATOR + DIGEST_SEPARATOR.join(
+                item['kwargs']['text'] for item in batch
+            )
+        message = None
+        try:
+            message = await self.bot.send_message(**kwargs)
+        except RetryAfter as e:
+            # Flood limiti: sohbeti Telegram'ın istediği kadar beklet, mesajları başa geri koy
+            self.retry_after += 1
+            delay = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else float(e.retry_after)
+            state.blocked_until = time.monotonic() + delay
+            state.requeue(batch)
+            logger.warning(f"[{self.name}] Telegram flood limiti ({chat_id}), {delay:.0f} sn bekleniyor")
+        except Exception as e:
+            logger.error(f"[{self.name}] Telegram gönderim hatası ({chat_id}): {e}")
+            # Geçersiz istek / engellenmiş sohbet tekrar denenince düzelmez
+            permanent = isinstance(e, (BadRequest, Forbidden))
+            retry = []
+            for item in batch:
+                item['attempts'] += 1
+                if not permanent and item['attempts'] <= self.max_retries:
+                    retry.append(item)
+                else:
+                    self.failed += 1
+                    if not item['future'].done():
+                        item['future'].set_exception(e)
+            if retry:
+                state.blocked_until = time.monotonic() + 2 ** retry[0]['attempts']
+                state.requeue(retry)
+        finally:
+            state.inflight = False
+            self._inflight -= 1
+            self._wakeup.set()
+
+        if message is None:
+            return
+        # Gönderim tamam: sonucu bekleyen iptal etmiş olsa da mesaj tekrar gönderilmez
+        finished = time.perf_counter()
+        for item in batch:
+            self.sent += 1
+            self.latency.add(finished - item['perf_submitted'])
+            if not item['future'].done():
+                item['future'].set_result(message)
+        if len(batch) > 1:
+            self.digests += 1
+            self.coalesced += len(batch)
+
+    # ---- Gönderim (herhangi bir thread'den) ----
+
+    def submit(self, chat_id, text: str, parse_mode: Optional[str] = 'HTML',
+               priority: int = PRIORITY_INFO, coalesce: bool = False, **kwargs) -> concurrent.futures.Future:
+        """Mesajı kuyruğa al; gönderilen Message nesnesini taşıyan Future döndürür
+
+        coalesce=True olan mesajlar sohbette birikme olursa tek özet mesajda
+        birleştirilebilir; bu durumda hepsinin Future'ı aynı Message'ı taşır.
+        Ek Telegram parametresi verilen mesajlar hiçbir zaman birleştirilmez.
+        """
+        if not self.is_running:
+            self.start()
+        # Başka bir thread başlatıyorsa loop hazır olana kadar bekle
+        self._ready.wait(timeout=10)
+        loop = self.loop
+        if loop is None:
+            raise RuntimeError("Bildirim göndericisi çalışmıyor")
+        future = concurrent.futures.Future()
+        item = {
+            'kwargs': dict(kwargs, chat_id=chat_id, text=text, parse_mode=parse_mode),
+            'future': future,
+            'priority': min(max(int(priority), 0), len(LANE_NAMES) - 1),
+            'coalesce': coalesce and not kwargs,
+            'submitted_at': time.monotonic(),
+            'perf_submitted': time.perf_counter(),
+            'attempts': 0,
+        }
+        self.submitted += 1
+        loop.call_soon_threadsafe(self._enqueue, item)
+        return future
+
+    def broadcast(self, chat_ids: Iterable, text: str, parse_mode: Optional[str] = 'HTML', **kwargs) -> List[concurrent.futures.Future]:
+        """Aynı mesajı birden çok sohbete kuyrukla"""
+        return [self.submit(chat_id, text, parse_mode=parse_mode, **kwargs) for chat_id in chat_ids]
+
+    def get_stats(self) -> Dict[str, Any]:
+        lane_depths = dict.fromkeys(LANE_NAMES, 0)
+        now = time.monotonic()
+        blocked = 0
+        for state in list(self.chats.values()):
+            for lane_name, lane in zip(LANE_NAMES, state.lanes):
+                lane_depths[lane_name] += len(lane)
+            if state.blocked_until > now:
+                blocked += 1
+        return {
+            'running': self.is_running,
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'outstanding': self.submitted - self.sent - self.failed,
+            'queue_depth': sum(lane_depths.values()),
+            'lane_depths': lane_depths,
+            'inflight': self._inflight,
+            'blocked_chats': blocked,
+            'retry_after': self.retry_after,
+            'digests': self.digests,
+            'coalesced': self.coalesced,
+            'latency': self.latency.get_stats(),
+        }
@@ -0,0 +1,214 @@
+"""
+Çekim Bildirimi Deposu
+Listener'ın kaydettiği çekim bildirimleri sınırsız bir listede ham veri ve HTML
+mesajıyla birlikte tutulmak yerine sabit kapasiteli bir halka tamponda küçük
+kayıtlar olarak saklanır. Çekim ID'si ve müşteri ID'si üzerinden O(1) erişim,
+panel için zaman aralığı sorgusu ve (opsiyonel) tampondan düşen kayıtların
+JSON Lines dosyasına aktarılması desteklenir.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class WithdrawalRecord:
+    """Tek çekim bildiriminin panelde/komutlarda kullanılan alanları"""
+
+    __slots__ = (
+        'seq', 'ts', 'withdrawal_id', 'client_id', 'client_name', 'client_login',
+        'amount', 'currency', 'payment_system', 'account_holder', 'btag', 'state',
+        'request_time', 'processed'
+    )
+
+    # seq ve ts dışındaki alanlar
+    FIELDS = __slots__[2:]
+
+    def __init__(self, seq: int, ts: float, **fields):
+        self.seq = seq
+        self.ts = ts
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+        self.processed = bool(fields.get('processed', False))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        data['timestamp'] = datetime.fromtimestamp(self.ts).isoformat()
+        return data
+
+
+def _to_epoch(value: Union[None, float, int, datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class WithdrawalNotificationStore:
+    """Çekim ID'si ve müşteri ID'si indeksli, sabit kapasiteli halka tampon"""
+
+    def __init__(self, capacity: int = 1000, spill_path: Optional[str] = None):
+        """
+        Args:
+            capacity: Bellekte tutulacak en fazla bildirim
+            spill_path: Tampondan düşen kayıtların ekleneceği JSONL dosyası (None = kapalı)
+        """
+        self.capacity = max(1, capacity)
+        self.spill_path = spill_path
+        self._slots: List[Optional[WithdrawalRecord]] = [None] * self.capacity
+        self._next_seq = 0  # Bir sonraki kaydın sıra numarası
+        self._by_withdrawal: Dict[Any, WithdrawalRecord] = {}
+        self._by_client: Dict[Any, deque] = {}
+        self._lock = threading.Lock()
+
+        self.evicted = 0
+        self.spilled = 0
+        self.spill_errors = 0
+
+    # ---- Yazma ----
+
+    def append(self, timestamp: Union[None, float, datetime] = None, **fields) -> WithdrawalRecord:
+        """Yeni bildirimi ekle; kapasite doluysa en eski kayıt düşer"""
+        ts = _to_epoch(timestamp) or time.time()
+        with self._lock:
+            seq = self._next_seq
+            slot = seq % self.capacity
+            evicted = self._slots[slot]
+            if evicted is not None:
+                self._evict(evicted)
+
+            record = WithdrawalRecord(seq, ts, **fields)
+            self._slots[slot] = record
+            self._next_seq += 1
+
+            if record.withdrawal_id is not None:
+                self._by_withdrawal[record.withdrawal_id] = record
+            if record.client_id is not None:
+                self._by_client.setdefault(record.client_id, deque()).append(record)
+
+        if evicted is not None and self.spill_path:
+            self._spill(evicted)
+        return record
+
+    def _evict(self, record: WithdrawalRecord):
+        """İndekslerden çıkar (kilit altında çağrılır)"""
+        self.evicted += 1
+        if self._by_withdrawal.get(record.withdrawal_id) is record:
+            del self._by_withdrawal[record.withdrawal_id]
+        client_records = self._by_client.get(record.client_id)
+        if client_records:
+            # Müşterinin kayıtları da eklenme sırasında; düşen kayıt her zaman en eskisidir
+            if client_records[0] is record:
+                client_records.popleft()
+            if not client_records:
+                del self._by_client[record.client_id]
+
+    def _spill(self, record: WithdrawalRecord):
+        try:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record.to_dict(), ensure_ascii=False, default=str) + "\n")
+            self.spilled += 1
+        except Exception as e:
+            self.spill_errors += 1
+            logger.error(f"Çekim bildirimi diske aktarılamadı: {e}")
+
+    def mark_processed(self, withdrawal_id) -> bool:
+        with self._lock:
+            record = self._by_withdrawal.get(withdrawal_id)
+            if record is None:
+                return False
+            record.processed = True
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self._next_seq = 0
+            self._by_withdrawal.clear()
+            self._by_client.clear()
+
+    # ---- Okuma ----
+
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Başlangıçtan beri eklenen toplam bildirim"""
+        return self._next_seq
+
+    def _first_seq(self) -> int:
+        return max(0, self._next_seq - self.capacity)
+
+    def _record(self, seq: int) -> WithdrawalRecord:
+        return self._slots[seq % self.capacity]
+
+    def get(self, withdrawal_id) -> Optional[Dict[str, Any]]:
+        """Çekim ID'sine göre kayıt"""
+        record = self._by_withdrawal.get(withdrawal_id)
+        return record.to_dict() if record else None
+
+    def by_client(self, client_id, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Müşterinin tampondaki kayıtları (eskiden yeniye)"""
+        with self._lock:
+            records = list(self._by_client.get(client_id, ()))
+        if limit:
+            records = records[-limit:]
+        return [r.to_dict() for r in records]
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._next_seq:
+                return None
+            return self._record(self._next_seq - 1).to_dict()
+
+    def _lower_bound(self, ts: float) -> int:
+        """Zaman damgası ts'den büyük/eşit ilk kaydın sıra numarası (ikili arama)"""
+        lo, hi = self._first_seq(), self._next_seq
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid).ts < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self,
+              since: Union[None, float, datetime] = None,
+              until: Union[None, float, datetime] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Zaman aralığındaki kayıtlar (eskiden yeniye); limit verilirse en yeni N kayıt"""
+        since, until = _to_epoch(since), _to_epoch(until)
+        with self._lock:
+            start = self._lower_bound(since) if since is not None else self._first_seq()
+            end = self._lower_bound(until) if until is not None else self._next_seq
+            if limit:
+                start = max(start, end - limit)
+            records = [self._record(seq) for seq in range(start, end)]
+        return [r.to_dict() for r in records]
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """En yeni kayıtlar (eskiden yeniye)"""
+        return self.query(limit=limit)
+
+    def count_since(self, since: Union[float, datetime]) -> int:
+        with self._lock:
+            return self._next_seq - self._lower_bound(_to_epoch(since))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self),
+            'capacity': self.capacity,
+            'total': self.total,
+            'evicted': self.evicted,
+            'spilled': self.spilled,
+            'spill_errors': self.spill_errors,
+            'clients': len(self._by_client),
+        }
@@ -0,0 +1,271 @@
+"""
+Sorgu Log Deposu
+Her Telegram sorgusu için tüm logs.json dosyasını okuyup yeniden yazmak yerine
+günlük JSON Lines segmentlerine (logs/queries-YYYY-MM-DD.jsonl) tek satır ekler.
+Okuyucu tarafı segmentleri dosya konumuyla takip eder; kapanmış segmentler bir
+kez, bugünkü segment yalnızca yeni eklenen satırlar kadar okunur.
+"""
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "queries-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+# Yanıt süresi histogram sınırları (saniye); yüzdelikler kova üst sınırından okunur
+RESPONSE_TIME_BUCKETS = (0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+
+
+class QueryStats:
+    """Log kayıtları eklendikçe güncellenen ön-toplanmış sayaçlar"""
+
+    def __init__(self):
+        self.total_queries = 0
+        self.total_ids = 0
+        self.response_time_sum = 0.0
+        self.users = {}  # user_id -> {'username', 'count', 'total_ids'}
+        self.days = {}  # date -> {'queries', 'ids', 'response_time_sum', 'hours'}
+        self.histogram = [0] * (len(RESPONSE_TIME_BUCKETS) + 1)
+
+    def add(self, day: date, entry: Dict[str, Any]):
+        """Tek kaydı sayaçlara ekle"""
+        query_count = entry.get("query_count", 0) or 0
+        response_time = float(entry.get("response_time", 0) or 0)
+
+        self.total_queries += 1
+        self.total_ids += query_count
+        self.response_time_sum += response_time
+
+        user_id = entry.get("user_id")
+        user = self.users.get(user_id)
+        if user is None:
+            user = self.users[user_id] = {
+                "username": entry.get("username", f"User_{user_id}"),
+                "count": 0,
+                "total_ids": 0,
+            }
+        user["count"] += 1
+        user["total_ids"] += query_count
+
+        bucket = self.days.get(day)
+        if bucket is None:
+            bucket = self.days[day] = {"queries": 0, "ids": 0, "response_time_sum": 0.0, "hours": [0] * 24}
+        bucket["queries"] += 1
+        bucket["ids"] += query_count
+        bucket["response_time_sum"] += response_time
+        # ISO zaman damgasından saat (YYYY-MM-DDTHH...) - datetime parse etmeden
+        try:
+            bucket["hours"][int(entry["timestamp"][11:13])] += 1
+        except (KeyError, TypeError, ValueError, IndexError):
+            pass
+
+        self.histogram[bisect_left(RESPONSE_TIME_BUCKETS, response_time)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Histogramdan yaklaşık yüzdelik (kova üst sınırı)"""
+        if not self.total_queries:
+            return 0.0
+        target = q * self.total_queries
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return float(RESPONSE_TIME_BUCKETS[i]) if i < len(RESPONSE_TIME_BUCKETS) else float(RESPONSE_TIME_BUCKETS[-1])
+        return float(RESPONSE_TIME_BUCKETS[-1])
+
+    def snapshot(self, today: date, top_n: int = 5) -> Dict[str, Any]:
+        """Panelin kullandığı istatistik sözlüğü"""
+        today_bucket = self.days.get(today)
+        hourly_distribution = {}
+        if today_bucket:
+            hourly_distribution = {h: c for h, c in enumerate(today_bucket["hours"]) if c}
+
+        top_users = sorted(
+            ({"user_id": uid, **u} for uid, u in self.users.items()),
+            key=lambda x: x["count"], reverse=True
+        )[:top_n]
+
+        return {
+            "total_queries": self.total_queries,
+            "unique_users": len(self.users),
+            "total_ids_queried": self.total_ids,
+            "avg_response_time": self.response_time_sum / self.total_queries if self.total_queries else 0,
+            "p50_response_time": self.percentile(0.50),
+            "p95_response_time": self.percentile(0.95),
+            "queries_today": today_bucket["queries"] if today_bucket else 0,
+            "top_users": top_users,
+            "hourly_distribution": hourly_distribution,
+            "daily_totals": {d.isoformat(): b["queries"] for d, b in sorted(self.days.items())},
+        }
+
+
+class QueryLogStore:
+    """Günlük segmentlere bölünmüş, sadece ekleme yapılan sorgu logu"""
+
+    def __init__(self, base_dir: str = "logs", legacy_file: Optional[str] = "logs.json"):
+        """
+        Args:
+            base_dir: Segment dosyalarının bulunduğu klasör
+            legacy_file: Eski tek dosyalı log; varsa ilk açılışta segmentlere taşınır
+        """
+        self.base_dir = base_dir
+        self.legacy_file = legacy_file
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        # segment yolu -> (okunan bayt konumu, kayıtlar)
+        self._segments = {}
+        # Okunan her yeni satır bir kez buraya eklenir
+        self._stats = QueryStats()
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._migrate_legacy()
+
+    # ---- Yazma ----
+
+    def segment_path(self, day: date) -> str:
+        """Gün için segment dosya yolu"""
+        return os.path.join(self.base_dir, f"{SEGMENT_PREFIX}{day.isoformat()}{SEGMENT_SUFFIX}")
+
+    def append(self, entry: Dict[str, Any]) -> str:
+        """Kaydı ilgili günün segmentine ekle ve segment yolunu döndür"""
+        timestamp = entry.get("timestamp")
+        day = datetime.fromisoformat(timestamp).date() if timestamp else date.today()
+        path = self.segment_path(day)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._write_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        return path
+
+    def _migrate_legacy(self):
+        """Eski logs.json içeriğini günlük segmentlere böl (tek seferlik)"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        if self.list_days():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                queries = json.load(f).get("queries", [])
+            for entry in queries:
+                self.append(entry)
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+            logger.info(f"{len(queries)} eski log kaydı {self.base_dir} klasörüne taşındı")
+        except Exception as e:
+            logger.error(f"Eski log taşıma hatası: {e}")
+
+    # ---- Okuma ----
+
+    def list_days(self) -> List[date]:
+        """Segmenti bulunan günler (eskiden yeniye)"""
+        days = []
+        try:
+            names = os.listdir(self.base_dir)
+        except FileNotFoundError:
+            return days
+        for name in names:
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    days.append(date.fromisoformat(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def read_day(self, day: date) -> List[Dict[str, Any]]:
+        """Günün kayıtları (yalnızca okunmamış satırlar diskten okunur)
+
+        Dönen liste önbellekteki listedir, değiştirilmemelidir.
+        """
+        path = self.segment_path(day)
+        with self._read_lock:
+            offset, entries = self._segments.get(path, (0, []))
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                self._segments.pop(path, None)
+                return []
+            if size < offset:
+                # Dosya dışarıdan kısaltılmış/değiştirilmiş; sayaçları sıfırdan kur
+                self._segments.clear()
+                self._stats = QueryStats()
+                offset, entries = 0, []
+            if size > offset:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                # Yarım yazılmış son satırı bir sonraki okumaya bırak
+                end = chunk.rfind(b"\n") + 1
+                for raw in chunk[:end].splitlines():
+                    if not raw.strip():
+                        continue
+                    try:
+                        entry = json.loads(raw)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Bozuk log satırı atlandı: {path}")
+                        continue
+                    entries.append(entry)
+                    self._stats.add(day, entry)
+                offset += end
+            self._segments[path] = (offset, entries)
+            return entries
+
+    def iter_entries(self, since: Optional[date] = None, until: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """Kayıtları eskiden yeniye dolaş (tarih aralığı opsiyonel)"""
+        for day in self.list_days():
+            if since and day < since:
+                continue
+            if until and day > until:
+                continue
+            yield from self.read_day(day)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """En yeni kayıtlar (yeniden eskiye), yalnızca gereken segmentler okunur"""
+        result = []
+        if limit <= 0:
+            return result
+        for day in reversed(self.list_days()):
+            entries = self.read_day(day)
+            result.extend(reversed(entries[-(limit - len(result)):]))
+            if len(result) >= limit:
+                break
+        return result
+
+    def get_statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Ön-toplanmış istatistikler; yalnızca büyümüş segmentlerin yeni satırları okunur"""
+        for day in self.list_days():
+            path = self.segment_path(day)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            cached = self._segments.get(path)
+            if cached is None or cached[0] != size:
+                self.read_day(day)
+        with self._read_lock:
+            return self._stats.snapshot(today or date.today())
+
+    def load_all(self) -> Dict[str, Any]:
+        """Eski logs.json biçiminde tüm kayıtlar (dışa aktarma için)"""
+        return {"queries": list(self.iter_entries())}
+
+
+# Global store instance
+_global_store = None
+_global_store_lock = threading.Lock()
+
+def get_query_log_store() -> QueryLogStore:
+    """Global sorgu log deposunu döndür"""
+    global _global_store
+    with _global_store_lock:
+        if _global_store is None:
+            _global_store = QueryLogStore(
+                base_dir=os.getenv('QUERY_LOG_DIR', 'logs'),
+                legacy_file=os.getenv('QUERY_LOG_LEGACY_FILE', 'logs.json'),
+            )
+        return _global_store
@@ -8,7 +8,10 @@ from typing import Callable, Optional, Dict, Any
 import threading
 import time
 
+from log_control import get_component_logger
+
 logger = logging.getLogger(__name__)
+hot_log = get_component_logger('signalr')
 
 class BetConstructSignalRClient:
     def __init__(self, 
@@ -173,7 +176,7 @@ class BetConstructSignalRClient:
             if not message.strip():
                 return
             
-            logger.debug(f"Gelen mesaj: {message}")
+            hot_log.debug("Gelen mesaj: %.500s", message)
             
             # SignalR protokol mesajlarını filtrele
             if message.startswith('{"C":') or message.startswith('{"S":'):
@@ -205,8 +208,8 @@ class BetConstructSignalRClient:
         try:
             messages = data.get("M", [])
             
-            # Tüm mesajları detaylı logla
-            logger.info(f"📨 Hub mesajı alındı: {json.dumps(data, indent=2)}")
+            # Döküm yalnızca DEBUG açıkken ve örneklenerek
+            hot_log.payload("📨 Hub mesajı alındı", data)
             
             for msg in messages:
                 hub = msg.get("H", "").lower()
@@ -214,7 +217,8 @@ class BetConstructSignalRClient:
                 arguments = msg.get("A", [])
                 
                 if hub == "commonnotificationhub":
-                    logger.info(f"🔔 Hub: {hub} | Method: {method} | Arguments: {json.dumps(arguments, indent=2)}")
+                    hot_log.event(logging.DEBUG, 'hub_message', hub=hub, method=method, args=len(arguments))
+                    hot_log.payload("🔔 Hub argümanları", arguments)
                     
                     # Çekim talebi bildirimi kontrolü (daha geniş kapsamlı)
                     if any(key in method.lower() for key in ["withdrawal", "withdraw", "çekim", "para"]):
@@ -254,7 +258,7 @@ class BetConstructSignalRClient:
     async def _handle_general_notification(self, method: str, arguments: list):
         """Genel bildirimi işle"""
         try:
-            logger.info(f"📢 Genel bildirim alındı - Method: {method}")
+            hot_log.debug("📢 Genel bildirim alındı - Method: %s", method)
             
             notification_data = {
                 "type": "general",
@@ -309,7 +313,7 @@ class BetConstructSignalRClient:
         try:
             if self.websocket and self.is_connected:
                 await self.websocket.ping()
-                logger.debug("Heartbeat gönderildi")
+                hot_log.debug("Heartbeat gönderildi")
         except Exception as e:
             logger.error(f"Heartbeat hatası: {e}")
     
@@ -0,0 +1,145 @@
+"""
+Çevrim Analizi Motoru
+İşlem listesinin sütunlarını bir kez toplayıp belge türü ve oyun adını
+kategorik kodlara dönüştürür; son uygun yatırımı, yatırım sonrası bahis/kazanç
+toplamlarını ve oyun bazında bahis/kazanç/net kârı tek geçişte (np.bincount)
+hesaplar. Aynı geçiş birden çok müşterinin işlemleri birlikte verilerek toplu
+analizde de kullanılır. İşlem tarihleri api_datetime ile vektörel ayrıştırılır.
+"""
+
+import logging
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api_datetime import parse_api_datetime_array
+
+logger = logging.getLogger(__name__)
+
+# Çevrimin başladığı belge türleri ve analizde karşılıkları
+DEPOSIT_BASE_TYPES = {
+    'Yatırım': 'Yatırım',
+    'Yatırım Talebi Ödemesi': 'Yatırım',
+    'CashBack Düzeltmesi': 'Kayıp Bonusu',
+    'Tournament Win': 'Turnuva Kazancı',
+}
+BET_TYPE = 'Bahis'
+WIN_TYPE = 'Kazanç Artar'
+
+# Ana kazancı oluşturan oyun eşiği (toplam net kârın oranı)
+MAIN_PROFIT_SHARE = 0.1
+
+
+def analyze_turnover_batch(transactions_by_client: Dict[Hashable, Iterable[Dict[str, Any]]]) -> Dict[Hashable, Optional[Dict[str, Any]]]:
+    """Müşteri → işlem listesi sözlüğünden müşteri başına çevrim sonucu
+
+    Sonuç None ise müşterinin işlemi ya da uygun yatırımı yoktur. Sonuç sözlüğü:
+    base_type, base_amount, deposit_date, total_bet, total_win, net_profit,
+    turnover_ratio, games (net kâra göre azalan [{'game','bet','win','net'}]) ve
+    main_games (ana kazancı oluşturan oyunlar).
+    """
+    clients = list(transactions_by_client)
+    results: Dict[Hashable, Optional[Dict[str, Any]]] = {client: None for client in clients}
+
+    # Sütunları doğrudan topla (satır sözlüklerinden DataFrame kurmaktan hızlı)
+    client_list, doc_list, amount_list, created_list, game_list = [], [], [], [], []
+    for code, client in enumerate(clients):
+        rows = list(transactions_by_client[client] or ())
+        client_list.extend([code] * len(rows))
+        doc_list.extend([tx.get('DocumentTypeName') for tx in rows])
+        amount_list.extend([tx.get('Amount') for tx in rows])
+        created_list.extend([tx.get('CreatedLocal') for tx in rows])
+        game_list.extend([tx.get('Game') for tx in rows])
+    if not client_list:
+        return results
+
+    # Tek kategorik kodlama: belge türü, oyun, tutar ve tarih dizileri
+    client_codes = np.asarray(client_list, dtype=np.int64)
+    doc_codes, doc_names = pd.factorize(np.asarray(doc_list, dtype=object))
+    game_codes, game_names = pd.factorize(np.asarray(game_list, dtype=object))  # oyunu olmayanlar -1 (groupby gibi dışarıda kalır)
+    amounts = pd.to_numeric(pd.Series(amount_list, dtype=object), errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    # Tarihler saniyeye indirilmiş tam sayı (epoch saniye) olarak karşılaştırılır
+    parsed_dates = parse_api_datetime_array(created_list)
+    valid_dates = ~np.isnat(parsed_dates)
+    seconds = parsed_dates.astype('datetime64[s]')
+    dates = seconds.astype(np.int64)
+
+    doc_names = list(doc_names)
+    deposit_doc_codes = [doc_names.index(name) for name in DEPOSIT_BASE_TYPES if name in doc_names]
+    bet_code = doc_names.index(BET_TYPE) if BET_TYPE in doc_names else -2
+    win_code = doc_names.index(WIN_TYPE) if WIN_TYPE in doc_names else -2
+
+    # Müşteri başına son uygun yatırım: (müşteri, tarih) sıralamasında her müşterinin son satırı
+    deposit_rows = np.flatnonzero(np.isin(doc_codes, deposit_doc_codes) & valid_dates)
+    if deposit_rows.size == 0:
+        return results
+    order = deposit_rows[np.lexsort((dates[deposit_rows], client_codes[deposit_rows]))]
+    last_of_client = np.append(client_codes[order][1:] != client_codes[order][:-1], True)
+    last_deposit_row = order[last_of_client]
+
+    n_clients = len(clients)
+    deposit_date = np.full(n_clients, np.iinfo(np.int64).max)  # yatırımı olmayan müşteri: hiçbir satır sonrası değil
+    deposit_date[client_codes[last_deposit_row]] = dates[last_deposit_row]
+
+    # Yatırım sonrası bahis/kazanç satırları; müşteri×oyun anahtarıyla tek bincount
+    after = valid_dates & (dates >= deposit_date[client_codes])
+    is_bet = after & (doc_codes == bet_code)
+    is_win = after & (doc_codes == win_code)
+
+    total_bet = np.bincount(client_codes, weights=np.where(is_bet, amounts, 0.0), minlength=n_clients)
+    total_win = np.bincount(client_codes, weights=np.where(is_win, amounts, 0.0), minlength=n_clients)
+
+    n_games = max(len(game_names), 1)
+    has_game = (game_codes >= 0) & (is_bet | is_win)
+    keys = client_codes[has_game] * n_games + game_codes[has_game]
+    game_bet = np.bincount(keys, weights=np.where(is_bet[has_game], amounts[has_game], 0.0), minlength=n_clients * n_games)
+    game_win = np.bincount(keys, weights=np.where(is_win[has_game], amounts[has_game], 0.0), minlength=n_clients * n_games)
+    game_seen = np.bincount(keys, minlength=n_clients * n_games) > 0
+
+    for row in last_deposit_row:
+        code = client_codes[row]
+        base_amount = float(amounts[row])
+
+        lo, hi = code * n_games, (code + 1) * n_games
+        seen = np.flatnonzero(game_seen[lo:hi])
+        bets = game_bet[lo:hi][seen]
+        wins = game_win[lo:hi][seen]
+        nets = wins - bets
+        by_net = np.argsort(-nets, kind='stable')
+        games = [
+            {'game': game_names[seen[i]], 'bet': float(bets[i]), 'win': float(wins[i]), 'net': float(nets[i])}
+            for i in by_net
+        ]
+        total_net = float(nets.sum())
+        main_games = [g for g in games if g['net'] > 0 and g['net'] > total_net * MAIN_PROFIT_SHARE]
+
+        results[clients[code]] = {
+            'base_type': DEPOSIT_BASE_TYPES[doc_names[doc_codes[row]]],
+            'base_amount': base_amount,
+            'deposit_date': seconds[row].item(),
+            'total_bet': float(total_bet[code]),
+            'total_win': float(total_win[code]),
+            'net_profit': float(total_win[code] - total_bet[code]),
+            'turnover_ratio': float(total_bet[code] / base_amount) if base_amount else 0.0,
+            'games': games,
+            'main_games': main_games,
+        }
+    return results
+
+
+def analyze_turnover(transactions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Tek müşterinin işlemleri için çevrim sonucu (bkz. analyze_turnover_batch)"""
+    return analyze_turnover_batch({0: transactions})[0]
+
+
+def describe_main_games(main_games: List[Dict[str, Any]]) -> str:
+    """Ana kazancı oluşturan oyunlar için kısa açıklama ('' = yok)"""
+    if len(main_games) == 1:
+        game = main_games[0]
+        return f"{game['game']} oyunundan {game['net']:,.2f} TL"
+    if len(main_games) > 1:
+        games_list = ", ".join(game['game'] for game in main_games)
+        total_main_profit = sum(game['net'] for game in main_games)
+        return f"{games_list} oyunlarından toplam {total_main_profit:,.2f} TL"
+    return ""